@@ -0,0 +1,454 @@
+#!/usr/bin/python
+#--
+#=============================================================================#
+# File: PyWorks_sfdc_benchmark.py
+#
+#  Copyright (c) 2008-2011, Joe DiMauro
+#  All rights reserved.
+#
+# Description: Benchmarks for the PyWorks SOATest/Salesforce.com (SFDC) methods.
+#
+#    Runs the SFDC methods outside of SOATest, on a SoaTestOfflineContext filled with
+#    generated SFDC query responses, (see generateSfdcQueryResponse() in
+#    PyWorks_xml_benchmark.py), of increasing sizes, and reports how the time
+#    of each method grows with the number of records.
+#
+#    After the timings of each size, the scaling of each method is reported as the
+#    exponent of its growth, (time grows as records ** exponent), between the
+#    smallest and the largest size: about 0 for constant time, about 1 for linear time.
+#    Methods growing faster than linear time are marked SUPERLINEAR.
+#
+# Execution:   From the src/Benchmark directory, with src/Lib on the PYTHONPATH:
+#                   jython PyWorks_sfdc_benchmark.py [options]
+#
+#              Options:
+#                   --max-size SIZE    Largest response to time, e.g. 1MB, 4MB or 16MB (default 4MB)
+#                   --csv FILE         Also save the timings to a CSV file, for plotting
+#
+#              See README_benchmark.txt
+#
+#=============================================================================#
+
+#=============================================================================#
+# Import section
+# Entries for additional files or methods needed by this benchmark
+#=============================================================================#
+
+import os                           # Adds ability to access OS
+import sys
+import time                         # Add ability to get/format Time
+import math
+import tempfile
+
+# PyWorks
+from PyWorks_Utilities import print2    # PyWorks General Utilities
+from PyWorks_SoaTest_SfdcUtilities import *    # PyWorks SOAtest/Salesforce Utilities
+from PyWorks_xml_benchmark import generateSfdcQueryResponse, parseSize, NullWriter, BENCHMARK_MIN_SECONDS, BENCHMARK_MAX_RUNS
+#=============================================================================#
+
+#=============================================================================#
+# Global Variables section
+#=============================================================================#
+
+# Define values for True/False since they were not defined in Jython2.2.1
+True = 1
+False = 0
+
+global VERBOSE
+VERBOSE = False
+
+# Sizes of the generated responses of each SFDC Object type, as (label, number of bytes),
+# each 4 times the one before
+SFDC_BENCHMARK_SIZES = [("16KB", 16 * 1024),
+                        ("64KB", 64 * 1024),
+                        ("256KB", 256 * 1024),
+                        ("1MB", 1024 * 1024),
+                        ("4MB", 4 * 1024 * 1024),
+                        ("16MB", 16 * 1024 * 1024)]
+
+# The number of Names looked up by each findSfdcObjectId() benchmark call
+SFDC_BENCHMARK_LOOKUPS = 1000
+
+# The number of Names looked up by each findSfdcObjectIdsFuzzy() benchmark call
+SFDC_BENCHMARK_FUZZY_LOOKUPS = 100
+
+# Scaling exponents above this are reported as SUPERLINEAR
+SFDC_BENCHMARK_SUPERLINEAR = 1.3
+
+#=============================================================================#
+
+
+#=============================================================================#
+#--
+# Function: createSfdcContext(...)
+#++
+#
+# Description:  Returns a SoaTestOfflineContext holding a generated query response of about
+#               iTargetBytes bytes for each of the SFDC_OBJECT_TYPES, in the Data Source
+#               Variables read by getSfdcAccountIds(), ... getSfdcUserIds()
+#
+# Returns: TUPLE - (SoaTestOfflineContext, INTEGER - The number of records in the Account response,
+#                   the other responses hold about as many)
+#
+#=============================================================================#
+def createSfdcContext(iTargetBytes):
+
+    oContext = SoaTestOfflineContext()
+    iAccountRecords = 0
+
+    for sObjectType, sReadSoaTestDataSourceName, sReadVariableName, sWriteVariableName, sTagNameKey, sTagNameValue in SFDC_OBJECT_TYPES:
+
+        sXML, iRecords = generateSfdcQueryResponse(iTargetBytes, sObjectType)
+        if (sObjectType == "Account"):
+            iAccountRecords = iRecords
+        # end
+
+        # The generated records hold their Name in <sf:Name>, (e.g. Users are keyed by <sf:Username>)
+        if (sTagNameKey != "sf:Name"):
+            sXML = sXML.replace("<sf:Name>", "<" + sTagNameKey + ">").replace("</sf:Name>", "</" + sTagNameKey + ">")
+        # end
+
+        oContext.setValue(sReadSoaTestDataSourceName, sReadVariableName, sXML)
+    # end
+
+    return (oContext, iAccountRecords)
+
+# END method - createSfdcContext()
+
+
+#=============================================================================#
+#--
+# Function: runSfdcBenchmarkQuietly(...)
+#++
+#
+# Description:  Runs a benchmark once, discarding the messages printed by the methods
+#
+#=============================================================================#
+def runSfdcBenchmarkQuietly(fBenchmark, oContext, iRecords):
+
+    oStdout = sys.stdout
+    sys.stdout = NullWriter()
+    try:
+        fBenchmark(oContext, iRecords)
+    finally:
+        sys.stdout.close()
+        sys.stdout = oStdout
+    # end
+
+# END method - runSfdcBenchmarkQuietly()
+
+
+#=============================================================================#
+#--
+# Function: timeSfdcBenchmark(...)
+#++
+#
+# Description:  Runs a benchmark repeatedly, for at least BENCHMARK_MIN_SECONDS,
+#               and returns the time of the fastest run in seconds.
+#               The messages printed by the methods are discarded while they are timed.
+#
+#=============================================================================#
+def timeSfdcBenchmark(fBenchmark, oContext, iRecords):
+
+    fBest = None
+    fTotal = 0.0
+    iRuns = 0
+
+    oStdout = sys.stdout
+    sys.stdout = NullWriter()
+    try:
+        while ((fTotal < BENCHMARK_MIN_SECONDS) and (iRuns < BENCHMARK_MAX_RUNS)):
+
+            fStart = time.time()
+            fBenchmark(oContext, iRecords)
+            fElapsed = time.time() - fStart
+
+            if ((fBest == None) or (fElapsed < fBest)):
+                fBest = fElapsed
+            # end
+
+            fTotal = fTotal + fElapsed
+            iRuns = iRuns + 1
+
+        # end
+    finally:
+        sys.stdout.close()
+        sys.stdout = oStdout
+    # end
+
+    # Timer resolution
+    return max(fBest, 0.000001)
+
+# END method - timeSfdcBenchmark()
+
+
+#=============================================================================#
+# The benchmarks, as (name, True to run with enableSfdcIdCache(), function)
+# Each function takes the SoaTestOfflineContext and the number of records of each response
+#=============================================================================#
+
+def _benchmarkStoreDict(oContext, iRecords):
+    sfdc_StoreDictInSoaTestVar(oContext, SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryAccount_XML", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: AccountIds", "sf:Name", "sf:Id")
+# end
+
+def _benchmarkStoreMultimap(oContext, iRecords):
+    sfdc_StoreMultimapInSoaTestVar(oContext, SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryAccount_XML", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: AccountMultimap", "sf:Name", "sf:Id")
+# end
+
+def _benchmarkMergeDict(oContext, iRecords):
+    sfdc_MergeDictInSoaTestVar(oContext, SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryAccount_XML", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: AccountMerged", "sf:Name", "sf:Id")
+# end
+
+def _getBenchmarkRecord(iLookup, iRecords):
+    # Spread the lookups over the records, skipping every 10th one, its Name holds '&amp; Co'
+    iRecord = (iLookup * iRecords) / SFDC_BENCHMARK_LOOKUPS
+    if ((iRecord % 10) == 9):
+        iRecord = iRecord - 1
+    # end
+    return iRecord
+# end
+
+def _benchmarkFindExact(oContext, iRecords):
+    for iLookup in range(SFDC_BENCHMARK_LOOKUPS):
+        findSfdcObjectId(oContext, "SFDC: AccountIds", "Account %d" % _getBenchmarkRecord(iLookup, iRecords))
+    # end
+# end
+
+def _benchmarkFindIgnoreCase(oContext, iRecords):
+    for iLookup in range(SFDC_BENCHMARK_LOOKUPS):
+        findSfdcObjectId(oContext, "SFDC: AccountIds", "ACCOUNT %d" % _getBenchmarkRecord(iLookup, iRecords), False)
+    # end
+# end
+
+def _benchmarkFindFuzzy(oContext, iRecords):
+    # Misspelled Names, (the SfdcTrigramIndex is built by the first run)
+    for iLookup in range(SFDC_BENCHMARK_FUZZY_LOOKUPS):
+        findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Acount %d" % _getBenchmarkRecord(iLookup * (SFDC_BENCHMARK_LOOKUPS / SFDC_BENCHMARK_FUZZY_LOOKUPS), iRecords), 5)
+    # end
+# end
+
+def _benchmarkFindPattern(oContext, iRecords):
+    # A Name that is not there, so every Name is searched
+    findSfdcObjectId(oContext, "SFDC: AccountIds", "^Bogus \\d+$")
+# end
+
+def _benchmarkAllObjectIds(oContext, iRecords):
+    getSfdcAllObjectIds(None, oContext, None, 1)
+# end
+
+def _benchmarkAllObjectIdsThreads(oContext, iRecords):
+    getSfdcAllObjectIds(None, oContext, None, SFDC_THREADS)
+# end
+
+SFDC_BENCHMARKS = [
+    ("sfdc_StoreDictInSoaTestVar",                        False, _benchmarkStoreDict),
+    ("sfdc_StoreMultimapInSoaTestVar",                    False, _benchmarkStoreMultimap),
+    ("sfdc_MergeDictInSoaTestVar (1 batch)",              False, _benchmarkMergeDict),
+    ("findSfdcObjectId (%d exact)" % SFDC_BENCHMARK_LOOKUPS,        False, _benchmarkFindExact),
+    ("findSfdcObjectId (%d ignore case)" % SFDC_BENCHMARK_LOOKUPS,  False, _benchmarkFindIgnoreCase),
+    ("findSfdcObjectId (pattern, no match)",              False, _benchmarkFindPattern),
+    ("findSfdcObjectIdsFuzzy (%d misspelled)" % SFDC_BENCHMARK_FUZZY_LOOKUPS,  False, _benchmarkFindFuzzy),
+    ("getSfdcAccountIds",                                 False, lambda oContext, iRecords: getSfdcAccountIds(None, oContext)),
+    ("getSfdcAccountIds (SfdcIdCache)",                   True , lambda oContext, iRecords: getSfdcAccountIds(None, oContext)),
+    ("getSfdcContactIds",                                 False, lambda oContext, iRecords: getSfdcContactIds(None, oContext)),
+    ("getSfdcLeadIds",                                    False, lambda oContext, iRecords: getSfdcLeadIds(None, oContext)),
+    ("getSfdcOpportunityIds",                             False, lambda oContext, iRecords: getSfdcOpportunityIds(None, oContext)),
+    ("getSfdcProfileIds",                                 False, lambda oContext, iRecords: getSfdcProfileIds(None, oContext)),
+    ("getSfdcRoleIds",                                    False, lambda oContext, iRecords: getSfdcRoleIds(None, oContext)),
+    ("getSfdcUserIds",                                    False, lambda oContext, iRecords: getSfdcUserIds(None, oContext)),
+    ("getSfdcAllObjectIds (1 thread)",                    False, _benchmarkAllObjectIds),
+    ("getSfdcAllObjectIds (%d threads)" % SFDC_THREADS,   False, _benchmarkAllObjectIdsThreads),
+]
+
+
+#=============================================================================#
+#--
+# Function: runSfdcBenchmarks(...)
+#++
+#
+# Description:  Times every benchmark on responses of each size up to iMaxBytes,
+#               printing the time of each call and its growth from the size before
+#
+# Returns: LIST of (name, size label, records, seconds) TUPLES
+#
+#=============================================================================#
+def runSfdcBenchmarks(iMaxBytes):
+
+    aResults = []
+
+    # DICT of benchmark name : seconds at the size before
+    hPrevious = {}
+    iPreviousRecords = 0
+
+    for sSizeLabel, iTargetBytes in SFDC_BENCHMARK_SIZES:
+
+        if (iTargetBytes > iMaxBytes):
+            break
+        # end
+
+        oContext, iRecords = createSfdcContext(iTargetBytes)
+
+        # The findSfdcObjectId() benchmarks search the saved Account DICT
+        runSfdcBenchmarkQuietly(lambda oContext, iRecords: getSfdcAccountIds(None, oContext), oContext, iRecords)
+
+        print2("")
+        print2("Responses %s: about %d records of each of %d Object types" % (sSizeLabel, iRecords, len(SFDC_OBJECT_TYPES)))
+
+        for sName, bCached, fBenchmark in SFDC_BENCHMARKS:
+
+            if (bCached == True):
+                sCacheDir = tempfile.mktemp()
+                oCache = enableSfdcIdCache(sCacheDir, "benchmark")
+                try:
+                    runSfdcBenchmarkQuietly(fBenchmark, oContext, iRecords)     # Fill the cache
+                    fSeconds = timeSfdcBenchmark(fBenchmark, oContext, iRecords)
+                finally:
+                    disableSfdcIdCache()
+                    for sObjectType, sReadSoaTestDataSourceName, sReadVariableName, sWriteVariableName, sTagNameKey, sTagNameValue in SFDC_OBJECT_TYPES:
+                        oCache.remove(sObjectType)
+                    # end
+                    if (os.path.isdir(sCacheDir)):
+                        os.rmdir(sCacheDir)
+                    # end
+                # end
+            else:
+                fSeconds = timeSfdcBenchmark(fBenchmark, oContext, iRecords)
+            # end
+
+            aResults.append((sName, sSizeLabel, iRecords, fSeconds))
+
+            sGrowth = ""
+            if (hPrevious.has_key(sName)):
+                sGrowth = "x%.1f time for x%.1f records" % (fSeconds / hPrevious[sName], float(iRecords) / iPreviousRecords)
+            # end
+            hPrevious[sName] = fSeconds
+
+            print2("  %-44s %12.3f ms %14.0f records/s   %s" % (sName, fSeconds * 1000, iRecords / fSeconds, sGrowth))
+
+        # end
+
+        iPreviousRecords = iRecords
+
+    # end
+
+    return aResults
+
+# END method - runSfdcBenchmarks()
+
+
+#=============================================================================#
+#--
+# Function: reportSfdcScaling(...)
+#++
+#
+# Description:  Prints the scaling exponent of each benchmark between its smallest and
+#               largest size, (time grows as records ** exponent)
+#
+# Returns: INTEGER - The number of SUPERLINEAR benchmarks
+#
+#=============================================================================#
+def reportSfdcScaling(aResults):
+
+    # DICTs of benchmark name : (records, seconds) at the smallest and largest size
+    hFirst = {}
+    hLast = {}
+    aNames = []
+    for sName, sSizeLabel, iRecords, fSeconds in aResults:
+        if (not hFirst.has_key(sName)):
+            hFirst[sName] = (iRecords, fSeconds)
+            aNames.append(sName)
+        # end
+        hLast[sName] = (iRecords, fSeconds)
+    # end
+
+    print2("")
+    print2("Scaling, (time grows as records ** exponent):")
+
+    iSuperlinear = 0
+    for sName in aNames:
+        iFirstRecords, fFirstSeconds = hFirst[sName]
+        iLastRecords, fLastSeconds = hLast[sName]
+
+        if (iLastRecords <= iFirstRecords):
+            print2("  %-44s (needs more than one size)" % sName)
+            continue
+        # end
+
+        fExponent = math.log(fLastSeconds / fFirstSeconds) / math.log(float(iLastRecords) / iFirstRecords)
+
+        sScaling = ""
+        if (fExponent > SFDC_BENCHMARK_SUPERLINEAR):
+            sScaling = "SUPERLINEAR"
+            iSuperlinear = iSuperlinear + 1
+        # end
+
+        print2("  %-44s %6.2f  %s" % (sName, fExponent, sScaling))
+    # end
+
+    return iSuperlinear
+
+# END method - reportSfdcScaling()
+
+
+#=============================================================================#
+#--
+# Function: saveSfdcResults(...)
+#++
+#
+# Description:  Saves the timings to a CSV file, one line of benchmark name,
+#               size label, records and seconds per result
+#
+#=============================================================================#
+def saveSfdcResults(sFilePath, aResults):
+
+    oFileObject = open(sFilePath, "w")
+    try:
+        oFileObject.write("benchmark,size,records,seconds\n")
+        for sName, sSizeLabel, iRecords, fSeconds in aResults:
+            oFileObject.write('"%s",%s,%d,%.6f\n' % (sName, sSizeLabel, iRecords, fSeconds))
+        # end
+    finally:
+        oFileObject.close()
+    # end
+
+# END method - saveSfdcResults()
+
+
+#=============================================================================#
+# Main code section
+#=============================================================================#
+
+if (__name__ == "__main__"):
+
+    iMaxBytes = 4 * 1024 * 1024
+    sCSVFilePath = None
+
+    aArguments = sys.argv[1:]
+    while (aArguments != []):
+        sArgument = aArguments.pop(0)
+        if (sArgument == "--max-size"):
+            iMaxBytes = parseSize(aArguments.pop(0))
+        elif (sArgument == "--csv"):
+            sCSVFilePath = aArguments.pop(0)
+        else:
+            print2("Unknown option: " + sArgument)
+            sys.exit(2)
+        # end
+    # end
+
+    aResults = runSfdcBenchmarks(iMaxBytes)
+    reportSfdcScaling(aResults)
+
+    if (sCSVFilePath != None):
+        saveSfdcResults(sCSVFilePath, aResults)
+        print2("")
+        print2("Saved timings: " + sCSVFilePath)
+    # end
+
+# end
+
+#=============================================================================#
+#======================= END =================================================#
+#=============================================================================#
+
+# END File - PyWorks_sfdc_benchmark.py
@@ -0,0 +1,490 @@
+#!/usr/bin/python
+#--
+#=============================================================================#
+# File: PyWorks_xml_benchmark.py
+#
+#  Copyright (c) 2008-2011, Joe DiMauro
+#  All rights reserved.
+#
+# Description: Benchmarks for the PyWorks WebUtilities XML methods.
+#
+#    Generates SFDC style SOAP query responses of fixed sizes (1 KB up to 200 MB),
+#    times each of the XML methods on them, and reports the throughput in MB/s
+#    and records/s. The results can be saved as a baseline, and later runs are
+#    compared against it to catch performance regressions.
+#
+#    The responses are built the same way on every run, (no random data), so
+#    the results of different runs and releases can be compared.
+#
+# Execution:   From the src/Benchmark directory, with src/Lib on the PYTHONPATH:
+#                   jython PyWorks_xml_benchmark.py [options]
+#
+#              Options:
+#                   --max-size SIZE    Largest response to time, e.g. 1MB, 16MB or 200MB (default 16MB)
+#                   --save-baseline    Save the results as the new baseline
+#                   --tolerance N      Fraction slower than the baseline reported as SLOWER (default 0.25)
+#
+#              See README_benchmark.txt
+#
+#=============================================================================#
+
+#=============================================================================#
+# Import section
+# Entries for additional files or methods needed by this benchmark
+#=============================================================================#
+
+import os                           # Adds ability to access OS
+import sys
+import time                         # Add ability to get/format Time
+import tempfile
+
+# PyWorks
+from PyWorks_Utilities import print2    # PyWorks General Utilities
+from PyWorks_WebUtilities import *      # PyWorks Web Utilities
+#=============================================================================#
+
+#=============================================================================#
+# Global Variables section
+#=============================================================================#
+
+# Define values for True/False since they were not defined in Jython2.2.1
+True = 1
+False = 0
+
+global VERBOSE
+VERBOSE = False
+
+# Sizes of the generated responses, as (label, number of bytes)
+BENCHMARK_SIZES = [("1KB", 1024),
+                   ("64KB", 64 * 1024),
+                   ("1MB", 1024 * 1024),
+                   ("16MB", 16 * 1024 * 1024),
+                   ("200MB", 200 * 1024 * 1024)]
+
+# Each method is timed for at least this many seconds, (and at most BENCHMARK_MAX_RUNS runs),
+# and the fastest run is reported
+BENCHMARK_MIN_SECONDS = 0.5
+BENCHMARK_MAX_RUNS = 1000
+
+# Fraction slower than the baseline reported as SLOWER
+BENCHMARK_TOLERANCE = 0.25
+
+# Baseline results, saved by --save-baseline
+BENCHMARK_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), "PyWorks_xml_benchmark_baseline.txt")
+
+# The fields of each generated record
+SFDC_FIELD_TAGS = ["sf:Id", "sf:Name", "sf:BillingCity", "sf:Phone"]
+
+_SFDC_RESPONSE_HEADER = ('<?xml version="1.0" encoding="UTF-8"?>'
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+    'xmlns="urn:partner.soap.sforce.com" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xmlns:sf="urn:sobject.partner.soap.sforce.com"><soapenv:Body><queryResponse>'
+    '<result xsi:type="QueryResult"><done>true</done><queryLocator xsi:nil="true"/>')
+_SFDC_RESPONSE_FOOTER = '<size>%d</size></result></queryResponse></soapenv:Body></soapenv:Envelope>'
+
+#=============================================================================#
+
+
+#=============================================================================#
+#--
+# Class: NullWriter()
+#++
+#
+# Description:  A file object that discards everything written to it, used in place of
+#               os.devnull, which Jython2.2.1 does not have.
+#
+# Usage Examples:
+#                   writeXMLRecords(NullWriter(), aRecords, "records", SFDC_FIELD_TAGS)
+#
+#=============================================================================#
+class NullWriter(object):
+    '''
+    A file object that discards everything written to it.
+    '''
+    
+    def close(self):
+        pass
+    # end close()
+    
+    def flush(self):
+        pass
+    # end flush()
+    
+    def write(self, sText):
+        pass
+    # end write()
+    
+    def writelines(self, aLines):
+        pass
+    # end writelines()
+    
+# END class - NullWriter
+
+
+#=============================================================================#
+#--
+# Function: generateSfdcQueryResponse(...)
+#++
+#
+# Description:  Generates an SFDC style SOAP query response of about iTargetBytes bytes.
+#               The same arguments always generate the same response.
+#
+#               Each record holds an sf:type, sf:Id and sf:Name, and most hold an sf:BillingCity.
+#               Every 10th Name holds an entity (&amp;) and every 13th record has an
+#               empty, self-closing <sf:Phone/>, so the responses are not all alike.
+#
+# Returns: TUPLE - (STRING - The response, INTEGER - The number of records in it)
+#
+# Syntax: iTargetBytes = INTEGER - The size of the response to generate
+#         sObjectType = STRING - The SFDC object type of the records
+#
+# Usage Examples:
+#                   sXML, iRecords = generateSfdcQueryResponse(1024 * 1024)
+#
+#=============================================================================#
+def generateSfdcQueryResponse(iTargetBytes, sObjectType="Account"):
+    '''
+    Generates an SFDC style SOAP query response of about iTargetBytes bytes
+    '''
+    
+    sRecordStart = '<records xsi:type="sf:sObject"><sf:type>' + sObjectType + '</sf:type>'
+    
+    aParts = [_SFDC_RESPONSE_HEADER]
+    iBytes = len(_SFDC_RESPONSE_HEADER) + len(_SFDC_RESPONSE_FOOTER)
+    iRecords = 0
+    
+    while (iBytes < iTargetBytes):
+        
+        aRecord = [sRecordStart, '<sf:Id>001%015d</sf:Id>' % iRecords]
+        
+        if ((iRecords % 10) == 9):
+            aRecord.append('<sf:Name>' + sObjectType + ' %d &amp; Co</sf:Name>' % iRecords)
+        else:
+            aRecord.append('<sf:Name>' + sObjectType + ' %d</sf:Name>' % iRecords)
+        # end
+        
+        if ((iRecords % 7) != 6):
+            aRecord.append('<sf:BillingCity>City %d</sf:BillingCity>' % (iRecords % 500))
+        # end
+        
+        if ((iRecords % 13) == 12):
+            aRecord.append('<sf:Phone/>')
+        # end
+        
+        aRecord.append('</records>')
+        
+        sRecord = "".join(aRecord)
+        aParts.append(sRecord)
+        iBytes = iBytes + len(sRecord)
+        iRecords = iRecords + 1
+        
+    # end
+    
+    aParts.append(_SFDC_RESPONSE_FOOTER % iRecords)
+    
+    return ("".join(aParts), iRecords)
+    
+# END method - generateSfdcQueryResponse()
+
+
+#=============================================================================#
+#--
+# Function: timeBenchmark(...)
+#++
+#
+# Description:  Runs a benchmark repeatedly, for at least BENCHMARK_MIN_SECONDS,
+#               and returns the time of the fastest run in seconds
+#
+#=============================================================================#
+def timeBenchmark(fBenchmark, sXML, sFilePath):
+    
+    fBest = None
+    fTotal = 0.0
+    iRuns = 0
+    
+    while ((fTotal < BENCHMARK_MIN_SECONDS) and (iRuns < BENCHMARK_MAX_RUNS)):
+        
+        fStart = time.time()
+        fBenchmark(sXML, sFilePath)
+        fElapsed = time.time() - fStart
+        
+        if ((fBest == None) or (fElapsed < fBest)):
+            fBest = fElapsed
+        # end
+        
+        fTotal = fTotal + fElapsed
+        iRuns = iRuns + 1
+        
+    # end
+    
+    # Timer resolution
+    return max(fBest, 0.000001)
+    
+# END method - timeBenchmark()
+
+
+#=============================================================================#
+# The benchmarks, as (name, number of times the response is processed,
+# True to run with enableXMLCache(), function)
+# Each function takes the response as a STRING and the name of a file holding it
+#=============================================================================#
+
+def _benchmarkBuild(sXML, sFilePath):
+    buildXMLRecords(iterXMLRecords(sXML, "records", SFDC_FIELD_TAGS), "records", SFDC_FIELD_TAGS)
+# end
+
+def _benchmarkWrite(sXML, sFilePath):
+    oFileObject = NullWriter()
+    try:
+        writeXMLRecords(oFileObject, iterXMLRecords(sXML, "records", SFDC_FIELD_TAGS), "records", SFDC_FIELD_TAGS)
+    finally:
+        oFileObject.close()
+    # end
+# end
+
+def _benchmarkXMLDocument(sXML, sFilePath):
+    oDocument = XMLDocument(sXML)
+    oDocument.getMultipleXMLTagValues("sf:Id")
+    oDocument.getMultipleXMLTagValues("sf:Name")
+# end
+
+BENCHMARKS = [
+    ("areTagsInXML",                              1, False, lambda sXML, sFilePath: areTagsInXML(sXML, ["size", "sf:Bogus"])),
+    ("buildXMLRecords (from iterXMLRecords)",     1, False, _benchmarkBuild),
+    ("compileXMLPath(result/records/Id)",         1, False, lambda sXML, sFilePath: compileXMLPath("result/records/Id").getValues(sXML)),
+    ("countXMLTags",                              1, False, lambda sXML, sFilePath: countXMLTags(sXML, "sf:Id")),
+    ("countXMLTagsForTags",                       1, False, lambda sXML, sFilePath: countXMLTagsForTags(sXML, SFDC_FIELD_TAGS)),
+    ("decodeXMLEntities",                         1, False, lambda sXML, sFilePath: decodeXMLEntities(sXML)),
+    ("escapeXMLValue",                            1, False, lambda sXML, sFilePath: escapeXMLValue(sXML)),
+    ("getMultipleXMLTagSpans",                    1, False, lambda sXML, sFilePath: getMultipleXMLTagSpans(sXML, "sf:Id")),
+    ("getMultipleXMLTagValues",                   1, False, lambda sXML, sFilePath: getMultipleXMLTagValues(sXML, "sf:Id")),
+    ("getMultipleXMLTagValues (all options)",     1, False, lambda sXML, sFilePath: getMultipleXMLTagValues(sXML, "Id", True, True, True, True)),
+    ("getMultipleXMLTagValues (cached)",          1, True , lambda sXML, sFilePath: getMultipleXMLTagValues(sXML, "sf:Id")),
+    ("getMultipleXMLTagValuesBatch (4 files)",    4, False, lambda sXML, sFilePath: getMultipleXMLTagValuesBatch([sFilePath] * 4, SFDC_FIELD_TAGS)),
+    ("getMultipleXMLTagValuesForTags",            1, False, lambda sXML, sFilePath: getMultipleXMLTagValuesForTags(sXML, SFDC_FIELD_TAGS)),
+    ("getMultipleXMLTagValuesFromFile",           1, False, lambda sXML, sFilePath: getMultipleXMLTagValuesFromFile(sFilePath, "sf:Id")),
+    ("getXMLTagValue (last tag)",                 1, False, lambda sXML, sFilePath: getXMLTagValue(sXML, "size")),
+    ("isTagInXML (missing tag)",                  1, False, lambda sXML, sFilePath: isTagInXML(sXML, "sf:Bogus")),
+    ("iterXMLRecords",                            1, False, lambda sXML, sFilePath: list(iterXMLRecords(sXML, "records", SFDC_FIELD_TAGS))),
+    ("iterXMLTagValues (file)",                   1, False, lambda sXML, sFilePath: list(iterXMLTagValues(sFilePath, "sf:Id"))),
+    ("iterXMLTagValuesForTags (file)",            1, False, lambda sXML, sFilePath: list(iterXMLTagValuesForTags(sFilePath, SFDC_FIELD_TAGS))),
+    ("writeXMLRecords (from iterXMLRecords)",     1, False, _benchmarkWrite),
+    ("XMLDocument",                               1, False, _benchmarkXMLDocument),
+]
+
+
+#=============================================================================#
+#--
+# Function: readBaseline(...)
+#++
+#
+# Description:  Reads the baseline results saved by saveBaseline()
+#
+# Returns: DICT of (benchmark name, size label) : MB/s, (empty if there is no baseline)
+#
+#=============================================================================#
+def readBaseline(sFilePath):
+    
+    hBaseline = {}
+    
+    if (os.path.exists(sFilePath) == False):
+        return hBaseline
+    # end
+    
+    oFileObject = open(sFilePath, "r")
+    try:
+        for sLine in oFileObject.readlines():
+            sLine = sLine.strip()
+            if ((sLine == "") or (sLine[:1] == "#")):
+                continue
+            # end
+            aFields = sLine.split("\t")
+            hBaseline[(aFields[0], aFields[1])] = float(aFields[2])
+        # end
+    finally:
+        oFileObject.close()
+    # end
+    
+    return hBaseline
+    
+# END method - readBaseline()
+
+
+#=============================================================================#
+#--
+# Function: saveBaseline(...)
+#++
+#
+# Description:  Saves the results of a run as the baseline, one tab separated line of
+#               benchmark name, size label, MB/s and records/s per result
+#
+#=============================================================================#
+def saveBaseline(sFilePath, aResults):
+    
+    oFileObject = open(sFilePath, "w")
+    try:
+        oFileObject.write("# PyWorks_xml_benchmark.py baseline, saved " + time.ctime() + "\n")
+        oFileObject.write("# benchmark\tsize\tMB/s\trecords/s\n")
+        for sName, sSizeLabel, fMBPerSecond, fRecordsPerSecond in aResults:
+            oFileObject.write("%s\t%s\t%.3f\t%.1f\n" % (sName, sSizeLabel, fMBPerSecond, fRecordsPerSecond))
+        # end
+    finally:
+        oFileObject.close()
+    # end
+    
+# END method - saveBaseline()
+
+
+#=============================================================================#
+#--
+# Function: runBenchmarks(...)
+#++
+#
+# Description:  Times every benchmark on a response of each size up to iMaxBytes,
+#               printing the throughput and the change from the baseline
+#
+# Returns: TUPLE - (LIST of (name, size label, MB/s, records/s) TUPLES,
+#                   INTEGER - number of results slower than the baseline by more than fTolerance)
+#
+#=============================================================================#
+def runBenchmarks(iMaxBytes, hBaseline, fTolerance=BENCHMARK_TOLERANCE):
+    
+    aResults = []
+    iSlower = 0
+    
+    for sSizeLabel, iTargetBytes in BENCHMARK_SIZES:
+        
+        if (iTargetBytes > iMaxBytes):
+            break
+        # end
+        
+        sXML, iRecords = generateSfdcQueryResponse(iTargetBytes)
+        fMegabytes = len(sXML) / (1024.0 * 1024.0)
+        
+        print2("")
+        print2("Response %s: %d bytes, %d records" % (sSizeLabel, len(sXML), iRecords))
+        
+        sFilePath = tempfile.mktemp(".xml")
+        oFileObject = open(sFilePath, "wb")
+        oFileObject.write(sXML)
+        oFileObject.close()
+        
+        try:
+            for sName, iCopies, bCached, fBenchmark in BENCHMARKS:
+                
+                if (bCached == True):
+                    enableXMLCache(XML_CACHE_MAX_ENTRIES, len(sXML) + 1024)
+                    try:
+                        fBenchmark(sXML, sFilePath)     # Fill the cache
+                        fSeconds = timeBenchmark(fBenchmark, sXML, sFilePath)
+                    finally:
+                        disableXMLCache()
+                    # end
+                else:
+                    fSeconds = timeBenchmark(fBenchmark, sXML, sFilePath)
+                # end
+                
+                fMBPerSecond = (fMegabytes * iCopies) / fSeconds
+                fRecordsPerSecond = (iRecords * iCopies) / fSeconds
+                aResults.append((sName, sSizeLabel, fMBPerSecond, fRecordsPerSecond))
+                
+                sCompare = ""
+                fBaseline = hBaseline.get((sName, sSizeLabel))
+                if (fBaseline != None):
+                    fChange = (fMBPerSecond - fBaseline) / fBaseline
+                    sCompare = "%+6.0f%% vs baseline" % (fChange * 100)
+                    if (fChange < -fTolerance):
+                        sCompare = sCompare + "  SLOWER"
+                        iSlower = iSlower + 1
+                    # end
+                # end
+                
+                print2("  %-42s %10.1f MB/s %14.0f records/s  %s" % (sName, fMBPerSecond, fRecordsPerSecond, sCompare))
+                
+            # end
+        finally:
+            os.remove(sFilePath)
+        # end
+        
+    # end
+    
+    return (aResults, iSlower)
+    
+# END method - runBenchmarks()
+
+
+#=============================================================================#
+#--
+# Function: parseSize(...)
+#++
+#
+# Description:  Returns the number of bytes for a size like '200MB', '64KB' or '1024'
+#
+#=============================================================================#
+def parseSize(sSize):
+    
+    sSize = sSize.strip().upper()
+    
+    if (sSize[-2:] == "MB"):
+        return int(sSize[:-2]) * 1024 * 1024
+    # end
+    if (sSize[-2:] == "KB"):
+        return int(sSize[:-2]) * 1024
+    # end
+    
+    return int(sSize)
+    
+# END method - parseSize()
+
+
+#=============================================================================#
+# Main code section
+#=============================================================================#
+
+if (__name__ == "__main__"):
+    
+    iMaxBytes = 16 * 1024 * 1024
+    bSaveBaseline = False
+    fTolerance = BENCHMARK_TOLERANCE
+    
+    aArguments = sys.argv[1:]
+    while (aArguments != []):
+        sArgument = aArguments.pop(0)
+        if (sArgument == "--max-size"):
+            iMaxBytes = parseSize(aArguments.pop(0))
+        elif (sArgument == "--save-baseline"):
+            bSaveBaseline = True
+        elif (sArgument == "--tolerance"):
+            fTolerance = float(aArguments.pop(0))
+        else:
+            print2("Unknown option: " + sArgument)
+            sys.exit(2)
+        # end
+    # end
+    
+    hBaseline = readBaseline(BENCHMARK_BASELINE_FILE)
+    if (hBaseline == {}):
+        print2("No baseline found: " + BENCHMARK_BASELINE_FILE)
+    # end
+    
+    aResults, iSlower = runBenchmarks(iMaxBytes, hBaseline, fTolerance)
+    
+    if (bSaveBaseline == True):
+        saveBaseline(BENCHMARK_BASELINE_FILE, aResults)
+        print2("")
+        print2("Saved baseline: " + BENCHMARK_BASELINE_FILE)
+    # end
+    
+    if (iSlower > 0):
+        print2("")
+        print2(str(iSlower) + " results are more than " + str(int(fTolerance * 100)) + "% slower than the baseline")
+        sys.exit(1)
+    # end
+    
+# end
+
+#=============================================================================#
+#======================= END =================================================#
+#=============================================================================#
+
+# END File - PyWorks_xml_benchmark.py
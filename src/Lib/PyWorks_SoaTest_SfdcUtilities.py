@@ -21,15 +21,34 @@
 #  Key:   () = No parameters,  (...) = parameters required
 #
 # Functions:
+#    disableSfdcIdCache()
+#    disableSfdcMetrics()
+#    enableSfdcIdCache(...)
+#    enableSfdcMetrics(...)
 #    findSfdcObjectID(...)
+#    findSfdcObjectIdsFuzzy(...)
 #    getSfdcAccountIds(...)
+#    getSfdcAllObjectIds(...)
 #    getSfdcContactIds(...)
 #    getSfdcLeadIds(...)
 #    getSfdcOpportunityIds(...)
 #    getSfdcProfileIds(...)
+#    getSfdcQueryState(...)
 #    getSfdcRoleIds(...)
 #    getSfdcUserIds(...)
+#    isSfdcIdCacheFresh(...)
+#    markSfdcObjectIdsChanged(...)
+#    sfdc_MergeDictInSoaTestVar(...)
 #    sfdc_StoreDictInSoaTestVar(...)
+#    sfdc_StoreMultimapInSoaTestVar(...)
+#
+# Classes:
+#    SfdcIdCache(...)
+#    SfdcIdMultimap(...)
+#    SfdcMetrics(...)
+#    SfdcObjectIndex(...)
+#    SfdcTrigramIndex(...)
+#    SoaTestOfflineContext(...)
 #
 #++
 #=============================================================================#
@@ -40,18 +59,35 @@
 #=============================================================================#
 
 # Jython imports
-#import sys
+from __future__ import generators   # Jython2.2.1 needs this to use 'yield'
+import sys
 #import traceback
-#import os                           # Adds ability to set/get OS Variables
+import os                           # Adds ability to set/get OS Variables
 #from datetime import date, datetime, timedelta # Add ability to get/format Dates
-#import time                         # Add ability to get/format Time
+import time                         # Add ability to get/format Time
 #import random                       # Random number generator
-#import re                           # Regular expressions
+import re                           # Regular expressions
+import threading                    # Thread pool of getSfdcAllObjectIds()
+import Queue                        # Work queue of getSfdcAllObjectIds()
+
+# The files of the SfdcIdCache, the C version of pickle is faster when it is available
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+# end
+
+# The content hash of the SfdcIdCache, hashlib is not available in Jython2.2.1
+try:
+    from hashlib import md5 as _newContentHash
+except ImportError:
+    from md5 import new as _newContentHash
+# end
 
 # PyWorks imports
 #from PyWorks_Reflib import TIMESTAMP_STRING
-from PyWorks_Utilities import is_SOATest, print2, getMatchingKeyValue         # PyWorks General Utilities
-from PyWorks_WebUtilities import getMultipleXMLTagValues     # PyWorks Web Utilities
+from PyWorks_Utilities import is_SOATest, print2         # PyWorks General Utilities
+from PyWorks_WebUtilities import getMultipleXMLTagValuesForTags, iterXMLRecords     # PyWorks Web Utilities
 
 #
 # SOATest imports
@@ -76,361 +112,1093 @@ False = 0
 global VERBOSE
 VERBOSE = False
 
+# The XML tag enclosing each record of an SFDC query response, e.g. <records xsi:type="sf:Account">
+SFDC_RECORD_TAG_NAME = "records"
+
+# Appended to the name of the SOATest Variable holding a DICT of Name:Id pairs,
+# to name the Variable holding its SfdcObjectIndex, e.g. "SFDC: AccountIds_Index"
+SFDC_INDEX_VARIABLE_SUFFIX = "_Index"
+
+# Appended to the name of the SOATest Variable holding a DICT of Name:Id pairs,
+# to name the Variable holding its SfdcTrigramIndex, see findSfdcObjectIdsFuzzy()
+SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX = "_TrigramIndex"
+
+# Appended to the name of the SOATest Variable holding a DICT of Name:Id pairs,
+# to name the Variable holding its version, see markSfdcObjectIdsChanged()
+SFDC_VERSION_VARIABLE_SUFFIX = "_Version"
+
+# The SOATest Data Source the SFDC query responses are saved into
+SFDC_SAVED_DATA_SOURCE_NAME = "SFDC Saved Data"
+
+# The SFDC Object types whose Name:Id pairs are saved by getSfdcAccountIds(), ... getSfdcAllObjectIds(),
+# a LIST of TUPLES of:
+#    (Object type, Data Source name, Variable holding the query response XML,
+#     Variable to save the DICT into, Key XML tag, Value XML tag)
+# Append a TUPLE to save the Name:Id pairs of another Object type with getSfdcAllObjectIds()
+SFDC_OBJECT_TYPES = [
+    ("Account", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryAccount_XML", "SFDC: AccountIds", "sf:Name", "sf:Id"),
+    ("Contact", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryContact_XML", "SFDC: ContactIds", "sf:Name", "sf:Id"),
+    ("Lead", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryLead_XML", "SFDC: LeadIds", "sf:Name", "sf:Id"),
+    ("Opportunity", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryOpportunity_XML", "SFDC: OpportunityIds", "sf:Name", "sf:Id"),
+    ("Profile", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryProfile_XML", "SFDC: ProfileIds", "sf:Name", "sf:Id"),
+    ("Role", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryRole_XML", "SFDC: RoleIds", "sf:Name", "sf:Id"),
+    ("User", SFDC_SAVED_DATA_SOURCE_NAME, "SFDC: QueryUser_XML", "SFDC: UserIds", "sf:Username", "sf:Id"),
+    ]
+
+# The default number of threads building the DICTs in getSfdcAllObjectIds()
+SFDC_THREADS = 4
+
+# The default number of seconds a saved DICT is fresh, see enableSfdcIdCache()
+SFDC_ID_CACHE_TTL = 86400
+
+# The SfdcIdCache in use, or None when the cache is disabled
+_SFDC_ID_CACHE = None
+
+# The default SOATest Variable the per call metrics are saved into, see enableSfdcMetrics()
+SFDC_METRICS_VARIABLE_NAME = "SFDC: Metrics"
+
+# The SfdcMetrics in use, or None when the metrics are disabled
+_SFDC_METRICS = None
+
+# Appended to the name of the SOATest Variable holding a DICT merged from query batches,
+# to name the Variable holding the query's state, see getSfdcQueryState()
+SFDC_QUERY_STATE_VARIABLE_SUFFIX = "_QueryState"
+
+# The QueryResult values near the start of a query batch, group(1) = setting
+# (the queryLocator is self-closing, <queryLocator xsi:nil="true"/>, in the last batch)
+_SFDC_DONE_PATTERN = re.compile(r"<(?:[^\s<>/:]+:)?done(?:\s[^<>]*)?>\s*([^<\s]*)\s*<")
+_SFDC_QUERY_LOCATOR_PATTERN = re.compile(r"<(?:[^\s<>/:]+:)?queryLocator(?:\s[^<>]*?)?(?:/>|>([^<]*)<)")
+
+# The SOAP Body tags of the responses to query() or queryAll(), and to queryMore()
+_SFDC_QUERY_RESPONSE_PATTERN = re.compile(r"<(?:[^\s<>/:]+:)?(query|queryAll|queryMore)Response[\s/>]")
+
+# The SOAP Body tag of a SOAP Fault, e.g. <soapenv:Fault>
+_SFDC_FAULT_PATTERN = re.compile(r"<(?:[^\s<>/:]+:)?Fault[\s/>]")
+
+# The number of characters at the start of a response searched for its SOAP Body tag
+_SFDC_RESPONSE_HEAD_LENGTH = 4096
+
+
 #=============================================================================#
 #--
-# Function: findSfdcObjectId(...)
+# Function: _buildSfdcLookupDicts(...)
 #++
 #
-# Description: Reads a SOATest Project Variable that contains a DICT of an SFDC Object's Name:Id pairs,
-#              Searches the DICT for a Key that matches the specified Object's Name
-#              Returns a LIST with the matching Object Name and it's ID value.
-#
-# Returns: LIST    - LIST[0] = STRING - The matching Key
-#                    LIST[1] = STRING - The matching Key's Value
-#
-# Syntax: sReadVariableName = STRING - The name of the SOATest Variable that contains
-#                                        the Dictionary of Name:Id pairs to search
-#         sNameKey = STRING - The Key name to search for (May be a partial match)
-#         bCaseSensitive = BOLEAN - True to perform a case sensitive search for the Key, False to ignore case
-#
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved as a DICT of Name:Id pairs into a SOATest Variable
-#    4. Call this function from a SOAtest Extension, by referencing this file, and selecting this function.
-#
-# Usage Examples:
+# Description:  Thread body of getSfdcAllObjectIds(), builds the DICT of each
+#               (Object type, XML, Key tag, Value tag) TUPLE taken from the queue
+#               until it is empty, saving the DICT, or the error STRING, into hResults,
+#               the seconds it took into hParseSeconds, whether the SfdcIdCache
+#               supplied the DICT into hFromCache, and why a SOAP Fault or empty
+#               response holds no Ids into hResponseErrors
 #
 #=============================================================================#
-def findSfdcObjectId(context, sReadVariableName, sNameKey, bCaseSensitive=True):
-    '''
-    RReads a SOATest Project Variable that contains a DICT of an SFDC Object's Name:Id pairs,
-    Searches the DICT for a Key that matches the specified Object's Name 
-    Returns a LIST with the matching Object Name and it's ID value.
-    '''
-    
-    # VERBOSE = True
+def _buildSfdcLookupDicts(oWorkQueue, hResults, hParseSeconds, hFromCache, hResponseErrors):
     
-    # Set a default value
-    aMatchingNameValuePair = ["", ""]
-    
-    # Retrieve the DICT from the SOATest variable
-    hNameValuePairs = context.get(sReadVariableName)
-    
-    # Perform the Search
-    aMatchingNameValuePair =  getMatchingKeyValue(hNameValuePairs,sNameKey, bCaseSensitive)
-    
-    if(VERBOSE == True):
-        print2("\tFound Name:Id pair of..")
-        print2(aMatchingNameValuePair)
+    while True:
+        try:
+            sObjectType, sXML, sTagNameKey, sTagNameValue = oWorkQueue.get_nowait()
+        except Queue.Empty:
+            return
+        # end
+        
+        fStart = time.time()
+        try:
+            hResults[sObjectType], hFromCache[sObjectType] = _parseSfdcObjectIds(sObjectType, sXML, sTagNameKey, sTagNameValue)
+            sError = _getSfdcResponseError(sXML, hResults[sObjectType])
+            if (sError != None):
+                hResponseErrors[sObjectType] = sError
+            # end
+        except:
+            hResults[sObjectType] = str(sys.exc_info()[1])
+        # end
+        hParseSeconds[sObjectType] = time.time() - fStart
     # end
     
-    return aMatchingNameValuePair
+# END method - _buildSfdcLookupDicts()
 
-# ENd - Function - findSfdcObjectId
 
 #=============================================================================#
 #--
-# Function: getSfdcAccountIds(...)
+# Function: _getSfdcIdMultimap(...)
 #++
 #
-# Description: Reads the SFDC Account Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
-#              its associated Name.
-#
-# Returns: BOOLEAN - True on success, otherwise False
+# Description:  Returns a SfdcIdMultimap of the Key and Value tag settings of each record
+#               of an SFDC query response, see sfdc_StoreMultimapInSoaTestVar()
 #
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved into a SOATest Data Source
-#    4. Call this function from a SOAtest Extension, by referencing this file, and
-#       selecting this function.
 #=============================================================================#
-def getSfdcAccountIds(input, context):
-    
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import *
-    
-    
-    #VERBOSE = True
-    
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryAccount_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: AccountIds"
-    sTagNameKey = "sf:Name"
-    sTagNameValue = "sf:Id"
+def _getSfdcIdMultimap(sXML, sTagNameKey, sTagNameValue):
+    
+    oMultimap = SfdcIdMultimap()
+    iRecords = 0
+    for sKey, sValue in iterXMLRecords(sXML, SFDC_RECORD_TAG_NAME, [sTagNameKey, sTagNameValue]):
+        iRecords = iRecords + 1
+        
+        # Skip a record missing either of the tags
+        if ((sKey != None) and (sValue != None)):
+            oMultimap.add(sKey, sValue)
+        # end
+    # end
     
-    print2("\tSaving SFDC Account's Name and ID")
+    if (iRecords == 0):
+        
+        # Not a query response, pair the Keys and Values by the order of the tags
+        hTagValues = getMultipleXMLTagValuesForTags(sXML, [sTagNameKey, sTagNameValue])
+        for sKey, sValue in zip(hTagValues[sTagNameKey], hTagValues[sTagNameValue]):
+            oMultimap.add(sKey, sValue)
+        # end
+    # end
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    # Only the Names are kept, the reverse index is built again when needed
+    oMultimap.compact()
     
-    if(VERBOSE == True):
-        # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+    return oMultimap
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
-        print2("\tIterate over the DICT '" + sWriteVariableName + "'")
+# END method - _getSfdcIdMultimap()
+
+
+#=============================================================================#
+#--
+# Function: _getSfdcLookupDict(...)
+#++
+#
+# Description:  Returns the DICT of the Key and Value tag settings of each record
+#               of an SFDC query response, see sfdc_StoreDictInSoaTestVar()
+#
+#=============================================================================#
+def _getSfdcLookupDict(sXML, sTagNameKey, sTagNameValue):
+    
+    # Build the DICT from the Key and Value of each record, with a single scan of the XML
+    hLookupDict = {}
+    iRecords = 0
+    iSkipped = 0
+    for sKey, sValue in iterXMLRecords(sXML, SFDC_RECORD_TAG_NAME, [sTagNameKey, sTagNameValue]):
+        iRecords = iRecords + 1
+        
+        # Skip a record missing either of the tags
+        if ((sKey != None) and (sValue != None)):
+            hLookupDict[sKey] = sValue
+        else:
+            iSkipped = iSkipped + 1
+        # end
+    # end
     
-        for sKey, sValue in hUserIDs.iteritems():
-            print2("\t\t" + sKey + " = " + sValue)
+    if (iRecords == 0):
+        
+        # Not a query response, pair the Keys and Values by the order of the tags
+        hTagValues = getMultipleXMLTagValuesForTags(sXML, [sTagNameKey, sTagNameValue])
+        aKeyList = hTagValues[sTagNameKey]
+        aValueList = hTagValues[sTagNameValue]
+        
+        if(VERBOSE == True):
+            print2("aKeyList '" + str(aKeyList) + "'" )
+            print2("aValueList '" + str(aValueList) + "'" )
         # end
+        
+        # Create a DICT from the two LIST objects
+        hLookupDict = dict(zip(aKeyList, aValueList))
+        
+    elif(VERBOSE == True):
+        print2("Records: " + str(iRecords) + ", skipped: " + str(iSkipped))
     # end
     
-    return bStatus
-
-# End - Function - getSfdcAccountIds()
+    return hLookupDict
+    
+# END method - _getSfdcLookupDict()
 
 
 #=============================================================================#
 #--
-# Function: getSfdcContactIds(...)
+# Function: _getSfdcLookupDictVersion(...)
 #++
 #
-# Description: Reads the SFDC Contact Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
-#              its associated Name.
-#
-# Returns: BOOLEAN - True on success, otherwise False
+# Description:  Returns the version of the DICT saved in the SOATest Variable,
+#               (0 before it is first changed), see markSfdcObjectIdsChanged()
 #
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved into a SOATest Data Source
-#    4. Call this function from a SOAtest Extension, by referencing this file, and
-#       selecting this function.
 #=============================================================================#
-def getSfdcContactIds(input, context):
-    
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import *
-    
+def _getSfdcLookupDictVersion(context, sVariableName):
     
-    #VERBOSE = True
+    iVersion = context.get(sVariableName + SFDC_VERSION_VARIABLE_SUFFIX)
+    if (iVersion == None):
+        return 0
+    # end
     
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryContact_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: ContactIds"
-    sTagNameKey = "sf:Name"
-    sTagNameValue = "sf:Id"
+    return iVersion
     
-    print2("\tSaving SFDC Contact's Name and ID")
+# END method - _getSfdcLookupDictVersion()
+
+
+#=============================================================================#
+#--
+# Function: _getFreshSfdcObjectIds(...)
+#++
+#
+# Description:  Returns the DICT of Name:Id pairs of the Object type saved in the SfdcIdCache,
+#               or None when the cache is disabled, or holds no fresh DICT of that type
+#
+#=============================================================================#
+def _getFreshSfdcObjectIds(sObjectType):
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    oCache = _SFDC_ID_CACHE
+    if (oCache == None):
+        return None
+    # end
     
-    if(VERBOSE == True):
-        # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+    return oCache.getIds(sObjectType)
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
-        print2("\tIterate over the DICT '" + sWriteVariableName + "'")
+# END method - _getFreshSfdcObjectIds()
+
+
+#=============================================================================#
+#--
+# Function: _getSfdcObjectType(...)
+#++
+#
+# Description:  Returns the SFDC_OBJECT_TYPES TUPLE of the Object type, e.g. "Account"
+#
+#=============================================================================#
+def _getSfdcObjectType(sObjectType):
     
-        for sKey, sValue in hUserIDs.iteritems():
-            print2("\t\t" + sKey + " = " + sValue)
+    for tObjectType in SFDC_OBJECT_TYPES:
+        if (tObjectType[0] == sObjectType):
+            return tObjectType
         # end
     # end
     
-    return bStatus
-
-# End - Function - getSfdcAccountIds()
+    raise ValueError("Unknown SFDC Object type: '" + sObjectType + "'")
+    
+# END method - _getSfdcObjectType()
 
 
 #=============================================================================#
 #--
-# Function: getSfdcLeadIds(...)
+# Function: _getSfdcResponseError(...)
 #++
 #
-# Description: Reads the SFDC Lead Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
-#              its associated Name.
-#
-# Returns: BOOLEAN - True on success, otherwise False
+# Description:  Returns a STRING saying why the query response holds no Ids, (it is a
+#               SOAP Fault, or its DICT of Name:Id pairs is empty), or None when it holds some
 #
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved into a SOATest Data Source
-#    4. Call this function from a SOAtest Extension, by referencing this file, and
-#       selecting this function.
 #=============================================================================#
-def getSfdcLeadIds(input, context):
-    
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import *
-    
-    
-    #VERBOSE = True
-    
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryLead_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: LeadIds"
-    sTagNameKey = "sf:Name"
-    sTagNameValue = "sf:Id"
+def _getSfdcResponseError(sXML, hLookupDict):
     
-    print2("\tSaving SFDC Lead's Name and ID")
+    if (_SFDC_FAULT_PATTERN.search(sXML, 0, _SFDC_RESPONSE_HEAD_LENGTH) != None):
+        return "the query response is a SOAP Fault"
+    # end
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    if (len(hLookupDict) == 0):
+        return "the query response holds no records"
+    # end
     
-    if(VERBOSE == True):
-        # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+    return None
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
-        print2("\tIterate over the DICT '" + sWriteVariableName + "'")
+# END method - _getSfdcResponseError()
+
+
+#=============================================================================#
+#--
+# Function: _getSfdcResponseXML(...)
+#++
+#
+# Description:  Returns the SOAP Response XML STRING saved in the SOATest Data Source,
+#               (only converting it when it is not a STRING already, to avoid copying a large response)
+#
+#=============================================================================#
+def _getSfdcResponseXML(context, sReadSoaTestDataSourceName, sReadVariableName):
     
-        for sKey, sValue in hUserIDs.iteritems():
-            print2("\t\t" + sKey + " = " + sValue)
-        # end
+    sXML = context.getValue(sReadSoaTestDataSourceName, sReadVariableName)
+    if (type(sXML) not in (type(""), type(u""))):
+        sXML = str(sXML)
     # end
     
-    return bStatus
-
-# End - Function - getSfdcAccountIds()
+    return sXML
+    
+# END method - _getSfdcResponseXML()
 
 
 #=============================================================================#
 #--
-# Function: getSfdcOpportunityIds(...)
+# Function: _parseSfdcObjectIds(...)
 #++
 #
-# Description: Reads the SFDC Opportunity Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
-#              its associated Name.
-#
-# Returns: BOOLEAN - True on success, otherwise False
+# Description:  Returns a TUPLE of the DICT of Name:Id pairs of the query response of the
+#               Object type, and True if the SfdcIdCache supplied it, otherwise False.
+#               When the SfdcIdCache is enabled, the DICT saved from the same response is
+#               returned without parsing it, otherwise the parsed DICT is saved in the cache,
+#               (only when the response is a query response holding records, so a SOAP Fault
+#               or an empty response is never used in place of the Ids of a later run).
 #
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved into a SOATest Data Source
-#    4. Call this function from a SOAtest Extension, by referencing this file, and
-#       selecting this function.
 #=============================================================================#
-def getSfdcOpportunityIds(input, context):
-    
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import *
+def _parseSfdcObjectIds(sObjectType, sXML, sTagNameKey, sTagNameValue):
     
+    oCache = _SFDC_ID_CACHE
+    if (oCache == None):
+        return (_getSfdcLookupDict(sXML, sTagNameKey, sTagNameValue), False)
+    # end
     
-    #VERBOSE = True
-    
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryOpportunity_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: OpportunityIds"
-    sTagNameKey = "sf:Name"
-    sTagNameValue = "sf:Id"
+    hLookupDict = oCache.getIds(sObjectType, sXML)
+    if (hLookupDict != None):
+        return (hLookupDict, True)
+    # end
     
-    print2("\tSaving SFDC Opportunity's Name and ID")
+    hLookupDict = _getSfdcLookupDict(sXML, sTagNameKey, sTagNameValue)
+    if ((_SFDC_QUERY_RESPONSE_PATTERN.search(sXML, 0, _SFDC_RESPONSE_HEAD_LENGTH) != None)
+            and (_getSfdcResponseError(sXML, hLookupDict) == None)):
+        oCache.putIds(sObjectType, hLookupDict, sXML)
+    # end
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    return (hLookupDict, False)
     
-    if(VERBOSE == True):
-        # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+# END method - _parseSfdcObjectIds()
+
+
+#=============================================================================#
+#--
+# Function: _putSfdcLookupDict(...)
+#++
+#
+# Description:  Saves the DICT, and a SfdcObjectIndex of it, into their SOATest Variables,
+#               and returns the DICT's new version
+#
+#=============================================================================#
+def _putSfdcLookupDict(context, sWriteVariableName, hLookupDict):
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
-        print2("\tIterate over the DICT '" + sWriteVariableName + "'")
+    context.put(sWriteVariableName, hLookupDict)
+    iVersion = markSfdcObjectIdsChanged(context, sWriteVariableName)
+    context.put(sWriteVariableName + SFDC_INDEX_VARIABLE_SUFFIX, SfdcObjectIndex(hLookupDict, iVersion))
     
-        for sKey, sValue in hUserIDs.iteritems():
-            print2("\t\t" + sKey + " = " + sValue)
-        # end
-    # end
+    return iVersion
     
-    return bStatus
-
-# End - Function - getSfdcAccountIds()
+# END method - _putSfdcLookupDict()
 
 
 #=============================================================================#
 #--
-# Function: getSfdcProfileIds(...)
+# Function: _storeSfdcObjectIds(...)
 #++
 #
-# Description: Reads the SFDC Profile Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
-#              its associated Name.
-#
-# Returns: BOOLEAN - True on success, otherwise False
+# Description:  Saves the DICT of Name:Id pairs of one of the SFDC_OBJECT_TYPES,
+#               the body of getSfdcAccountIds(), ... getSfdcUserIds(). Returns False
+#               when the query response is a SOAP Fault or holds no records.
 #
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved into a SOATest Data Source
-#    4. Call this function from a SOAtest Extension, by referencing this file, and
-#       selecting this function.
 #=============================================================================#
-def getSfdcProfileIds(input, context):
+def _storeSfdcObjectIds(context, sObjectType):
+    
+    #VERBOSE = True
     
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import *
+    sObjectType, sReadSoaTestDataSourceName, sReadVariableName, sWriteVariableName, sTagNameKey, sTagNameValue = _getSfdcObjectType(sObjectType)
     
+    print2("\tSaving SFDC " + sObjectType + "'s Name and ID")
     
-    #VERBOSE = True
+    oMetrics = _SFDC_METRICS
+    if (oMetrics != None):
+        fStart = time.time()
+    # end
+    
+    # Use the cached DICT while it is fresh, without reading the query response
+    sXML = ""
+    hLookupDict = _getFreshSfdcObjectIds(sObjectType)
+    if (hLookupDict != None):
+        print2("\tLoaded SFDC " + sObjectType + "'s Name and ID from the cache")
+        bFromCache = True
+    else:
+        sXML = _getSfdcResponseXML(context, sReadSoaTestDataSourceName, sReadVariableName)
+        hLookupDict, bFromCache = _parseSfdcObjectIds(sObjectType, sXML, sTagNameKey, sTagNameValue)
+    # end
+    
+    if (oMetrics != None):
+        fParsed = time.time()
+    # end
     
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryProfile_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: ProfileIds"
-    sTagNameKey = "sf:Name"
-    sTagNameValue = "sf:Id"
+    _putSfdcLookupDict(context, sWriteVariableName, hLookupDict)
+    bStatus = True
     
-    print2("\tSaving SFDC Profile's Name and ID")
+    if (bFromCache == False):
+        sError = _getSfdcResponseError(sXML, hLookupDict)
+        if (sError != None):
+            print2("*** WARNING: Unable to save SFDC " + sObjectType + "'s Name and ID from '" + sReadVariableName + "': " + sError)
+            bStatus = False
+        # end
+    # end
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    if (oMetrics != None):
+        oMetrics.record(context, "getSfdc" + sObjectType + "Ids", sWriteVariableName, len(sXML), len(hLookupDict),
+                        fParsed - fStart, time.time() - fParsed, bFromCache)
+    # end
     
     if(VERBOSE == True):
         # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+        hIDs = context.get(sWriteVariableName)
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
+        print2("\tEntries in DICT = " + str(len(hIDs)))
         print2("\tIterate over the DICT '" + sWriteVariableName + "'")
     
-        for sKey, sValue in hUserIDs.iteritems():
+        for sKey, sValue in hIDs.iteritems():
             print2("\t\t" + sKey + " = " + sValue)
         # end
     # end
     
     return bStatus
-
-# End - Function - getSfdcAccountIds()
+    
+# END method - _storeSfdcObjectIds()
 
 
 #=============================================================================#
 #--
-# Function: getSfdcRoleIds(...)
+# Function: disableSfdcIdCache()
 #++
 #
-# Description: Reads the SFDC Role Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
+# Description:  Turns off the on-disk cache of Name:Id DICTs started by enableSfdcIdCache(),
+#               the files already saved are kept.
+#
+# Returns: None
+#
+# Syntax: N/A
+#
+# Usage Examples:
+#                   disableSfdcIdCache()
+#
+#=============================================================================#
+def disableSfdcIdCache():
+    '''
+    Turns off the on-disk cache of SFDC Name:Id DICTs.
+    '''
+    
+    global _SFDC_ID_CACHE
+    
+    _SFDC_ID_CACHE = None
+    
+# END method - disableSfdcIdCache()
+
+
+#=============================================================================#
+#--
+# Function: disableSfdcMetrics()
+#++
+#
+# Description:  Turns off the per call metrics started by enableSfdcMetrics(),
+#               the metrics already saved are kept.
+#
+# Returns: None
+#
+# Syntax: N/A
+#
+# Usage Examples:
+#                   disableSfdcMetrics()
+#
+#=============================================================================#
+def disableSfdcMetrics():
+    '''
+    Turns off the per call metrics of the SFDC functions.
+    '''
+    
+    global _SFDC_METRICS
+    
+    _SFDC_METRICS = None
+    
+# END method - disableSfdcMetrics()
+
+
+#=============================================================================#
+#--
+# Function: enableSfdcIdCache(...)
+#++
+#
+# Description:  Turns on an on-disk cache of the Name:Id DICTs saved by getSfdcAccountIds(), ...
+#               getSfdcUserIds() and getSfdcAllObjectIds(), for sandboxes where those
+#               Objects rarely change between test runs.
+#
+#               Each DICT is saved into its own file in sCacheDir, keyed by the SFDC Org and
+#               the Object type, along with an MD5 hash of the query response it was parsed from.
+#               While the file is younger than iTTL seconds the DICT is loaded from it, without
+#               reading or parsing the query response. After that, a query response with the
+#               same hash reuses the saved DICT, (and makes it fresh again), without parsing it.
+#
+#               Caching is off by default. Use isSfdcIdCacheFresh() to skip the SOATest
+#               query of an Object type whose DICT is still fresh.
+#
+# Returns: SfdcIdCache - The cache now in use
+#
+# Syntax: sCacheDir = STRING - The folder holding the cache files, created when needed
+#         sOrgId = STRING - Identifies the SFDC Org, e.g. its Organization Id or the login user name
+#         iTTL = INTEGER - The number of seconds a saved DICT is fresh, (default SFDC_ID_CACHE_TTL)
+#
+# Usage Examples:
+#                From the first SOATest Extension of the suite:
+#                    enableSfdcIdCache("C:/SOATest/cache", "00D30000000abcd")
+#                    enableSfdcIdCache("C:/SOATest/cache", "00D30000000abcd", 4 * 60 * 60)
+#
+#=============================================================================#
+def enableSfdcIdCache(sCacheDir, sOrgId, iTTL=SFDC_ID_CACHE_TTL):
+    '''
+    Turns on an on-disk cache of SFDC Name:Id DICTs, keyed by Org and Object type.
+    '''
+    
+    global _SFDC_ID_CACHE
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - enableSfdcIdCache:")
+        print2("  sCacheDir: " + sCacheDir)
+        print2("  sOrgId: " + sOrgId)
+        print2("  iTTL: " + str(iTTL))
+    # end
+    
+    _SFDC_ID_CACHE = SfdcIdCache(sCacheDir, sOrgId, iTTL)
+    
+    return _SFDC_ID_CACHE
+    
+# END method - enableSfdcIdCache()
+
+
+#=============================================================================#
+#--
+# Function: enableSfdcMetrics(...)
+#++
+#
+# Description:  Turns on the per call metrics of getSfdcAccountIds(), ... getSfdcUserIds(),
+#               getSfdcAllObjectIds(), sfdc_MergeDictInSoaTestVar(), sfdc_StoreDictInSoaTestVar()
+#               and sfdc_StoreMultimapInSoaTestVar(), to find the steps, and the Orgs or queries,
+#               that slow down the set up of a suite.
+#
+#               Each call records the size of the query response, the number of records saved,
+#               the seconds spent parsing the response, (or loading the DICT from the SfdcIdCache),
+#               and the seconds spent saving the DICT and its index, see SfdcMetrics.
+#               The metrics are appended to the LIST in the SOATest Variable sVariableName,
+#               and to the tab separated file sFilePath, when it is given.
+#
+#               Metrics are off by default, and then cost a single check per call.
+#
+# Returns: SfdcMetrics - The metrics now in use
+#
+# Syntax: sFilePath = STRING - The file the metrics are appended to, (default None, for no file)
+#         sVariableName = STRING - The SOATest Variable holding the LIST of metrics,
+#                                  (default SFDC_METRICS_VARIABLE_NAME, None for no Variable)
+#
+# Usage Examples:
+#                From the first SOATest Extension of the suite:
+#                    enableSfdcMetrics()
+#                    enableSfdcMetrics("C:/SOATest/reports/sfdc_metrics.txt")
+#
+#                From a script, to fail on a slow step or a huge query:
+#                    oMetrics = enableSfdcMetrics("sfdc_metrics.txt")
+#                    getSfdcAllObjectIds(None, context)
+#                    bStatus = (len(oMetrics.getOverBudget(5.0, 50 * 1024 * 1024)) == 0)
+#
+#=============================================================================#
+def enableSfdcMetrics(sFilePath=None, sVariableName=SFDC_METRICS_VARIABLE_NAME):
+    '''
+    Turns on the per call metrics of the SFDC functions, saved into a SOATest Variable and/or a file.
+    '''
+    
+    global _SFDC_METRICS
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - enableSfdcMetrics:")
+        print2("  sFilePath: " + str(sFilePath))
+        print2("  sVariableName: " + str(sVariableName))
+    # end
+    
+    _SFDC_METRICS = SfdcMetrics(sFilePath, sVariableName)
+    
+    return _SFDC_METRICS
+    
+# END method - enableSfdcMetrics()
+
+
+#=============================================================================#
+#--
+# Function: findSfdcObjectId(...)
+#++
+#
+# Description: Reads a SOATest Project Variable that contains a DICT of an SFDC Object's Name:Id pairs,
+#              Searches the DICT for a Key that matches the specified Object's Name
+#              Returns a LIST with the matching Object Name and it's ID value.
+#
+#              The search uses the SfdcObjectIndex saved with the DICT by sfdc_StoreDictInSoaTestVar(),
+#              (it is built and saved on the first search if the DICT was saved some other way, or
+#              has been changed since, see markSfdcObjectIdsChanged()).
+#              A Name equal to sNameKey is found with a single lookup, otherwise sNameKey is
+#              searched for as a regular expression, and the first matching Name is returned.
+#
+# Returns: LIST    - LIST[0] = STRING - The matching Key
+#                    LIST[1] = STRING - The matching Key's Value
+#
+# Syntax: sReadVariableName = STRING - The name of the SOATest Variable that contains
+#                                        the Dictionary of Name:Id pairs to search,
+#                                        (or a SfdcIdMultimap, see sfdc_StoreMultimapInSoaTestVar())
+#         sNameKey = STRING - The Key name to search for (May be a partial match)
+#         bCaseSensitive = BOLEAN - True to perform a case sensitive search for the Key, False to ignore case
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved as a DICT of Name:Id pairs into a SOATest Variable
+#    4. Call this function from a SOAtest Extension, by referencing this file, and selecting this function.
+#
+# Usage Examples:
+#                aAccount = findSfdcObjectId(context, "SFDC: AccountIds", "Acme")
+#                aUser = findSfdcObjectId(context, "SFDC: UserIds", "^jsmith@", False)
+#
+#=============================================================================#
+def findSfdcObjectId(context, sReadVariableName, sNameKey, bCaseSensitive=True):
+    '''
+    RReads a SOATest Project Variable that contains a DICT of an SFDC Object's Name:Id pairs,
+    Searches the DICT for a Key that matches the specified Object's Name 
+    Returns a LIST with the matching Object Name and it's ID value.
+    '''
+    
+    # VERBOSE = True
+    
+    # Set a default value
+    aMatchingNameValuePair = ["", ""]
+    
+    # Retrieve the DICT from the SOATest variable
+    hNameValuePairs = context.get(sReadVariableName)
+    
+    # An exact Name needs no index
+    if ((bCaseSensitive == True) and (hNameValuePairs.has_key(sNameKey) == True)):
+        return [sNameKey, hNameValuePairs[sNameKey]]
+    # end
+    
+    iVersion = _getSfdcLookupDictVersion(context, sReadVariableName)
+    oIndex = context.get(sReadVariableName + SFDC_INDEX_VARIABLE_SUFFIX)
+    
+    # Index the DICT if it has not been, or was replaced or changed since it was
+    if ((oIndex == None) or (oIndex.isIndexOf(hNameValuePairs, iVersion) == False)):
+        oIndex = SfdcObjectIndex(hNameValuePairs, iVersion)
+        context.put(sReadVariableName + SFDC_INDEX_VARIABLE_SUFFIX, oIndex)
+    # end
+    
+    # Perform the Search
+    aMatchingNameValuePair = oIndex.find(sNameKey, bCaseSensitive)
+    
+    if(VERBOSE == True):
+        print2("\tFound Name:Id pair of..")
+        print2(aMatchingNameValuePair)
+    # end
+    
+    return aMatchingNameValuePair
+
+# ENd - Function - findSfdcObjectId
+
+
+#=============================================================================#
+#--
+# Function: findSfdcObjectIdsFuzzy(...)
+#++
+#
+# Description: Reads a SOATest Project Variable that contains a DICT of an SFDC Object's Name:Id pairs,
+#              and returns the Names closest to a partial or misspelled Name, with their Ids and scores.
+#
+#              The search uses a SfdcTrigramIndex of the DICT, built on the first search and saved
+#              into the Variable named sReadVariableName + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX.
+#              Names added to the DICT later, (e.g. by sfdc_MergeDictInSoaTestVar()) are added
+#              to the index without building it again, when the DICT has grown or its version has
+#              changed, (see markSfdcObjectIdsChanged()). A DICT replaced by another one is indexed again.
+#
+# Returns: LIST - Of up to iTop LISTs of [Name, Id, score], the closest Name first,
+#                 (the score is from 0.0 to 1.0, for the same trigrams)
+#
+# Syntax: sReadVariableName = STRING - The name of the SOATest Variable that contains
+#                                        the Dictionary of Name:Id pairs to search
+#         sNameKey = STRING - The Name to search for, (case is ignored)
+#         iTop = INTEGER - The number of closest Names to return, (default 5)
+#
+# Usage Examples:
+#                aAccounts = findSfdcObjectIdsFuzzy(context, "SFDC: AccountIds", "Acme Corp")
+#                    #=> [["Acme Corporation", "001...", 0.62], ["Acme", "001...", 0.44], ...]
+#
+#=============================================================================#
+def findSfdcObjectIdsFuzzy(context, sReadVariableName, sNameKey, iTop=5):
+    '''
+    Returns the Names in a SOATest Variable's DICT of SFDC Object Name:Id pairs closest to
+    a partial or misspelled Name, as a LIST of [Name, Id, score] LISTs.
+    '''
+    
+    # VERBOSE = True
+    
+    # Retrieve the DICT, its version and its trigram index from the SOATest variables
+    hNameValuePairs = context.get(sReadVariableName)
+    iVersion = _getSfdcLookupDictVersion(context, sReadVariableName)
+    oIndex = context.get(sReadVariableName + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX)
+    
+    # Index the DICT if it has not been, or was replaced since it was, else index any added Names
+    if ((oIndex == None) or (oIndex.hNameIds is not hNameValuePairs)):
+        oIndex = SfdcTrigramIndex(hNameValuePairs, iVersion=iVersion)
+        context.put(sReadVariableName + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX, oIndex)
+    else:
+        oIndex.update(iVersion)
+    # end
+    
+    aMatches = oIndex.find(sNameKey, iTop)
+    
+    if(VERBOSE == True):
+        print2("\tClosest Name:Id pairs..")
+        print2(aMatches)
+    # end
+    
+    return aMatches
+
+# End - Function - findSfdcObjectIdsFuzzy()
+
+#=============================================================================#
+#--
+# Function: getSfdcAccountIds(...)
+#++
+#
+# Description: Reads the SFDC Account Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
 #              its associated Name.
+#              See the "Account" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
 #
-# Returns: BOOLEAN - True on success, otherwise False
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#=============================================================================#
+def getSfdcAccountIds(input, context):
+    
+    return _storeSfdcObjectIds(context, "Account")
+
+# End - Function - getSfdcAccountIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcAllObjectIds(...)
+#++
+#
+# Description: Does the work of getSfdcAccountIds(), getSfdcContactIds(), ... getSfdcUserIds()
+#              in a single SOATest Extension call, for each of the SFDC Object types
+#              in SFDC_OBJECT_TYPES, (or just for the ones specified).
+#
+#              The SOAP Responses are read from their SOATest Data Source, and the DICTs
+#              saved into their SOATest Variables, by the calling thread. The DICTs are built
+#              from the Responses on a pool of iThreads threads, (the Responses are
+#              independent of each other, so under SOATest's Jython they are parsed at the
+#              same time).
+#
+#              An Object type whose Response can not be read or parsed is reported, and
+#              skipped, the other types are still saved. A Response that is a SOAP Fault,
+#              or holds no records, is reported too.
+#
+#              When the SfdcIdCache is enabled, see enableSfdcIdCache(), a fresh DICT saved
+#              in the cache is used without reading its Response, and a Response that has
+#              not changed since its DICT was saved is not parsed again.
+#
+# Returns: BOOLEAN - True if the DICTs of all the Object types were saved, otherwise False
+#
+# Syntax: aObjectTypes = LIST - The names of the SFDC Object types, e.g. ["Account", "User"],
+#                               (default None, for all the types in SFDC_OBJECT_TYPES)
+#         iThreads = INTEGER - The number of threads building the DICTs, (default SFDC_THREADS)
+#                              1 builds them in the calling thread
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. Queries of the SFDC Objects for the Name and ID values were made by previous SOATest tests.
+#    3. The SOAP Responses from those queries were saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#
+# Usage Examples:
+#                From a SOATest Extension, in place of a step for each Object type:
+#                    getSfdcAllObjectIds(input, context)
+#
+#                From a script, for only some of the types:
+#                    bStatus = getSfdcAllObjectIds(None, context, ["Account", "Contact"], 2)
+#
+#=============================================================================#
+def getSfdcAllObjectIds(input, context, aObjectTypes=None, iThreads=None):
+    '''
+    Saves the DICT of Name:Id pairs of each of the SFDC Object types into its SOATest Variable,
+    building the DICTs on a pool of threads
+    '''
+    
+    #VERBOSE = True
+    
+    if (aObjectTypes == None):
+        aTypes = SFDC_OBJECT_TYPES
+    else:
+        aTypes = map(_getSfdcObjectType, aObjectTypes)
+    # end
+    
+    if (iThreads == None):
+        iThreads = SFDC_THREADS
+    # end
+    
+    if(VERBOSE == True):
+        print2("Parameters - getSfdcAllObjectIds:")
+        print2("  aObjectTypes: " + str(aObjectTypes))
+        print2("  iThreads: " + str(iThreads))
+    # end
+    
+    bStatus = True
+    oMetrics = _SFDC_METRICS
+    
+    # Build the DICTs, DICT of Object type : DICT of Name:Id pairs, or the error STRING
+    hResults = {}
+    
+    # DICTs of Object type : seconds spent parsing, (or loading from the cache), size of the response,
+    # and True if the SfdcIdCache supplied the DICT
+    hParseSeconds = {}
+    hResponseBytes = {}
+    hFromCache = {}
+    
+    # DICT of Object type : why its SOAP Fault or empty response holds no Ids
+    hResponseErrors = {}
+    
+    # Read each SOAP Response, and queue it to be parsed
+    oWorkQueue = Queue.Queue()
+    for sObjectType, sReadSoaTestDataSourceName, sReadVariableName, sWriteVariableName, sTagNameKey, sTagNameValue in aTypes:
+        
+        print2("\tSaving SFDC " + sObjectType + "'s Name and ID")
+        
+        # Use the cached DICT while it is fresh, without reading the query response
+        fStart = time.time()
+        hLookupDict = _getFreshSfdcObjectIds(sObjectType)
+        if (hLookupDict != None):
+            print2("\tLoaded SFDC " + sObjectType + "'s Name and ID from the cache")
+            hResults[sObjectType] = hLookupDict
+            hParseSeconds[sObjectType] = time.time() - fStart
+            hFromCache[sObjectType] = True
+            continue
+        # end
+        
+        try:
+            sXML = _getSfdcResponseXML(context, sReadSoaTestDataSourceName, sReadVariableName)
+        except:
+            print2("*** WARNING: Unable to read '" + sReadVariableName + "' from '" + sReadSoaTestDataSourceName + "': " + str(sys.exc_info()[1]))
+            bStatus = False
+            continue
+        # end
+        
+        hResponseBytes[sObjectType] = len(sXML)
+        oWorkQueue.put((sObjectType, sXML, sTagNameKey, sTagNameValue))
+    # end
+    
+    iThreads = min(iThreads, oWorkQueue.qsize())
+    
+    if (iThreads <= 1):
+        _buildSfdcLookupDicts(oWorkQueue, hResults, hParseSeconds, hFromCache, hResponseErrors)
+    else:
+        aThreads = []
+        for iThread in range(iThreads):
+            oThread = threading.Thread(target=_buildSfdcLookupDicts, args=(oWorkQueue, hResults, hParseSeconds, hFromCache, hResponseErrors))
+            oThread.start()
+            aThreads.append(oThread)
+        # end
+        
+        for oThread in aThreads:
+            oThread.join()
+        # end
+    # end
+    
+    # Save the DICTs, in the order of the Object types
+    for sObjectType, sReadSoaTestDataSourceName, sReadVariableName, sWriteVariableName, sTagNameKey, sTagNameValue in aTypes:
+        
+        if (not hResults.has_key(sObjectType)):
+            continue
+        # end
+        
+        hLookupDict = hResults[sObjectType]
+        if (type(hLookupDict) == type({})):
+            if (oMetrics != None):
+                fStart = time.time()
+            # end
+            
+            _putSfdcLookupDict(context, sWriteVariableName, hLookupDict)
+            
+            if (oMetrics != None):
+                oMetrics.record(context, "getSfdcAllObjectIds", sWriteVariableName, hResponseBytes.get(sObjectType, 0),
+                                len(hLookupDict), hParseSeconds[sObjectType], time.time() - fStart,
+                                hFromCache[sObjectType])
+            # end
+            
+            if (hResponseErrors.has_key(sObjectType)):
+                print2("*** WARNING: Unable to save SFDC " + sObjectType + "'s Name and ID from '" + sReadVariableName + "': " + hResponseErrors[sObjectType])
+                bStatus = False
+            # end
+            
+            if(VERBOSE == True):
+                print2("\tEntries in DICT '" + sWriteVariableName + "' = " + str(len(hLookupDict)))
+            # end
+        else:
+            print2("*** WARNING: Unable to parse '" + sReadVariableName + "': " + hLookupDict)
+            bStatus = False
+        # end
+    # end
+    
+    return bStatus
+
+# End - Function - getSfdcAllObjectIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcContactIds(...)
+#++
+#
+# Description: Reads the SFDC Contact Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
+#              its associated Name.
+#              See the "Contact" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
+#
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#=============================================================================#
+def getSfdcContactIds(input, context):
+    
+    return _storeSfdcObjectIds(context, "Contact")
+
+# End - Function - getSfdcContactIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcLeadIds(...)
+#++
+#
+# Description: Reads the SFDC Lead Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
+#              its associated Name.
+#              See the "Lead" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
+#
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#=============================================================================#
+def getSfdcLeadIds(input, context):
+    
+    return _storeSfdcObjectIds(context, "Lead")
+
+# End - Function - getSfdcLeadIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcOpportunityIds(...)
+#++
+#
+# Description: Reads the SFDC Opportunity Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
+#              its associated Name.
+#              See the "Opportunity" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
+#
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#=============================================================================#
+def getSfdcOpportunityIds(input, context):
+    
+    return _storeSfdcObjectIds(context, "Opportunity")
+
+# End - Function - getSfdcOpportunityIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcProfileIds(...)
+#++
+#
+# Description: Reads the SFDC Profile Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
+#              its associated Name.
+#              See the "Profile" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
+#
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#=============================================================================#
+def getSfdcProfileIds(input, context):
+    
+    return _storeSfdcObjectIds(context, "Profile")
+
+# End - Function - getSfdcProfileIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcQueryState(...)
+#++
+#
+# Description: Returns the state of the paginated SFDC query whose batches are merged by
+#              sfdc_MergeDictInSoaTestVar() into the specified SOATest Variable.
+#
+# Returns: DICT - The query's state, or None if no batch has been merged:
+#                     "queryLocator" = STRING - The locator to pass to queryMore(), "" after the last batch
+#                     "done" = BOOLEAN - True once the last batch has been merged
+#                     "batches" = INTEGER - The number of batches merged
+#                     "records" = INTEGER - The number of Key:Value pairs read from those batches
+#
+# Syntax: sWriteVariableName = STRING - The name of the Variable holding the merged DICT
+#
+# Usage Examples:
+#                   hState = getSfdcQueryState(context, "SFDC: AccountIds")
+#                   if (hState["done"] == False):
+#                       context.setValue("SFDC Saved Data", "QueryLocator", hState["queryLocator"])
+#                   # end
+#
+#=============================================================================#
+def getSfdcQueryState(context, sWriteVariableName):
+    '''
+    Returns the state DICT of the paginated SFDC query merged into the SOATest Variable, or None
+    '''
+    
+    return context.get(sWriteVariableName + SFDC_QUERY_STATE_VARIABLE_SUFFIX)
+
+# End - Function - getSfdcQueryState()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcRoleIds(...)
+#++
+#
+# Description: Reads the SFDC Role Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
+#              its associated Name.
+#              See the "Role" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
+#
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
 #
 # Prerequisites:
 #    1. This Function must be called from within a SOATest Extension
@@ -441,97 +1209,240 @@ def getSfdcProfileIds(input, context):
 #=============================================================================#
 def getSfdcRoleIds(input, context):
     
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import * 
+    return _storeSfdcObjectIds(context, "Role")
+
+# End - Function - getSfdcRoleIds()
+
+
+#=============================================================================#
+#--
+# Function: getSfdcUserIds(...)
+#++
+#
+# Description: Reads the SFDC User Name and ID values saved in a
+#              SOATest Data Source, creates a DICT object from them,
+#              and saves the DICT into a SOATest Project Variable that
+#              can be used elsewhere in SOATest to lookup the Id based on 
+#              its associated Name.
+#              See the "User" entry of SFDC_OBJECT_TYPES for the Variables and Tags used.
+#
+# Returns: BOOLEAN - True on success, otherwise False, (e.g. when the query response is a SOAP Fault or holds no records)
+#
+# Prerequisites:
+#    1. This Function must be called from within a SOATest Extension
+#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
+#    3. The SOAP Response from that query was saved into a SOATest Data Source
+#    4. Call this function from a SOAtest Extension, by referencing this file, and
+#       selecting this function.
+#=============================================================================#
+def getSfdcUserIds(input, context):
+    
+    return _storeSfdcObjectIds(context, "User")
+
+# End - Function - getSfdcUserIds()
+
+
+#=============================================================================#
+#--
+# Function: isSfdcIdCacheFresh(...)
+#++
+#
+# Description:  Checks if the SfdcIdCache holds a fresh DICT of the Object type's Name:Id pairs,
+#               so the SOATest query of that type can be skipped.
+#
+# Returns: BOOLEAN - True if the DICT is fresh, False if not, or if the cache is disabled
+#
+# Syntax: sObjectType = STRING - The name of the SFDC Object type, e.g. "Account"
+#
+# Usage Examples:
+#                   if (isSfdcIdCacheFresh("Account") == False):
+#                       # Run the QueryAccount test
+#                   # end
+#
+#=============================================================================#
+def isSfdcIdCacheFresh(sObjectType):
+    '''
+    Checks if the SfdcIdCache holds a fresh DICT of the Object type's Name:Id pairs.
+    '''
+    
+    oCache = _SFDC_ID_CACHE
+    if (oCache == None):
+        return False
+    # end
+    
+    return oCache.isFresh(sObjectType)
     
+# END method - isSfdcIdCacheFresh()
+
+
+#=============================================================================#
+#--
+# Function: markSfdcObjectIdsChanged(...)
+#++
+#
+# Description: Marks the DICT of Name:Id pairs saved in the specified SOATest Variable as changed,
+#              by adding one to its version, so the indexes of it are brought up to date by the
+#              next findSfdcObjectId() search, (which indexes the DICT again), or findSfdcObjectIdsFuzzy()
+#              search, (which only indexes the Names not indexed yet).
+#
+#              sfdc_StoreDictInSoaTestVar(), sfdc_MergeDictInSoaTestVar() and the other functions
+#              saving a DICT mark it themselves. Call it after changing a saved DICT in place,
+#              (a DICT replaced by another one is indexed again without it).
+#
+# Returns: INTEGER - The DICT's new version
+#
+# Syntax: sVariableName = STRING - The name of the SOATest Variable holding the DICT
+#
+# Usage Examples:
+#                   hAccountIds = context.get("SFDC: AccountIds")
+#                   del hAccountIds["Acme"]
+#                   hAccountIds["Acme Corporation"] = "001..."
+#                   markSfdcObjectIdsChanged(context, "SFDC: AccountIds")
+#
+#=============================================================================#
+def markSfdcObjectIdsChanged(context, sVariableName):
+    '''
+    Marks the DICT saved in the SOATest Variable as changed, returns its new version
+    '''
+    
+    iVersion = _getSfdcLookupDictVersion(context, sVariableName) + 1
+    context.put(sVariableName + SFDC_VERSION_VARIABLE_SUFFIX, iVersion)
+    
+    return iVersion
+
+# End - Function - markSfdcObjectIdsChanged()
+
+
+#=============================================================================#
+#--
+# Function: sfdc_MergeDictInSoaTestVar(...)
+#++
+#
+# Description:  Merges the Key and Value tag settings of one batch of a paginated SFDC query
+#               into the DICT Object saved in a SOATest Variable, like sfdc_StoreDictInSoaTestVar()
+#               does for a whole query response.
+#
+#                Call it on each response, the one from query() or queryAll() and then each one
+#                from queryMore(), instead of joining the responses and storing the whole XML again,
+#                so each record is parsed only once.
+#
+#                A query() or queryAll() response starts a new DICT. A queryMore() response is
+#                merged into the saved DICT, (the DICT is updated in place), and when a Key is
+#                found again the later Value is kept. A response that is neither is merged while
+#                the saved query state is not done, otherwise it starts a new DICT.
+#
+#                The query's state, (queryLocator, done, and the numbers of batches and records)
+#                is saved into the Variable named sWriteVariableName + SFDC_QUERY_STATE_VARIABLE_SUFFIX,
+#                see getSfdcQueryState(). The SfdcObjectIndex of the DICT is saved once the query is done,
+#                (findSfdcObjectId() indexes a DICT searched before that).
+#
+# Returns: BOOLEAN - True if successful, otherwise False
+#
+# Syntax:    sReadSoaTestDataSourceName = STRING - The name of the SOATest Data Source to read from
+#            sReadVariableName = STRING - The name of the Variable in that Data Source that
+#                                            holds the XML of the latest query batch
+#            sWriteSoaTestDataSourceName = STRING -The name of the SOATest Data Source to write to
+#            sWriteVariableName = STRING - The name of the Variable that holds the merged DICT
+#            sTagNameKey = STRING - The XML Tag who's setting will be saved as the Key in the DICT
+#            sTagNameValue = STRING - The XML Tag who's setting will be saved as the Value in the DICT
+#
+# Usage Examples:
+#                From a SOATest Extension after the query() test, and after each queryMore() test,
+#                (the queryMore() test is repeated while getSfdcQueryState(...)["done"] is False):
+#                    sfdc_MergeDictInSoaTestVar(context, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+#
+#=============================================================================#
+def sfdc_MergeDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey="Id", sTagNameValue="Name"):
+    '''
+    Merges the specified XML Tag settings of one batch of a paginated SFDC query into
+    the DICT Object saved in a SOATest Variable.
+    '''
     
     #VERBOSE = True
     
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryRole_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: RoleIds"
-    sTagNameKey = "sf:Name"
-    sTagNameValue = "sf:Id"
-   
-    print2("\tSaving SFDC Role's Name and ID")
+    if(VERBOSE == True):
+        print2("Parameters - sfdc_MergeDictInSoaTestVar:")
+        print2("  sReadSoaTestDataSourceName: " + sReadSoaTestDataSourceName)
+        print2("  sReadVariableName: " + sReadVariableName)
+        print2("  sTagNameKey: " + sTagNameKey)
+        print2("  sTagNameValue: " + sTagNameValue)
+        print2("  sWriteSoaTestDataSourceName: " + sWriteSoaTestDataSourceName)
+        print2("  sWriteVariableName: " + sWriteVariableName)
+    # end
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    # Read the SOAP Response XML STRING of the batch from the SOATest Data Source
+    sXML = _getSfdcResponseXML(context, sReadSoaTestDataSourceName, sReadVariableName)
     
-    if(VERBOSE == True):
-        # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+    oMetrics = _SFDC_METRICS
+    if (oMetrics != None):
+        fStart = time.time()
+    # end
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
-        print2("\tIterate over the DICT '" + sWriteVariableName + "'")
+    hState = getSfdcQueryState(context, sWriteVariableName)
+    hLookupDict = context.get(sWriteVariableName)
     
-        for sKey, sValue in hUserIDs.iteritems():
-            print2("\t\t" + sKey + " = " + sValue)
-        # end
+    # Does the batch start a new query, or continue the saved one?
+    oResponseMatch = _SFDC_QUERY_RESPONSE_PATTERN.search(sXML)
+    if (oResponseMatch != None):
+        bContinue = (oResponseMatch.group(1) == "queryMore")
+    else:
+        bContinue = ((hState != None) and (hState["done"] == False))
     # end
     
-    return bStatus
-
-# End - Function - getSfdcAccountIds()
-
-
-#=============================================================================#
-#--
-# Function: getSfdcUserIds(...)
-#++
-#
-# Description: Reads the SFDC User Name and ID values saved in a
-#              SOATest Data Source, creates a DICT object from them,
-#              and saves the DICT into a SOATest Project Variable that
-#              can be used elsewhere in SOATest to lookup the Id based on 
-#              its associated Name.
-#
-# Returns: BOOLEAN - True on success, otherwise False
-#
-# Prerequisites:
-#    1. This Function must be called from within a SOATest Extension
-#    2. A Query of the SFDC Object for the Name and ID values was made by a previous SOATest test.
-#    3. The SOAP Response from that query was saved into a SOATest Data Source
-#    4. Call this function from a SOAtest Extension, by referencing this file, and
-#       selecting this function.
-#=============================================================================#
-def getSfdcUserIds(input, context):
+    if ((bContinue == False) or (hLookupDict == None) or (hState == None)):
+        hLookupDict = {}
+        hState = {"queryLocator": "", "done": False, "batches": 0, "records": 0}
+    # end
     
-    #from PyWorks_SoaTest_SfdcUtilities import sfdc_StoreDictInSoaTestVar    # PyWorks SOATest for Salesforce.com Utilities
-    #from PyWorks_WebUtilities import * 
+    # Parse only this batch, and merge it
+    hBatchDict = _getSfdcLookupDict(sXML, sTagNameKey, sTagNameValue)
     
-    #VERBOSE = True
+    if (oMetrics != None):
+        fParsed = time.time()
+    # end
+    
+    hLookupDict.update(hBatchDict)
     
-    sReadSoaTestDataSourceName = "SFDC Saved Data"
-    sReadVariableName = "SFDC: QueryUser_XML"
-    sWriteSoaTestDataSourceName = "SFDC Saved Data"
-    sWriteVariableName = "SFDC: UserIds"
-    sTagNameKey = "sf:Username"
-    sTagNameValue = "sf:Id"
-   
-    print2("\tSaving SFDC User's Name and ID")
+    # The queryLocator and done settings are near the start of the batch
+    oDoneMatch = _SFDC_DONE_PATTERN.search(sXML)
+    oLocatorMatch = _SFDC_QUERY_LOCATOR_PATTERN.search(sXML)
     
-    # Set the return of this function status based on the return status of the called function
-    bStatus = sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey, sTagNameValue)
+    hState["batches"] = hState["batches"] + 1
+    hState["records"] = hState["records"] + len(hBatchDict)
+    hState["done"] = ((oDoneMatch == None) or (oDoneMatch.group(1) != "false"))
+    if ((oLocatorMatch != None) and (oLocatorMatch.group(1) != None) and (hState["done"] == False)):
+        hState["queryLocator"] = oLocatorMatch.group(1).strip()
+    else:
+        hState["queryLocator"] = ""
+    # end
     
     if(VERBOSE == True):
-        # Read back the saved DICT 
-        hUserIDs = context.get(sWriteVariableName)
+        print2("Query state: " + str(hState))
+    # end
     
-        #print2("\tSaved value '" + str(hUserIDs) + "'")
-        print2("\tEntries in DICT = " + str(len(hUserIDs)))
-        print2("\tIterate over the DICT '" + sWriteVariableName + "'")
+    # Save the DICT, (and its index once all the batches are merged), and the query's state
+    if (hState["done"] == True):
+        iVersion = _putSfdcLookupDict(context, sWriteVariableName, hLookupDict)
+    else:
+        context.put(sWriteVariableName, hLookupDict)
+        iVersion = markSfdcObjectIdsChanged(context, sWriteVariableName)
+    # end
+    context.put(sWriteVariableName + SFDC_QUERY_STATE_VARIABLE_SUFFIX, hState)
     
-        for sKey, sValue in hUserIDs.iteritems():
-            print2("\t\t" + sKey + " = " + sValue)
-        # end
+    # Add the batch's Names to the trigram index of the DICT, if it has one
+    oTrigramIndex = context.get(sWriteVariableName + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX)
+    if ((oTrigramIndex != None) and (oTrigramIndex.hNameIds is hLookupDict)):
+        oTrigramIndex.addNames(hBatchDict.keys(), iVersion)
     # end
     
-    return bStatus
-
-# End - Function - getSfdcAccountIds()
+    if (oMetrics != None):
+        oMetrics.record(context, "sfdc_MergeDictInSoaTestVar", sWriteVariableName, len(sXML), len(hBatchDict),
+                        fParsed - fStart, time.time() - fParsed)
+    # end
+    
+    return True
+    
+# END method - sfdc_MergeDictInSoaTestVar()
 
 
 #=============================================================================#
@@ -549,6 +1460,17 @@ def getSfdcUserIds(input, context):
 #                     query('SELECT Id, Name FROM profile')
 #                and saved into a SOATest Data Source as a Project variable.
 #
+#                The Name and ID values are read record by record, <records>...</records>,
+#                in a single scan of the XML, so each Key stays paired with the Value
+#                of its own record. A record missing either tag is skipped, and only the
+#                first occurrence of a tag in a record is used, (e.g. the partner WSDL
+#                repeats <sf:Id> within each record). When the Key is found in more than
+#                one record, the last record's Value is kept.
+#                XML without any <records> tags is paired by the order of the tags instead.
+#
+#                A SfdcObjectIndex of the DICT is saved with it, into the Variable named
+#                sWriteVariableName + SFDC_INDEX_VARIABLE_SUFFIX, for findSfdcObjectId().
+#
 # Returns: BOOLEAN - True if successful, otherwise False
 #
 # Syntax:    sReadSoaTestDataSourceName = STRING - The name of the SOATest Data Source to read from
@@ -598,7 +1520,7 @@ def sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariabl
     # end
     
     # Read the SOAP Response XML STRING from the SOATest Data Source
-    sXML = str(context.getValue(sReadSoaTestDataSourceName, sReadVariableName))
+    sXML = _getSfdcResponseXML(context, sReadSoaTestDataSourceName, sReadVariableName)
     
     
     if(VERBOSE == True):
@@ -606,34 +1528,1178 @@ def sfdc_StoreDictInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariabl
         print2("XML '" + sXML + "'")
     # end
     
-    # Parse the Tag settings to use as the Key into a LIST
-    aKeyList = getMultipleXMLTagValues(sXML, sTagNameKey)
+    oMetrics = _SFDC_METRICS
+    if (oMetrics != None):
+        fStart = time.time()
+    # end
     
-    # Parse the Tag settings to use as the Value into a LIST
-    aValueList = getMultipleXMLTagValues(sXML, sTagNameValue)
+    hLookupDict = _getSfdcLookupDict(sXML, sTagNameKey, sTagNameValue)
     
-    if(VERBOSE == True):
-        print2("aKeyList '" + str(aKeyList) + "'" )
-        print2("aValueList '" + str(aValueList) + "'" )
+    if (oMetrics != None):
+        fParsed = time.time()
     # end
     
-    # Create a DICT from the two LIST objects
-    hLookupDict = dict(zip(aKeyList, aValueList))
-    
     if(VERBOSE == True):
         pass
         print2("DICT ...")
         print2(str(hLookupDict))
     # end
     
-    # Save the DICT into a SOATest Data Source
-    context.put(sWriteVariableName, hLookupDict)
+    # Save the DICT, and its index, into a SOATest Data Source
+    _putSfdcLookupDict(context, sWriteVariableName, hLookupDict)
+    
+    if (oMetrics != None):
+        oMetrics.record(context, "sfdc_StoreDictInSoaTestVar", sWriteVariableName, len(sXML), len(hLookupDict),
+                        fParsed - fStart, time.time() - fParsed)
+    # end
     
     return True
     
 # END method - sfdc_StoreDictInSoaTestVar()
 
 
+#=============================================================================#
+#--
+# Function: sfdc_StoreMultimapInSoaTestVar(...)
+#++
+#
+# Description:  Saves the specified XML Tag settings as Keys and Values of a SfdcIdMultimap into
+#               a specified SOATest Variable, like sfdc_StoreDictInSoaTestVar() does with a DICT,
+#               but keeping every Value of a Key found in more than one record.
+#
+#               The records are read in a single scan of the XML, a record missing either tag
+#               is skipped, and XML without any <records> tags is paired by the order of the tags.
+#               No SfdcObjectIndex is saved with it, findSfdcObjectId() finds an exact Key with a
+#               single lookup, and only indexes it for an ignore case or pattern search,
+#               (returning the first Value of a Key).
+#
+# Returns: BOOLEAN - True if successful, otherwise False
+#
+# Syntax:    The same as sfdc_StoreDictInSoaTestVar()
+#
+# Usage Examples:
+#                Contacts sharing a Name each keep their Id:
+#                    sfdc_StoreMultimapInSoaTestVar(context, "SFDC Saved Data", "SFDC: QueryContact_XML", "SFDC Saved Data", "SFDC: ContactIds", "sf:Name", "sf:Id")
+#                    aIds = context.get("SFDC: ContactIds").getIds("John Smith")
+#
+#=============================================================================#
+def sfdc_StoreMultimapInSoaTestVar(context, sReadSoaTestDataSourceName, sReadVariableName, sWriteSoaTestDataSourceName, sWriteVariableName, sTagNameKey="Id", sTagNameValue="Name"):
+    '''
+    Saves the specified XML Tag settings as Keys and Values of a SfdcIdMultimap into
+    a specified SOATest Variable, keeping every Value of a duplicated Key.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - sfdc_StoreMultimapInSoaTestVar:")
+        print2("  sReadSoaTestDataSourceName: " + sReadSoaTestDataSourceName)
+        print2("  sReadVariableName: " + sReadVariableName)
+        print2("  sTagNameKey: " + sTagNameKey)
+        print2("  sTagNameValue: " + sTagNameValue)
+        print2("  sWriteSoaTestDataSourceName: " + sWriteSoaTestDataSourceName)
+        print2("  sWriteVariableName: " + sWriteVariableName)
+    # end
+    
+    # Read the SOAP Response XML STRING from the SOATest Data Source
+    sXML = _getSfdcResponseXML(context, sReadSoaTestDataSourceName, sReadVariableName)
+    
+    oMetrics = _SFDC_METRICS
+    if (oMetrics != None):
+        fStart = time.time()
+    # end
+    
+    oMultimap = _getSfdcIdMultimap(sXML, sTagNameKey, sTagNameValue)
+    
+    if (oMetrics != None):
+        fParsed = time.time()
+    # end
+    
+    if(VERBOSE == True):
+        print2("Keys: " + str(len(oMultimap)) + ", Values: " + str(oMultimap.getIdCount()))
+    # end
+    
+    # Save the SfdcIdMultimap into a SOATest Data Source, findSfdcObjectId() indexes it when needed
+    context.put(sWriteVariableName, oMultimap)
+    markSfdcObjectIdsChanged(context, sWriteVariableName)
+    context.put(sWriteVariableName + SFDC_INDEX_VARIABLE_SUFFIX, None)
+    
+    if (oMetrics != None):
+        oMetrics.record(context, "sfdc_StoreMultimapInSoaTestVar", sWriteVariableName, len(sXML), oMultimap.getIdCount(),
+                        fParsed - fStart, time.time() - fParsed)
+    # end
+    
+    return True
+    
+# END method - sfdc_StoreMultimapInSoaTestVar()
+
+
+#=============================================================================#
+#--
+# Class: SfdcIdCache(...)
+#++
+#
+# Description:  An on-disk cache of the Name:Id DICTs of an SFDC Org, one file per Object type,
+#               see enableSfdcIdCache().
+#
+#               Each file holds the DICT, the Org and Object type it belongs to, and the MD5
+#               hash of the query response it was parsed from. The DICT is fresh while the file
+#               is younger than iTTL seconds. The files are written with the binary pickle
+#               format, through a temporary file, so a reader never loads half a file.
+#               A file that can not be read, or is not of the same Org, Object type or layout,
+#               is treated as missing.
+#
+# Syntax: sCacheDir = STRING - The folder holding the cache files, created when needed
+#         sOrgId = STRING - Identifies the SFDC Org
+#         iTTL = INTEGER - The number of seconds a saved DICT is fresh, (default SFDC_ID_CACHE_TTL)
+#
+# Usage Examples:
+#                   oCache = SfdcIdCache("C:/SOATest/cache", "00D30000000abcd")
+#                   oCache.putIds("Account", hAccountIds, sXML)
+#                   hAccountIds = oCache.getIds("Account")          # None once it is stale
+#                   hAccountIds = oCache.getIds("Account", sXML)    # None if the response changed
+#                   oCache.remove("Account")
+#
+#=============================================================================#
+class SfdcIdCache(object):
+    '''
+    An on-disk cache of the Name:Id DICTs of an SFDC Org, with a time to live,
+    and a content hash of the query response of each DICT.
+    '''
+    
+    # The layout of the cache files, files with another layout are ignored
+    # (version 1 files may hold the empty DICT of a SOAP Fault)
+    iFileVersion = 2
+    
+    # Binary pickle format, (the highest one Jython2.2.1 can read)
+    iPickleProtocol = 1
+    
+    def __init__(self, sCacheDir, sOrgId, iTTL=SFDC_ID_CACHE_TTL):
+        
+        self.sCacheDir = sCacheDir
+        self.sOrgId = sOrgId
+        self.iTTL = iTTL
+        
+    # end __init__()
+    
+    def _read(self, sObjectType):
+        '''
+        Returns the DICT saved in the Object type's file, or None
+        '''
+        
+        try:
+            oFile = open(self.getPath(sObjectType), "rb")
+        except IOError:
+            return None
+        # end
+        
+        try:
+            try:
+                hEntry = pickle.load(oFile)
+            except:
+                return None
+            # end
+        finally:
+            oFile.close()
+        # end
+        
+        if ((type(hEntry) != type({})) or (hEntry.get("version") != self.iFileVersion)
+                or (hEntry.get("org") != self.sOrgId) or (hEntry.get("type") != sObjectType)):
+            return None
+        # end
+        
+        return hEntry
+        
+    # end _read()
+    
+    def getHash(self, sXML):
+        '''
+        Returns the hex STRING of the MD5 hash of the query response
+        '''
+        
+        if (type(sXML) == type(u"")):
+            sXML = sXML.encode("utf-8")
+        # end
+        
+        return _newContentHash(sXML).hexdigest()
+        
+    # end getHash()
+    
+    def getIds(self, sObjectType, sXML=None):
+        '''
+        Returns the saved DICT of the Object type, or None.
+        Without sXML the DICT must be fresh, with sXML it must have been parsed from that query response.
+        '''
+        
+        if ((sXML == None) and (self.isFresh(sObjectType) == False)):
+            return None
+        # end
+        
+        hEntry = self._read(sObjectType)
+        if (hEntry == None):
+            return None
+        # end
+        
+        if (sXML != None):
+            if (hEntry.get("hash") != self.getHash(sXML)):
+                return None
+            # end
+            
+            # The query response has not changed, so the DICT is fresh again
+            try:
+                os.utime(self.getPath(sObjectType), None)
+            except OSError:
+                pass
+            # end
+        # end
+        
+        return hEntry["ids"]
+        
+    # end getIds()
+    
+    def getPath(self, sObjectType):
+        '''
+        Returns the path of the Object type's cache file
+        '''
+        
+        sFileName = "SfdcIds_" + re.sub(r"[^\w.-]", "_", self.sOrgId) + "_" + re.sub(r"[^\w.-]", "_", sObjectType) + ".pkl"
+        
+        return os.path.join(self.sCacheDir, sFileName)
+        
+    # end getPath()
+    
+    def isFresh(self, sObjectType):
+        '''
+        Returns True if the Object type's file is younger than the time to live
+        '''
+        
+        try:
+            fAge = time.time() - os.path.getmtime(self.getPath(sObjectType))
+        except OSError:
+            return False
+        # end
+        
+        return (fAge <= self.iTTL)
+        
+    # end isFresh()
+    
+    def putIds(self, sObjectType, hIds, sXML):
+        '''
+        Saves the DICT of the Object type, parsed from the query response.
+        Returns True if it was saved, otherwise False (the cache is only an optimization).
+        '''
+        
+        hEntry = {"version": self.iFileVersion, "org": self.sOrgId, "type": sObjectType,
+                  "hash": self.getHash(sXML), "ids": hIds}
+        
+        sPath = self.getPath(sObjectType)
+        sTempPath = sPath + ".tmp"
+        
+        try:
+            if (not os.path.isdir(self.sCacheDir)):
+                os.makedirs(self.sCacheDir)
+            # end
+            
+            oFile = open(sTempPath, "wb")
+            try:
+                pickle.dump(hEntry, oFile, self.iPickleProtocol)
+            finally:
+                oFile.close()
+            # end
+            
+            # Windows can not rename onto an existing file
+            if (os.path.exists(sPath)):
+                os.remove(sPath)
+            # end
+            os.rename(sTempPath, sPath)
+        except (IOError, OSError):
+            print2("*** WARNING: Unable to save the SFDC " + sObjectType + " Ids cache file '" + sPath + "': " + str(sys.exc_info()[1]))
+            return False
+        # end
+        
+        return True
+        
+    # end putIds()
+    
+    def remove(self, sObjectType):
+        '''
+        Deletes the Object type's cache file, if there is one
+        '''
+        
+        sPath = self.getPath(sObjectType)
+        if (os.path.exists(sPath)):
+            os.remove(sPath)
+        # end
+        
+    # end remove()
+    
+# END class - SfdcIdCache
+
+
+#=============================================================================#
+#--
+# Class: SfdcIdMultimap(...)
+#++
+#
+# Description:  A compact map of SFDC Object Names to Ids that keeps every Id of a Name
+#               found in more than one record, (e.g. Contacts or Users that share a Name).
+#
+#               A Name with a single Id, (most of them), holds the Id STRING itself, only a
+#               duplicated Name holds a LIST of its Ids, so it is barely larger than a DICT
+#               of Name:Id pairs. The reverse index of Id to Name is only built when getName()
+#               or add() needs it, and compact() drops it again, (e.g. after a bulk load).
+#
+#               It can be used in place of a DICT of Name:Id pairs, (e.g. by findSfdcObjectId()
+#               and SfdcObjectIndex), where a Name's value is its first Id. An exact lookup of a
+#               Name is a single DICT lookup.
+#
+#               Adding an Id again under the same Name is ignored. Ids are unique in SFDC,
+#               so an Id added under a second Name is moved from its first Name.
+#
+# Syntax: N/A
+#
+# Usage Examples:
+#                   oContactIds = context.get("SFDC: ContactIds")
+#                   sId = oContactIds["John Smith"]              # The first Id
+#                   aIds = oContactIds.getIds("John Smith")      #=> ["003A...", "003B..."]
+#                   sName = oContactIds.getName("003B...")       #=> "John Smith"
+#
+#=============================================================================#
+class SfdcIdMultimap(object):
+    '''
+    A map of SFDC Object Names to all of their Ids, with a lazy reverse index of Id to Name.
+    '''
+    
+    def __init__(self):
+        
+        # DICT of Name : Id STRING, or LIST of Ids of a duplicated Name
+        self.hIds = {}
+        
+        # The number of Ids, (of all the Names)
+        self.iIdCount = 0
+        
+        # DICT of Id : Name, or None until _getNames() builds it
+        self.hNames = None
+        
+    # end __init__()
+    
+    def __contains__(self, sName):
+        return self.hIds.has_key(sName)
+    # end __contains__()
+    
+    def __getitem__(self, sName):
+        '''
+        Returns the first Id of the Name, raising KeyError when there is none
+        '''
+        
+        oIds = self.hIds[sName]
+        if (type(oIds) == type([])):
+            return oIds[0]
+        # end
+        
+        return oIds
+        
+    # end __getitem__()
+    
+    def __len__(self):
+        return len(self.hIds)
+    # end __len__()
+    
+    def _getNames(self):
+        '''
+        Returns the DICT of Id : Name, building it from the Names the first time
+        '''
+        
+        if (self.hNames == None):
+            hNames = {}
+            for sName, oIds in self.hIds.items():
+                if (type(oIds) == type([])):
+                    for sId in oIds:
+                        hNames[sId] = sName
+                    # end
+                else:
+                    hNames[oIds] = sName
+                # end
+            # end
+            self.hNames = hNames
+        # end
+        
+        return self.hNames
+        
+    # end _getNames()
+    
+    def _removeId(self, sName, sId):
+        '''
+        Removes the Id from the Name's Ids, and the Name when it has no Ids left
+        '''
+        
+        oIds = self.hIds[sName]
+        if (type(oIds) == type([])):
+            oIds.remove(sId)
+            if (len(oIds) == 1):
+                self.hIds[sName] = oIds[0]
+            # end
+        else:
+            del self.hIds[sName]
+        # end
+        
+    # end _removeId()
+    
+    def add(self, sName, sId):
+        '''
+        Adds the Id to the Name's Ids, moving it from another Name,
+        returns True if it was added, False if it was already there
+        '''
+        
+        hNames = self._getNames()
+        
+        sOldName = hNames.get(sId)
+        if (sOldName == sName):
+            return False
+        elif (sOldName == None):
+            self.iIdCount = self.iIdCount + 1
+        else:
+            self._removeId(sOldName, sId)
+        # end
+        
+        oIds = self.hIds.get(sName)
+        if (oIds == None):
+            self.hIds[sName] = sId
+        elif (type(oIds) == type([])):
+            oIds.append(sId)
+        else:
+            self.hIds[sName] = [oIds, sId]
+        # end
+        
+        hNames[sId] = sName
+        
+        return True
+        
+    # end add()
+    
+    def compact(self):
+        '''
+        Drops the reverse index of Id to Name, getName() and add() build it again when needed
+        '''
+        self.hNames = None
+    # end compact()
+    
+    def get(self, sName, oDefault=None):
+        '''
+        Returns the first Id of the Name, or oDefault
+        '''
+        
+        if (self.hIds.has_key(sName)):
+            return self[sName]
+        # end
+        
+        return oDefault
+        
+    # end get()
+    
+    def getIdCount(self):
+        '''
+        Returns the number of Ids, (of all the Names)
+        '''
+        return self.iIdCount
+    # end getIdCount()
+    
+    def getIds(self, sName):
+        '''
+        Returns a LIST of all the Ids of the Name, in the order they were added, or []
+        '''
+        
+        oIds = self.hIds.get(sName)
+        if (oIds == None):
+            return []
+        elif (type(oIds) == type([])):
+            return oIds[:]
+        # end
+        
+        return [oIds]
+        
+    # end getIds()
+    
+    def getName(self, sId):
+        '''
+        Returns the Name of the Id, or None
+        '''
+        return self._getNames().get(sId)
+    # end getName()
+    
+    def has_key(self, sName):
+        return self.hIds.has_key(sName)
+    # end has_key()
+    
+    def iteritems(self):
+        '''
+        Generates the (Name, first Id) pairs, like DICT.iteritems()
+        '''
+        
+        for sName in self.hIds.keys():
+            yield (sName, self[sName])
+        # end
+        
+    # end iteritems()
+    
+    def keys(self):
+        '''
+        Returns a LIST of the Names
+        '''
+        return self.hIds.keys()
+    # end keys()
+    
+# END class - SfdcIdMultimap
+
+
+#=============================================================================#
+#--
+# Class: SfdcMetrics(...)
+#++
+#
+# Description:  The per call metrics of the SFDC functions, see enableSfdcMetrics().
+#
+#               record() saves the metrics of a call as a DICT of:
+#                   "time"         = FLOAT - When the call ended, seconds since the epoch
+#                   "function"     = STRING - The SFDC function called, e.g. "getSfdcAccountIds"
+#                   "variable"     = STRING - The SOATest Variable the DICT was saved into
+#                   "bytes"        = INTEGER - The size of the query response, 0 when it was not read
+#                   "records"      = INTEGER - The number of Name:Id pairs saved
+#                   "parseSeconds" = FLOAT - The seconds spent parsing, (or loading from the cache)
+#                   "storeSeconds" = FLOAT - The seconds spent saving the DICT and its index
+#                   "cached"       = BOOLEAN - True if the DICT was loaded from the SfdcIdCache
+#
+#               The DICTs are kept in aMetrics, appended to the LIST in the SOATest Variable
+#               sVariableName, and written as a tab separated line to the file sFilePath,
+#               (a header line starting with '#' is written when the file is new).
+#
+# Syntax: sFilePath = STRING - The file the metrics are appended to, (default None, for no file)
+#         sVariableName = STRING - The SOATest Variable holding the LIST of metrics,
+#                                  (default SFDC_METRICS_VARIABLE_NAME, None for no Variable)
+#
+# Usage Examples:
+#                   oMetrics = SfdcMetrics("sfdc_metrics.txt")
+#                   oMetrics.record(context, "getSfdcAccountIds", "SFDC: AccountIds", len(sXML), 1200, 0.25, 0.02)
+#                   aSlowCalls = oMetrics.getOverBudget(fMaxSeconds=5.0)
+#
+#=============================================================================#
+class SfdcMetrics(object):
+    '''
+    The per call metrics of the SFDC functions, saved into a SOATest Variable and/or a file.
+    '''
+    
+    # The columns of the metrics file, in order
+    aFields = ["time", "function", "variable", "bytes", "records", "parseSeconds", "storeSeconds", "cached"]
+    
+    def __init__(self, sFilePath=None, sVariableName=SFDC_METRICS_VARIABLE_NAME):
+        
+        self.sFilePath = sFilePath
+        self.sVariableName = sVariableName
+        
+        # LIST of the DICTs saved by record()
+        self.aMetrics = []
+        
+    # end __init__()
+    
+    def _write(self, hMetric):
+        '''
+        Appends the metrics as a tab separated line to the file
+        '''
+        
+        bNewFile = ((os.path.exists(self.sFilePath) == False) or (os.path.getsize(self.sFilePath) == 0))
+        
+        oFile = open(self.sFilePath, "a")
+        try:
+            if (bNewFile == True):
+                oFile.write("# " + "\t".join(self.aFields) + "\n")
+            # end
+            
+            aValues = []
+            for sField in self.aFields:
+                oValue = hMetric[sField]
+                if (type(oValue) == type(0.0)):
+                    aValues.append("%.6f" % oValue)
+                else:
+                    aValues.append(str(oValue))
+                # end
+            # end
+            oFile.write("\t".join(aValues) + "\n")
+        finally:
+            oFile.close()
+        # end
+        
+    # end _write()
+    
+    def getOverBudget(self, fMaxSeconds=None, iMaxBytes=None):
+        '''
+        Returns the LIST of the recorded metrics whose parse plus store seconds are over fMaxSeconds,
+        or whose query response is over iMaxBytes, (None to skip either check)
+        '''
+        
+        aOverBudget = []
+        for hMetric in self.aMetrics:
+            if ((fMaxSeconds != None) and (hMetric["parseSeconds"] + hMetric["storeSeconds"] > fMaxSeconds)):
+                aOverBudget.append(hMetric)
+            elif ((iMaxBytes != None) and (hMetric["bytes"] > iMaxBytes)):
+                aOverBudget.append(hMetric)
+            # end
+        # end
+        
+        return aOverBudget
+        
+    # end getOverBudget()
+    
+    def record(self, context, sFunction, sVariableName, iBytes, iRecords, fParseSeconds, fStoreSeconds, bCached=False):
+        '''
+        Saves the metrics of a call, and returns their DICT
+        '''
+        
+        hMetric = {"time": time.time(), "function": sFunction, "variable": sVariableName,
+                   "bytes": iBytes, "records": iRecords, "parseSeconds": fParseSeconds,
+                   "storeSeconds": fStoreSeconds, "cached": bCached}
+        self.aMetrics.append(hMetric)
+        
+        if ((context != None) and (self.sVariableName != None)):
+            aMetrics = context.get(self.sVariableName)
+            if (aMetrics == None):
+                aMetrics = []
+            # end
+            aMetrics.append(hMetric)
+            context.put(self.sVariableName, aMetrics)
+        # end
+        
+        if (self.sFilePath != None):
+            self._write(hMetric)
+        # end
+        
+        return hMetric
+        
+    # end record()
+    
+# END class - SfdcMetrics
+
+
+#=============================================================================#
+#--
+# Class: SfdcObjectIndex(...)
+#++
+#
+# Description:  An index of a DICT of SFDC Object Name:Id pairs, for repeated lookups of
+#               the Id of an Object by its Name.
+#
+#               The Names are upper-cased once, when the index is built, so an exact or a
+#               case insensitive lookup is a single DICT lookup. Prefix and regular expression
+#               lookups check the Names in order and stop at the first match. The regular
+#               expressions are compiled once and shared by all the indexes.
+#
+#               Each lookup returns a LIST of the matching Name and its Id, or ["", ""]
+#               when no Name matches, like getMatchingKeyValue().
+#               When Names differ only by case, a case insensitive lookup returns the first one.
+#
+#               The index is of the DICT as it was when the index was built. isIndexOf() tells
+#               whether the DICT has changed since, by its number of Names and its version, (see
+#               markSfdcObjectIdsChanged()), and findSfdcObjectId() builds a new index when it has.
+#
+# Syntax: hNameIds = DICT - The Name:Id pairs to index, (or a SfdcIdMultimap)
+#         iVersion = INTEGER - The version of the DICT being indexed, (default 0)
+#
+# Usage Examples:
+#                   oIndex = SfdcObjectIndex(context.get("SFDC: AccountIds"))
+#                   aAccount = oIndex.findExact("Acme Corporation")    #=> ["Acme Corporation", "001..."]
+#                   aAccount = oIndex.findIgnoreCase("ACME CORPORATION")
+#                   aAccount = oIndex.findPrefix("acme", False)
+#                   aAccount = oIndex.findPattern("Corp(oration)?$")
+#
+#=============================================================================#
+class SfdcObjectIndex(object):
+    '''
+    An index of a DICT of SFDC Object Name:Id pairs, with exact, case insensitive,
+    prefix and regular expression lookups.
+    '''
+    
+    # DICT of (pattern, bCaseSensitive) : compiled pattern, shared by all the indexes
+    hPatterns = {}
+    
+    # Compiled patterns kept before hPatterns is emptied
+    iMaxPatterns = 100
+    
+    def __init__(self, hNameIds, iVersion=0):
+        
+        self.hNameIds = hNameIds
+        self.iEntries = len(hNameIds)
+        self.iVersion = iVersion
+        
+        # The Names in order, and the upper-cased Names in the same order
+        self.aNames = hNameIds.keys()
+        self.aUpperNames = []
+        
+        # DICT of upper-cased Name : first Name with that upper-cased Name
+        self.hUpperNames = {}
+        
+        for sName in self.aNames:
+            sUpperName = sName.upper()
+            self.aUpperNames.append(sUpperName)
+            if (not self.hUpperNames.has_key(sUpperName)):
+                self.hUpperNames[sUpperName] = sName
+            # end
+        # end
+        
+    # end __init__()
+    
+    def _getPattern(self, sPattern, bCaseSensitive):
+        '''
+        Returns the compiled regular expression, compiling it on its first use
+        '''
+        
+        tKey = (sPattern, bCaseSensitive)
+        oPattern = SfdcObjectIndex.hPatterns.get(tKey)
+        
+        if (oPattern == None):
+            if (len(SfdcObjectIndex.hPatterns) >= SfdcObjectIndex.iMaxPatterns):
+                SfdcObjectIndex.hPatterns.clear()
+            # end
+            
+            if (bCaseSensitive == True):
+                oPattern = re.compile(sPattern)
+            else:
+                oPattern = re.compile(sPattern, re.IGNORECASE)
+            # end
+            SfdcObjectIndex.hPatterns[tKey] = oPattern
+        # end
+        
+        return oPattern
+        
+    # end _getPattern()
+    
+    def find(self, sNameKey, bCaseSensitive=True):
+        '''
+        Returns a LIST of the Name equal to sNameKey and its Id, or else of the first Name
+        matching sNameKey as a regular expression and its Id
+        '''
+        
+        if (bCaseSensitive == True):
+            aFound = self.findExact(sNameKey)
+        else:
+            aFound = self.findIgnoreCase(sNameKey)
+        # end
+        
+        if (aFound[0] == ""):
+            aFound = self.findPattern(sNameKey, bCaseSensitive)
+        # end
+        
+        return aFound
+        
+    # end find()
+    
+    def findExact(self, sName):
+        '''
+        Returns a LIST of the Name and its Id, or ["", ""]
+        '''
+        
+        if (self.hNameIds.has_key(sName)):
+            return [sName, self.hNameIds[sName]]
+        # end
+        
+        return ["", ""]
+        
+    # end findExact()
+    
+    def findIgnoreCase(self, sName):
+        '''
+        Returns a LIST of the Name equal to sName, ignoring case, and its Id, or ["", ""]
+        '''
+        
+        sFoundName = self.hUpperNames.get(sName.upper())
+        if (sFoundName != None):
+            return [sFoundName, self.hNameIds[sFoundName]]
+        # end
+        
+        return ["", ""]
+        
+    # end findIgnoreCase()
+    
+    def findPattern(self, sPattern, bCaseSensitive=True):
+        '''
+        Returns a LIST of the first Name matching the regular expression and its Id, or ["", ""]
+        '''
+        
+        oSearch = self._getPattern(sPattern, bCaseSensitive).search
+        
+        for sName in self.aNames:
+            if (oSearch(sName)):
+                return [sName, self.hNameIds[sName]]
+            # end
+        # end
+        
+        return ["", ""]
+        
+    # end findPattern()
+    
+    def findPrefix(self, sPrefix, bCaseSensitive=True):
+        '''
+        Returns a LIST of the first Name starting with sPrefix and its Id, or ["", ""]
+        '''
+        
+        if (bCaseSensitive == True):
+            aNames = self.aNames
+        else:
+            aNames = self.aUpperNames
+            sPrefix = sPrefix.upper()
+        # end
+        
+        iName = 0
+        for sName in aNames:
+            if (sName.startswith(sPrefix)):
+                sName = self.aNames[iName]
+                return [sName, self.hNameIds[sName]]
+            # end
+            iName = iName + 1
+        # end
+        
+        return ["", ""]
+        
+    # end findPrefix()
+    
+    def isIndexOf(self, hNameIds, iVersion=None):
+        '''
+        Returns True if this is an index of the DICT, (the same DICT, still with the same number
+        of Names, and of the same version iVersion, if not None)
+        '''
+        
+        return ((self.hNameIds is hNameIds) and (self.iEntries == len(hNameIds)) and
+                ((iVersion == None) or (self.iVersion == iVersion)))
+        
+    # end isIndexOf()
+    
+# END class - SfdcObjectIndex
+
+
+#=============================================================================#
+#--
+# Class: SfdcTrigramIndex(...)
+#++
+#
+# Description:  A trigram index of the Names of a DICT of SFDC Object Name:Id pairs, for finding
+#               the Names closest to a partial or misspelled Name, see findSfdcObjectIdsFuzzy().
+#
+#               Each Name is upper-cased, its runs of white space made single spaces, and padded
+#               with a space at each end, and then split into its trigrams, (every 3 characters
+#               in a row, e.g. " AC", "ACM", "CME", "ME "). The index holds the LIST of the Names
+#               holding each trigram.
+#
+#               A search counts the trigrams each Name shares with the Name searched for, reading
+#               the LISTs of its rarest trigrams first, and stopping before the LISTs hold more than
+#               iMaxPostings Names in all, (a trigram held by most of the Names, e.g. "ACC" of 100k
+#               "Account ..." Names, says little about which is closest). The iMaxCandidates Names
+#               sharing the most of those trigrams are then scored on all of their trigrams, with
+#               the Dice coefficient:
+#                   2 * shared trigrams / (trigrams of the Name + trigrams of the Name searched for)
+#               so the cost of a search is bounded, and does not grow with the number of Names.
+#               The padded form of each Name and its number of trigrams are kept when it is
+#               indexed, so a candidate is scored by finding each trigram searched for in it.
+#
+#               addNames() indexes Names added to the DICT without building the index again,
+#               and update() does so when the number of Names or the version of the DICT, (see
+#               markSfdcObjectIdsChanged()), has changed since it was indexed, so a Name replaced
+#               by another one, keeping the same number of Names, is indexed too. Only the Names
+#               not indexed yet are split into trigrams. Names removed from the DICT are skipped
+#               by the searches.
+#
+# Syntax: hNameIds = DICT - The Name:Id pairs to index, (or a SfdcIdMultimap)
+#         iMaxPostings = INTEGER - The number of Name numbers read by each search, (default 1000)
+#         iMaxCandidates = INTEGER - The number of Names scored by each search, (default 50)
+#         iVersion = INTEGER - The version of the DICT being indexed, (default 0)
+#
+# Usage Examples:
+#                   oIndex = SfdcTrigramIndex(context.get("SFDC: AccountIds"))
+#                   aMatches = oIndex.find("Acme Corp", 3)
+#                       #=> [["Acme Corporation", "001...", 0.62], ["Acme", "001...", 0.44], ...]
+#
+#=============================================================================#
+class SfdcTrigramIndex(object):
+    '''
+    A trigram index of the Names of a DICT of SFDC Object Name:Id pairs,
+    returning the closest Names to a partial or misspelled Name.
+    '''
+    
+    def __init__(self, hNameIds, iMaxPostings=1000, iMaxCandidates=50, iVersion=0):
+        
+        self.hNameIds = hNameIds
+        self.iMaxPostings = iMaxPostings
+        self.iMaxCandidates = iMaxCandidates
+        
+        # The version, and the number of Names, of the DICT when it was last indexed
+        self.iVersion = iVersion
+        self.iEntries = 0
+        
+        # The indexed Names, numbered by their position, and DICT of Name : number
+        self.aNames = []
+        self.hNameNumbers = {}
+        
+        # The padded form, and the number of trigrams, of each indexed Name, by number
+        self.aPaddedNames = []
+        self.aTrigramCounts = []
+        
+        # DICT of trigram : LIST of the numbers of the Names holding it
+        self.hPostings = {}
+        
+        self.addNames(hNameIds.keys())
+        
+    # end __init__()
+    
+    def _getPaddedName(self, sName):
+        '''
+        Returns the Name upper-cased, with single spaces, and padded with a space at each end
+        '''
+        
+        return " " + " ".join(sName.upper().split()) + " "
+        
+    # end _getPaddedName()
+    
+    def _getTrigrams(self, sPadded):
+        '''
+        Returns a DICT of the trigrams of the padded Name : 1
+        '''
+        
+        hTrigrams = {}
+        for iStart in range(len(sPadded) - 2):
+            hTrigrams[sPadded[iStart:(iStart + 3)]] = 1
+        # end
+        
+        return hTrigrams
+        
+    # end _getTrigrams()
+    
+    def addNames(self, aNames, iVersion=None):
+        '''
+        Indexes the Names not indexed yet, (of the DICT's version iVersion, if not None)
+        '''
+        
+        hPostings = self.hPostings
+        
+        for sName in aNames:
+            if (self.hNameNumbers.has_key(sName)):
+                continue
+            # end
+            
+            iNumber = len(self.aNames)
+            self.aNames.append(sName)
+            self.hNameNumbers[sName] = iNumber
+            
+            sPadded = self._getPaddedName(sName)
+            hTrigrams = self._getTrigrams(sPadded)
+            self.aPaddedNames.append(sPadded)
+            self.aTrigramCounts.append(len(hTrigrams))
+            
+            for sTrigram in hTrigrams.keys():
+                aPosting = hPostings.get(sTrigram)
+                if (aPosting == None):
+                    hPostings[sTrigram] = [iNumber]
+                else:
+                    aPosting.append(iNumber)
+                # end
+            # end
+        # end
+        
+        self.iEntries = len(self.hNameIds)
+        if (iVersion != None):
+            self.iVersion = iVersion
+        # end
+        
+    # end addNames()
+    
+    def find(self, sName, iTop=5):
+        '''
+        Returns a LIST of up to iTop LISTs of [Name, Id, score], the closest Name first
+        '''
+        
+        hTrigrams = self._getTrigrams(self._getPaddedName(sName))
+        if (hTrigrams == {}):
+            return []
+        # end
+        
+        # The trigrams held by any Name, rarest first, (sorted by the trigram rather than
+        # its LIST, so LISTs of the same length are never compared)
+        aRareTrigrams = []
+        for sTrigram in hTrigrams.keys():
+            aPosting = self.hPostings.get(sTrigram)
+            if (aPosting != None):
+                aRareTrigrams.append((len(aPosting), sTrigram))
+            # end
+        # end
+        if (aRareTrigrams == []):
+            return []
+        # end
+        aRareTrigrams.sort()
+        
+        # Count the rare trigrams each Name shares, reading at most iMaxPostings Name numbers,
+        # (when even the rarest trigram is held by more Names, only the first of them are read)
+        hCounts = {}
+        iBudget = self.iMaxPostings
+        for iLength, sTrigram in aRareTrigrams:
+            aPosting = self.hPostings[sTrigram]
+            if (iLength > iBudget):
+                if (hCounts != {}):
+                    break
+                # end
+                aPosting = aPosting[:iBudget]
+            # end
+            
+            for iNumber in aPosting:
+                hCounts[iNumber] = hCounts.get(iNumber, 0) + 1
+            # end
+            iBudget = iBudget - len(aPosting)
+        # end
+        
+        # Group the Names by the number of trigrams they share, DICT of count : LIST of Name numbers
+        hByCount = {}
+        for iNumber, iCount in hCounts.items():
+            aNumbers = hByCount.get(iCount)
+            if (aNumbers == None):
+                hByCount[iCount] = [iNumber]
+            else:
+                aNumbers.append(iNumber)
+            # end
+        # end
+        
+        # Take the Names sharing the most of them
+        aCandidates = []
+        aCounts = hByCount.keys()
+        aCounts.sort()
+        aCounts.reverse()
+        for iCount in aCounts:
+            aCandidates.extend(hByCount[iCount][:(self.iMaxCandidates - len(aCandidates))])
+            if (len(aCandidates) >= self.iMaxCandidates):
+                break
+            # end
+        # end
+        
+        # Score them on all of their trigrams, (each trigram searched for is found
+        # in the padded Name, rather than splitting the Name into its trigrams again)
+        aScores = []
+        aTrigrams = hTrigrams.keys()
+        iTrigrams = len(aTrigrams)
+        for iNumber in aCandidates:
+            sCandidate = self.aNames[iNumber]
+            
+            # Skip a Name removed from the DICT
+            if (not self.hNameIds.has_key(sCandidate)):
+                continue
+            # end
+            
+            sPadded = self.aPaddedNames[iNumber]
+            iShared = 0
+            for sTrigram in aTrigrams:
+                if (sPadded.find(sTrigram) != -1):
+                    iShared = iShared + 1
+                # end
+            # end
+            
+            fScore = (2.0 * iShared) / (iTrigrams + self.aTrigramCounts[iNumber])
+            aScores.append((-fScore, sCandidate))
+        # end
+        aScores.sort()
+        
+        aMatches = []
+        for fScore, sCandidate in aScores[:iTop]:
+            aMatches.append([sCandidate, self.hNameIds[sCandidate], round(-fScore, 3)])
+        # end
+        
+        return aMatches
+        
+    # end find()
+    
+    def update(self, iVersion=None):
+        '''
+        Indexes the Names added to the DICT since it was indexed, when its number of Names,
+        or its version iVersion, (if not None), has changed. Returns True if it did.
+        '''
+        
+        if ((len(self.hNameIds) == self.iEntries) and ((iVersion == None) or (iVersion == self.iVersion))):
+            return False
+        # end
+        
+        self.addNames(self.hNameIds.keys(), iVersion)
+        
+        return True
+        
+    # end update()
+    
+# END class - SfdcTrigramIndex
+
+
+#=============================================================================#
+#--
+# Class: SoaTestOfflineContext(...)
+#++
+#
+# Description:  A stand-in for the context SOATest passes to an Extension, so the functions
+#               of this module can be run, tested and profiled outside of SOATest.
+#
+#               The Data Source values read by context.getValue() and the Variables saved by
+#               context.put() are held in DICTs. Only the methods used by this module are
+#               provided, and setValue() fills in the Data Source values.
+#
+# Syntax: hDataSourceValues = DICT - (Data Source name, Variable name) : value,
+#                                    (default None, for no values)
+#
+# Usage Examples:
+#                   context = SoaTestOfflineContext()
+#                   context.setValue("SFDC Saved Data", "SFDC: QueryAccount_XML", sXML)
+#                   getSfdcAccountIds(None, context)
+#                   aAccount = findSfdcObjectId(context, "SFDC: AccountIds", "Acme")
+#
+#=============================================================================#
+class SoaTestOfflineContext(object):
+    '''
+    A stand-in for the SOATest Extension context, holding the Data Source values
+    and the Variables in DICTs.
+    '''
+    
+    def __init__(self, hDataSourceValues=None):
+        
+        # DICT of (Data Source name, Variable name) : value
+        if (hDataSourceValues == None):
+            hDataSourceValues = {}
+        # end
+        self.hDataSourceValues = hDataSourceValues
+        
+        # DICT of Variable name : value
+        self.hVariables = {}
+        
+    # end __init__()
+    
+    def get(self, sVariableName):
+        '''
+        Returns the value saved by put(), or None
+        '''
+        return self.hVariables.get(sVariableName)
+    # end get()
+    
+    def getValue(self, sDataSourceName, sVariableName):
+        '''
+        Returns the Data Source value, raising KeyError when there is none
+        '''
+        return self.hDataSourceValues[(sDataSourceName, sVariableName)]
+    # end getValue()
+    
+    def put(self, sVariableName, oValue):
+        '''
+        Saves the value of the Variable
+        '''
+        self.hVariables[sVariableName] = oValue
+    # end put()
+    
+    def setValue(self, sDataSourceName, sVariableName, oValue):
+        '''
+        Sets the Data Source value
+        '''
+        self.hDataSourceValues[(sDataSourceName, sVariableName)] = oValue
+    # end setValue()
+    
+# END class - SoaTestOfflineContext
+
+
 #=============================================================================#
 #======================= END =================================================#
 #=============================================================================#
@@ -79,6 +79,7 @@ from PyWorks_Reflib import TIMESTAMP_STRING
 #    get_PyWorks_install_path()
 #    get_text_from_file(...)
 #    getMatchingKeyValue(...)
+#    init_print2()
 #    invertDict()
 #    is_blank(...)
 #    is_linux()
@@ -156,6 +157,16 @@ DICTIONARY = None
 global VERBOSE
 VERBOSE = False
 
+# The result of is_SOATest(), None until it is first called
+_IS_SOATEST = None
+
+# The SOATest Application class print2() shows messages with, or None when not running under SOATest
+_PRINT2_APPLICATION = None
+
+# DICT of log level : method of the PyWorks logger that print2() logs messages with,
+# None until init_print2() is first called
+_PRINT2_LOG_METHODS = None
+
 
 #=============================================================================#
 #--
@@ -2455,6 +2466,82 @@ def getMatchingKeyValue(hDictToSearch, sKeyToMatch, bCaseSensitive=False):
 # End - Function getMatchingKeyValue
 
 
+#=============================================================================#
+#--
+# Function: init_print2()
+#++
+#
+# Description: Works out, once, what print2() does with each message, so that print2()
+#              does not look it up again on every call:
+#                  Whether it is running from within SOATest, and so shows messages on the
+#                  SOATest Console with Application.showMessage()
+#                  Otherwise, the method of the PyWorks logger used for each log level
+#
+#              print2() calls this the first time it is called. Call it again if the
+#              runtime environment changed, e.g. after logging was reloaded.
+#
+#              The logger methods are found once, the log file started later by
+#              capture_results() or start_logger() is still written to, as it is
+#              added to the same PyWorks logger.
+#
+# Returns: DICT - Log level : method of the PyWorks logger, (empty when running from within
+#                 SOATest or when logging is not available)
+#
+# Syntax: N/A
+#
+# Usage Examples:
+#                 init_print2()
+#
+#=============================================================================#
+def init_print2():
+
+    '''
+    Works out, once, the runtime environment and the logger methods used by print2()
+    '''
+
+    global _IS_SOATEST
+    global _PRINT2_APPLICATION
+    global _PRINT2_LOG_METHODS
+
+    _IS_SOATEST = None
+    oApplication = None
+    hLogMethods = {}
+
+    if(is_SOATest() == True):
+
+        from com.parasoft.api import Application
+        oApplication = Application
+
+    else:  # Not running under SOATest
+        try:
+
+            import logging
+
+            # Get the PyWorks logger object
+            oLogger = logging.getLogger("PyWorks")
+
+            # The logger method of each valid log level setting
+            hLogMethods = {"DEBUG": oLogger.debug,
+                           "INFO": oLogger.info,
+                           "WARN": oLogger.warning,
+                           "WARNING": oLogger.warning,
+                           "ERROR": oLogger.error,
+                           "CRITICAL": oLogger.critical}
+
+        except:
+            hLogMethods = {}
+        # end
+
+    # end # Not running under SOATest
+
+    _PRINT2_APPLICATION = oApplication
+    _PRINT2_LOG_METHODS = hLogMethods
+
+    return hLogMethods
+
+# End Function - init_print2()
+
+
 #=============================================================================#
 # Function: invertDict()
 #
@@ -2617,6 +2704,13 @@ def is_SOATest():
     Identifies if running from within SOAtest
     '''
 
+    global _IS_SOATEST
+
+    # The runtime environment does not change, so only check it once
+    if(_IS_SOATEST != None):
+        return _IS_SOATEST
+    # end
+
     # Attempt to import a SOATest module from within a try/except to catch any error.
     # If it errors then not running from within SOATest
     # If it doesn't error the it is running from within SOATest.
@@ -2624,11 +2718,13 @@ def is_SOATest():
         from com.parasoft.api import Application
 
     except:
-        return False
+        _IS_SOATEST = False
     else:
-        return True
+        _IS_SOATEST = True
     # end
 
+    return _IS_SOATEST
+
 # end # Function - is_SOATest()
 
 
@@ -3844,6 +3940,9 @@ def printenv(sEnvVar = None):
 #              The majority of the methods in PyWorks use this method to alleviate the need
 #              for separate Jython print() and SOATest Application.showMessage() statements
 #
+#              The runtime environment and the logger method of each log level are worked out
+#              by init_print2() on the first call, and reused by every later call.
+#
 #
 # Returns: BOOLEAN - True on success, otherwise False
 #
@@ -3881,96 +3980,49 @@ def print2(sMessage, sLogLevel = "INFO", iChoice = 1):
     #    print("  iChoice: " + str(iChoice))
     ## end
 
-    bReturnStatus = False # Set default return value
+    hLogMethods = _PRINT2_LOG_METHODS
+    if(hLogMethods == None):
+        hLogMethods = init_print2()
+    # end
 
     # Determine if running from within SOATest
-    if(is_SOATest() == True):
-
-        from com.parasoft.api import *
+    if(_PRINT2_APPLICATION != None):
 
         print(sMessage)  # Echo message to stdout
 
         # Echo message to the SOATest Console
-        Application.showMessage(sMessage)
+        _PRINT2_APPLICATION.showMessage(sMessage)
 
-    else:  # Not running under SOATest
-        try:
+        return True
 
-            import logging
+    # end
 
-            # Define the valid log level settings
-            aValidLogLevels = ["CRITICAL", "ERROR", "WARNING", "WARN", "INFO", "DEBUG"]
+    # Not running under SOATest
+    if(iChoice >= 0): #  Write to STDOUT
+        print(sMessage)  # Echo message to stdout
+    # end
 
-            # Validate the Log Level value
-            if((sLogLevel.upper() in aValidLogLevels) == False):
-                sLogLevel = "ERROR"
-            # end
+    if(iChoice != 0): # Write to the log file via log(), if one was started
+        try:
 
-            # Validate the iChoice setting
-            if(iChoice > 0):
-                iChoice = 1
-            # end
-            if(iChoice < 0):
-                iChoice = -1
+            # Look up the logger method of the Log Level, invalid Log Levels are logged as ERROR
+            fLog = hLogMethods.get(sLogLevel)
+            if(fLog == None):
+                fLog = hLogMethods.get(sLogLevel.upper(), hLogMethods["ERROR"])
             # end
 
-            # Get the PyWorks logger object
-            oLogger = logging.getLogger("PyWorks")
+            fLog(sMessage)
 
-            # Now that iChoice is properly set we can attempt to write
-            if(iChoice == 0): #  Write only to STDOUT
-                print(sMessage)  # Echo message to stdout
+        except:
 
-            elif(iChoice == 1): # Write to STDOUT and to log file via log()
+            if(iChoice < 0):
                 print(sMessage)  # Echo message to stdout
-                # Write to the log file if one was started
-                if (sLogLevel.upper() == "DEBUG"):
-                    oLogger.debug(sMessage)           # Calls level 0 error
-                elif (sLogLevel.upper() == "INFO"):
-                    oLogger.info(sMessage)             # Calls  level 1 info
-                elif (sLogLevel.upper() == "WARN"):
-                    oLogger.warning(sMessage)           # Calls  level 2 warn
-                elif (sLogLevel.upper() == "ERROR"):
-                    oLogger.error(sMessage)           # Calls  level 3 error
-                else: # (sLogLevel.upper() == "CRITICAL"):
-                    oLogger.critical(sMessage)           # Calls  level 5 critical
-                #else:
-                #    oLogger.info(sMessage)           # If no level is specified, Calls level 1 info
-                # end
-
-            elif(iChoice == -1):# Write only to log file via log()
-
-                if (sLogLevel.upper() == "DEBUG"):
-                    oLogger.debug(sMessage)           # Calls level 0 error
-                elif (sLogLevel.upper() == "INFO"):
-                    oLogger.info(sMessage)             # Calls  level 1 info
-                elif ("WARN" in sLogLevel.upper()): # Cover both WARN and WARNING
-                    oLogger.warning(sMessage)           # Calls  level 2 warn
-                elif (sLogLevel.upper() == "ERROR"):
-                    oLogger.error(sMessage)           # Calls  level 3 error
-                else: # (sLogLevel.upper() == "CRITICAL"):
-                    oLogger.critical(sMessage)           # Calls  level 5 critical
-                #else:
-                #    oLogger.info(sMessage)           # If no level is specified, Calls level 1 info
-                # end
-
             # end
 
-            bReturnStatus = True
-
-        except:
-
-            print(sMessage)  # Echo message to stdout
-            
-            bReturnStatus = False
-
         # end
+    # end
 
-    # end # Not running under SOATest
-
-    bReturnStatus = True
-
-    return bReturnStatus
+    return True
 
 
 # End Function - print2()
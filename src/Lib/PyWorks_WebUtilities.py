@@ -24,14 +24,29 @@
 #=============================================================================#
 
 # Jython imports
+from __future__ import generators   # Jython2.2.1 needs this to use 'yield'
 #import sys
 #import traceback
-#import os                           # Adds ability to set/get OS Variables
+import os                           # Adds ability to set/get OS Variables
 #from datetime import date, datetime, timedelta # Add ability to get/format Dates
 #import time                         # Add ability to get/format Time
 #import random                       # Random number generator
 import re                           # Regular expressions
 
+# Memory-mapped files are not available in Jython2.2.1, see mapXMLFile()
+try:
+    import mmap
+except ImportError:
+    mmap = None
+# end
+
+# Process pools are not available in Jython2.2.1, see getMultipleXMLTagValuesBatch()
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+# end
+
 # PyWorks imports
 #from PyWorks_Reflib import TIMESTAMP_STRING
 from PyWorks_Utilities import print2
@@ -59,11 +74,41 @@ from PyWorks_Utilities import print2
 #  Key:   () = No parameters,  (...) = parameters required
 #
 # Functions:
+#    areTagsInXML(...)
+#    buildXML(...)
+#    buildXMLRecords(...)
+#    compileXMLPath(...)
+#    countXMLTags(...)
+#    countXMLTagsForTags(...)
 #    createXMLTags(...)
+#    decodeXMLEntities(...)
+#    diffXML(...)
+#    diffXMLFiles(...)
+#    disableXMLCache()
+#    enableXMLCache(...)
+#    escapeXMLValue(...)
+#    getMultipleXMLTagSpans(...)
 #    getMultipleXMLTagValues(...)
+#    getMultipleXMLTagValuesBatch(...)
+#    getMultipleXMLTagValuesForTags(...)
+#    getMultipleXMLTagValuesFromFile(...)
+#    getXMLCacheStats()
+#    getXMLPathValues(...)
 #    getXMLTagValue(...)
 #    isTagInXML(..)
+#    iterXMLRecords(...)
+#    iterXMLTagValues(...)
+#    iterXMLTagValuesForTags(...)
+#    mapXMLFile(...)
 #    removeXMLBrackets(...)
+#    unmapXMLFile(...)
+#    writeXML(...)
+#    writeXMLRecords(...)
+#
+# Classes:
+#    XMLDocument(...)
+#    XMLExtractionCache(...)
+#    XMLPath(...)
 #
 # Pre-requisites:
 # ++
@@ -85,465 +130,3800 @@ global VERBOSE
 VERBOSE = False
 
 
+# Regular Expression parts used to build the tag scanners
+_XML_NAMESPACE_PREFIX = r"(?:[^\s<>/:]+:)?"     # Optional 'prefix:' of a tag name
+_XML_ATTRIBUTES = r"(?:\s[^<>]*?)?"              # Optional attributes of a tag
 
 #=============================================================================#
 #--
-# Function: createXMLTags(...)
+# Function: _getXMLLocalName(...)
 #++
 #
-# Description:  Adds the brackets to tag name to make Opening and Closing XML tags
-#               Returns '<tag_name>' and '</tag_name>'  from 'tag_name' 
+# Description:  Returns the tag name w/o brackets and w/o its namespace prefix
+#               e.g. 'sf:Id' from '<sf:Id>'
 #
-# Returns: LIST = The Opening and Closing XML tags
-#                 [0] = STRING - Opening Tag
-#                 [1] = STRING - Closing Tag
+#=============================================================================#
+def _getXMLLocalName(sTagName):
+    
+    sTagWithoutBrackets = removeXMLBrackets(sTagName)
+    
+    return sTagWithoutBrackets[(sTagWithoutBrackets.rfind(":") + 1):]
+    
+# END method - _getXMLLocalName()
+
+
+#=============================================================================#
+#--
+# Class: _XMLTagScanner
+#++
 #
-# Syntax: sTag =  STRING - The XML tags to strip of the enclosing brackets "<>"
+# Description:  Internal single pass scanner used by the functions that extract the
+#               values of several XML tags at once.
 #
-# Usage Examples:
-#                    sTag = 'UserName'     # Tag name w/o brackets
-#                    addXMLBrackets(sTag)  #=>  UserName
+#               The names of all the requested tags are compiled into one Regular
+#               Expression, so the XML string is walked once no matter how many
+#               tags are asked for.
 #
-#                    sTag = '<Username>'   # Opening tag with Brackets
-#                    addXMLBrackets(sTag)  #=>  UserName
+#               Opening and Closing tags are paired the same way as in
+#               getMultipleXMLTagValues(); each Closing tag is paired with the first
+#               Opening tag of the same name found since the previous Closing tag
+#               of that name, or yields '' when there is none.
 #
-#                    sTag = '</UserName>'  # Closing tag with Brackets
-#                    createXMLTags(sTag)  #=>  UserName
+#               By default only the exact tags <tag_name> and </tag_name> are matched.
+#               The options let the same single scan also match:
+#                   bAttributes - Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#                   bIgnoreNamespace - Any namespace prefix, e.g. <Id>, <sf:Id> and <ns2:Id> for 'sf:Id'
+#                   bSelfClosing - Self-closing tags, e.g. <sf:Id/>, which have a value of ''
+#
+# Syntax: aTagNames = LIST of STRINGS - The names of the XML tags to match. Tags can be
+#                                       specified with or without the enclosing brackets "<>"
+#         bAttributes, bIgnoreNamespace, bSelfClosing = BOOLEAN - See above
 #
 #=============================================================================#
-def createXMLTags(sTagName):
-    '''
-    Adds the brackets to tag name to make Opening and Closing XML tags
-    Returns '<tag_name>' and '</tag_name>'  from 'tag_name' 
-    '''
+class _XMLTagScanner(object):
     
-    #VERBOSE = True
+    def __init__(self, aTagNames, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False):
+        
+        self.bSelfClosing = bSelfClosing
+        
+        # DICT of matched tag name : LIST of the names as specified by the caller.
+        # The matched name is the tag name w/o brackets, (and w/o its prefix when
+        # ignoring namespaces)
+        self.hTagKeys = {}
+        
+        # Escaped tag names for the Regular Expression, so that names like 'n1:Id'
+        # or names containing '.' only ever match themselves
+        aEscapedNames = []
+        
+        for sTagName in aTagNames:
+            if (bIgnoreNamespace == True):
+                sMatchName = _getXMLLocalName(sTagName)
+            else:
+                sMatchName = removeXMLBrackets(sTagName)
+            # end
+            if (self.hTagKeys.has_key(sMatchName) == False):
+                self.hTagKeys[sMatchName] = []
+                aEscapedNames.append(re.escape(sMatchName))
+            # end
+            self.hTagKeys[sMatchName].append(sTagName)
+        # end
+        
+        if (aEscapedNames == []):
+            self.oPattern = None
+            self.oClosingPattern = None
+            return
+        # end
+        
+        sNames = "(" + "|".join(aEscapedNames) + ")"
+        
+        sPrefix = ""
+        if (bIgnoreNamespace == True):
+            sPrefix = _XML_NAMESPACE_PREFIX
+        # end
+        
+        sAttributes = ""
+        sClosingSpace = ""
+        if (bAttributes == True):
+            sAttributes = _XML_ATTRIBUTES
+            sClosingSpace = r"\s*"
+        # end
+        
+        # group(1) = '/' for a Closing tag,  group(2) = tag name,
+        # group(3) = '/' for a self-closing tag
+        if ((bAttributes == True) | (bSelfClosing == True)):
+            self.oPattern = re.compile("<(/?)" + sPrefix + sNames + sAttributes + "(/?)>")
+        else:
+            self.oPattern = re.compile("<(/?)" + sPrefix + sNames + "()>")
+        # end
+        
+        # Closing tags only, for counting and existence checks
+        # group(1) = tag name
+        self.oClosingPattern = re.compile("</" + sPrefix + sNames + sClosingSpace + ">")
+        
+    # end __init__()
     
-    if(VERBOSE == True):
-        print2("Parameters - createXMLTags:")
-        print2("  sTagName: " + sTagName)
-    # end
+    def iterSpans(self, sXML, hPendingOpen=None, iStart=0, iEnd=None):
+        '''
+        Yields a (sTagName, iValueStart, iValueEnd) TUPLE for every Closing tag found,
+        (and every self-closing tag, when matching those), where sXML[iValueStart:iValueEnd]
+        is the value of the tag.
+        hPendingOpen holds the unpaired Opening tags and can be passed in again to
+        continue a scan over the next part of a document.
+        '''
+        
+        if (self.oPattern == None):
+            return
+        # end
+        
+        if (hPendingOpen == None):
+            hPendingOpen = {}
+        # end
+        
+        if (iEnd == None):
+            iEnd = len(sXML)
+        # end
+        
+        bSelfClosing = self.bSelfClosing
+        
+        for oMatch in self.oPattern.finditer(sXML, iStart, iEnd):
+            
+            sClosingSlash, sTagName, sSelfClosingSlash = oMatch.groups()
+            
+            if (sSelfClosingSlash):
+                # Self-closing tag, which holds no value
+                if ((bSelfClosing == True) & (sClosingSlash == "")):
+                    yield (sTagName, oMatch.end(), oMatch.end())
+                # end
+                
+            elif (sClosingSlash):
+                # Closing tag, pair it with the pending Opening tag if there is one
+                iValueStart = hPendingOpen.get(sTagName, -1)
+                iValueEnd = oMatch.start()
+                if (iValueStart == -1):
+                    yield (sTagName, iValueEnd, iValueEnd)
+                else:
+                    hPendingOpen[sTagName] = -1
+                    yield (sTagName, iValueStart, iValueEnd)
+                # end
+                
+            elif (hPendingOpen.get(sTagName, -1) == -1):
+                # First Opening tag since the last Closing tag of this name
+                hPendingOpen[sTagName] = oMatch.end()
+            # end
+            
+        # end
+        
+    # end iterSpans()
     
-    # Add the brackets to make the Opening tag
-    sFullOpeningTag = "<" + sTagName + ">"
+# END class - _XMLTagScanner
+
+
+# Compiled scanners, keyed by the TUPLE of tag names and options, so repeated
+# calls for the same tags do not compile their Regular Expression again
+_XML_TAG_SCANNERS = {}
+_XML_TAG_SCANNERS_MAX = 100
+
+#=============================================================================#
+#--
+# Function: _getXMLTagScanner(...)
+#++
+#
+# Description:  Returns the (cached) _XMLTagScanner for the LIST of tag names and options
+#
+#=============================================================================#
+def _getXMLTagScanner(aTagNames, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False):
     
-    # Add the brackets and slash to make the Closing tag
-    sFullClosingTag = "</" + sTagName + ">"
+    tKey = (tuple(aTagNames), bAttributes, bIgnoreNamespace, bSelfClosing)
     
-    if (VERBOSE == True):
-        print2("Opening tag:  " + sFullOpeningTag)
-        print2("Closing tag:  " + sFullClosingTag)
+    oScanner = _XML_TAG_SCANNERS.get(tKey)
+    if (oScanner == None):
+        
+        # Keep the cache bounded
+        if (len(_XML_TAG_SCANNERS) >= _XML_TAG_SCANNERS_MAX):
+            _XML_TAG_SCANNERS.clear()
+        # end
+        
+        oScanner = _XMLTagScanner(aTagNames, bAttributes, bIgnoreNamespace, bSelfClosing)
+        _XML_TAG_SCANNERS[tKey] = oScanner
     # end
     
-    sXMLTags = [sFullOpeningTag, sFullClosingTag]
-    
-    return sXMLTags
+    return oScanner
     
-# END method - createXMLTags()
+# END method - _getXMLTagScanner()
+
+
+# Number of characters read at a time by the streaming functions
+XML_CHUNK_SIZE = 65536
 
+# How far ahead diffXML() looks, in tags, for the place two documents match again after
+# a tag was added or removed, and how many tags in a row must match there, see _findXMLResync()
+XML_DIFF_RESYNC_TAGS = 32
+XML_DIFF_RESYNC_MATCHES = 4
 
+# Default limits of the extraction cache, see enableXMLCache()
+XML_CACHE_MAX_ENTRIES = 256
+XML_CACHE_MAX_BYTES = 16777216
+
+# The XMLExtractionCache in use, or None when caching is disabled
+_XML_EXTRACTION_CACHE = None
 
 #=============================================================================#
 #--
-# Function: getMultipleXMLTagValues(...)
+# Function: _iterXMLChunks(...)
 #++
 #
-# Description:  Parses a string containing XML Tags to get the values of the specified
-#               XML tag name, when there are multiple occurrences of the same Tag name . 
-#               Checks that the Tags exists, NOT if they holds any content.
-#               Note that a Closing XML tag </tag_name> with 
-#               no Opening tag <tag_name> proceeding it will return ''.
-#
-# Returns: LIST of STRINGS - Each STRING in the LIST contains the value of an XML Tag
-#                 [0] = The STRING between the first Opening and Closing XML Tags, or None
-#                 [1] = The STRING between the second Opening and Closing XML Tags, or None
-#                 [n] = The STRING between the nth Tags
-#
-#                 Returns [] If no occurrence of the Tag exists in the XML STRING
-#                 Returns a empty STRING' For any an occurrence of the Closing Tag, 
-#                 with not Opening Tag in the XML STRING
-#
-# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
-#         sTagName =  STRING - The name of the XML tag to match. Tags can be
-#                              specified with or without the enclosing brackets "<>"
-#
-# Usage Examples:
-#                   sXML = '<response><UserName>Bob</UserName><UserName>Pat</UserName><UserName>Tom</UserName></Nickname></response>'
-#
-#                   sTagName = "UserName"
-#                   getMultipleXMLTagValues(sXML, sTag)  #=>  ['Bob','Pat','Tom'] 
+# Description:  Generates the text of an XML source in chunks, where the source is
+#               a file name, an open file object, or an iterator of STRINGS
 #
-#                   sTagName = "response"       # XML Tag containing other XML Tags
-#                   getXMLTagValue(sXML, sTag)  #=>  ['<UserName>Bob</UserName><UserName>Pat</UserName><UserName>Tom</UserName></Nickname>']
+#=============================================================================#
+def _iterXMLChunks(oSource, iChunkSize=XML_CHUNK_SIZE):
+    
+    if (type(oSource) in (type(""), type(u""))):
+        # A file name
+        oFileObject = open(oSource, 'r')
+        sChunk = oFileObject.read(iChunkSize)
+        while sChunk:
+            yield sChunk
+            sChunk = oFileObject.read(iChunkSize)
+        # end
+        oFileObject.close()
+        
+    elif (hasattr(oSource, "read")):
+        # An open file object
+        sChunk = oSource.read(iChunkSize)
+        while sChunk:
+            yield sChunk
+            sChunk = oSource.read(iChunkSize)
+        # end
+        
+    else:
+        # An iterator of STRINGS
+        for sChunk in oSource:
+            if (sChunk):
+                yield sChunk
+            # end
+        # end
+    # end
+    
+# END method - _iterXMLChunks()
+
+#=============================================================================#
+#--
+# Function: _iterXMLStreamSpans(...)
+#++
 #
-#                   sTagName = "Nickname"  # Closing XML tag with no Opening Tag
-#                   getXMLTagValue(sXML, sTag)  #=>  ['']
+# Description:  Runs an _XMLTagScanner over an XML source read in chunks, generating
+#               a (sTagName, sValue) TUPLE for every Closing tag found.
 #
-#                   sTagName = "<BogusTag>"  # An XML tag not contained within the XML String
-#                   getXMLTagValue(sXML, sTag)  #=>  []
+#               Only the text that can still be part of a value is kept between chunks:
+#               the text from the first unpaired Opening tag on, or else just the last
+#               incomplete tag. Tags that straddle two chunks are completed by the next chunk.
 #
 #=============================================================================#
-def getMultipleXMLTagValues(sXML, sTagName):
-    '''
-    Parses a string containing XML Tags to get the values of the specified
-    XML tag name, when there are multiple occurrences of the same Tag name 
-    Note that a Closing XML tag (</tag_name> ) with no Opening XML Tag
-    <tag_name> proceeding it will return ''
-    '''
+def _iterXMLStreamSpans(oSource, oScanner, iChunkSize=XML_CHUNK_SIZE):
     
-    #VERBOSE = True
+    sBuffer = ""
+    iScanFrom = 0          # Offset in sBuffer of the text not yet scanned
+    hPendingOpen = {}      # Offsets in sBuffer of the unpaired Opening tags
     
-    # Define default return value
-    aMatchingTagValues = []
+    aNewChunks = []
+    iNewLength = 0
     
-    if(VERBOSE == True):
-        print2("Parameters - getMultipleXMLTagValues:")
-        print2("  sXML: " + sXML)
-        print2("  sTagName: " + sTagName)
-    # end
+    oChunks = _iterXMLChunks(oSource, iChunkSize)
+    bMoreChunks = True
     
-    # Generate the Opening and Closing XML tags
-    #
-    # Its easier to first remove brackets (if they existed).
-    sTagWithoutBrackets = removeXMLBrackets(sTagName)
+    while bMoreChunks:
+        
+        # Collect at least as much new text as is being kept, so that a long
+        # value does not get copied again for every chunk
+        try:
+            sChunk = oChunks.next()
+            aNewChunks.append(sChunk)
+            iNewLength = iNewLength + len(sChunk)
+            if (iNewLength < len(sBuffer)):
+                continue
+            # end
+        except StopIteration:
+            bMoreChunks = False
+        # end
+        
+        sBuffer = sBuffer + "".join(aNewChunks)
+        aNewChunks = []
+        iNewLength = 0
+        
+        if (bMoreChunks):
+            # A tag starting at the last '<' may not be complete yet
+            iSafeEnd = sBuffer.rfind("<", iScanFrom)
+            if (iSafeEnd == -1):
+                iSafeEnd = len(sBuffer)
+            # end
+        else:
+            iSafeEnd = len(sBuffer)
+        # end
+        
+        for sTagWithoutBrackets, iValueStart, iValueEnd in oScanner.iterSpans(sBuffer, hPendingOpen, iScanFrom, iSafeEnd):
+            yield (sTagWithoutBrackets, sBuffer[iValueStart:iValueEnd])
+        # end
+        
+        # Drop the text that can no longer be part of a value
+        iKeepFrom = iSafeEnd
+        for iValueStart in hPendingOpen.values():
+            if ((iValueStart != -1) & (iValueStart < iKeepFrom)):
+                iKeepFrom = iValueStart
+            # end
+        # end
+        
+        if (iKeepFrom > 0):
+            sBuffer = sBuffer[iKeepFrom:]
+            for sTagWithoutBrackets, iValueStart in hPendingOpen.items():
+                if (iValueStart != -1):
+                    hPendingOpen[sTagWithoutBrackets] = iValueStart - iKeepFrom
+                # end
+            # end
+        # end
+        iScanFrom = iSafeEnd - iKeepFrom
+        
+    # end
     
-    # Generate the Opening and Closing tags (with brackets)
-    aXMLTags = createXMLTags(sTagWithoutBrackets)
+# END method - _iterXMLStreamSpans()
+
+
+# Least number of characters of XML handed to a process at a time by
+# getMultipleXMLTagValuesBatch(), so small documents share one task
+XML_BATCH_CHUNK_BYTES = 1048576
+
+#=============================================================================#
+#--
+# Function: _getXMLTagValuesForDocuments(...)
+#++
+#
+# Description:  Worker of getMultipleXMLTagValuesBatch(), takes a (aDocuments, aTagNames)
+#               TUPLE and returns the LIST of getMultipleXMLTagValuesForTags() results,
+#               one per document, where each document is an XML string or a file name
+#
+#=============================================================================#
+def _getXMLTagValuesForDocuments(tWork):
     
-    sFullOpeningTag = aXMLTags[0]
-    sFullClosingTag = aXMLTags[1]
+    aDocuments, aTagNames = tWork
     
-    if (VERBOSE == True):
-        print2("Opening tag:  " + sFullOpeningTag)
-        print2("Closing tag:  " + sFullClosingTag)
+    aResults = []
+    for sDocument in aDocuments:
+        
+        if (sDocument.find("<") != -1):
+            aResults.append(getMultipleXMLTagValuesForTags(sDocument, aTagNames))
+        else:
+            oXMLMap = mapXMLFile(sDocument)
+            try:
+                aResults.append(getMultipleXMLTagValuesForTags(oXMLMap, aTagNames))
+            finally:
+                unmapXMLFile(oXMLMap)
+            # end
+        # end
+        
     # end
     
-    # Determine the length of the Opening and Closing Tags
-    iOpeningTagLength = len(sFullOpeningTag)
-    iClosingTagLength = len(sFullClosingTag)
+    return aResults
     
-    if (VERBOSE == True):
-        print2("Opening tag length:  " + str(iOpeningTagLength))
-        print2("Closing tag length:  " + str(iClosingTagLength))
-    # end
-    #
-    iTotalTagCount = sXML.count(sFullClosingTag)
+# END method - _getXMLTagValuesForDocuments()
+
+
+# Types of the values written as text by the XML builder functions
+_XML_STRING_TYPES = (type(""), type(u""))
+
+# Characters that have to be escaped in the value of an XML tag
+_XML_SPECIAL_CHARS = re.compile("[&<>]")
+
+# Number of pieces of XML held by the builder functions before writing them to a file
+XML_WRITE_BUFFER_PARTS = 4096
+
+# Opening and Closing tags made by the builder functions, by tag name
+_XML_BUILD_TAGS = {}
+_XML_BUILD_TAGS_MAX = 1000
+
+#=============================================================================#
+#--
+# Function: _getXMLBuildTags(...)
+#++
+#
+# Description:  Returns the (cached) Opening and Closing tags for a tag name,
+#               specified with or without the enclosing brackets "<>"
+#
+#=============================================================================#
+def _getXMLBuildTags(sTagName):
     
-    # Verify that the specified tag exists
-    if (iTotalTagCount == 0):
-        if (VERBOSE == True):
-            print2("No Closing tag found:  " + sFullClosingTag)
+    tTags = _XML_BUILD_TAGS.get(sTagName)
+    if (tTags == None):
+        
+        # Keep the cache bounded
+        if (len(_XML_BUILD_TAGS) >= _XML_BUILD_TAGS_MAX):
+            _XML_BUILD_TAGS.clear()
         # end
-        # No occurrence of the Closing Tag found so get out of this function
-        return aMatchingTagValues
+        
+        sTagWithoutBrackets = removeXMLBrackets(sTagName)
+        tTags = ("<" + sTagWithoutBrackets + ">", "</" + sTagWithoutBrackets + ">")
+        _XML_BUILD_TAGS[sTagName] = tTags
     # end
     
-    if (VERBOSE == True):
-        print2("Total Closing tags found:  " + str(iTotalTagCount))
-    # end
+    return tTags
     
-    # Seed the counter
-    iCurrentTag = iTotalTagCount
+# END method - _getXMLBuildTags()
+
+
+#=============================================================================#
+#--
+# Class: _XMLBuffer
+#++
+#
+# Description:  Internal buffer of the pieces of XML made by the builder functions,
+#               which are joined once at the end, or written to a file object in
+#               batches of XML_WRITE_BUFFER_PARTS pieces.
+#
+#=============================================================================#
+class _XMLBuffer(object):
     
-    # Loop to get that values of each of the Tags
-    while iCurrentTag > 0:
+    def __init__(self, oFileObject=None):
         
-        # Find the position of the first character of each Tag in the XML string
-        iIndexOfFirstOpeningTag = sXML.find(sFullOpeningTag)
-        iIndexOfFirstClosingTag = sXML.find(sFullClosingTag)
+        self.aParts = []
+        self.oFileObject = oFileObject
         
-        if (VERBOSE == True):
-            print2("Opening tag index:  " + str(iIndexOfFirstOpeningTag))
-            print2("Closing tag index:  " + str(iIndexOfFirstClosingTag))
+        # Number of characters written to the file object
+        self.iLength = 0
+        
+    # end __init__()
+    
+    def checkFlush(self):
+        '''
+        Writes the pieces held to the file object, once there are enough of them
+        '''
+        
+        if ((self.oFileObject != None) and (len(self.aParts) >= XML_WRITE_BUFFER_PARTS)):
+            self.flush()
         # end
         
-        # See if either of the Tags can't be found, save a value of ''
-        if ((iIndexOfFirstOpeningTag == -1 ) | (iIndexOfFirstClosingTag == -1 )):
-            if (VERBOSE == True):
-                print2("Missing either Opening XML Tag or Closing XML tag")
-            # end
-            # Save a value of '' fro the current occurrence of the TAg
-            aMatchingTagValues.append('')
-            
-        else:
-            # Get the text between the Opening and Closing Tags
-            sFoundXMLTagValue = sXML[(iIndexOfFirstOpeningTag + iOpeningTagLength):iIndexOfFirstClosingTag]
-            
-            if (VERBOSE == True):
-                    print2("Found XML tag value: '" + sFoundXMLTagValue + "'")
-            # end
-            
-            # Save the STRING between the Opening and Closing Tags
-            aMatchingTagValues.append(sFoundXMLTagValue)
-            
-        # end - See if either of the Tags...
+    # end checkFlush()
+    
+    def flush(self):
+        '''
+        Writes the pieces held to the file object
+        '''
         
-        # Update the XML STRING with the current Closing tag removed
-        sXML = sXML[(iIndexOfFirstClosingTag + iClosingTagLength) :]
+        sXML = "".join(self.aParts)
         
-        if (VERBOSE == True):
-                print2("Updated XML STRING: '" + sXML + "'")
-        # end
-        # Update the count of the remaining Closing Tags
-        iCurrentTag = sXML.count(sFullClosingTag)
+        # Emptied in place, the builder functions hold on to the LIST
+        del self.aParts[:]
         
-        if (VERBOSE == True):
-                print2("Remaining number of XML Tags: " + str(iCurrentTag))
+        if (sXML != ""):
+            self.oFileObject.write(sXML)
+            self.iLength = self.iLength + len(sXML)
         # end
         
-    # end - Loop to get that values
-    
-    return aMatchingTagValues
+    # end flush()
     
-# END method - getXMLTagValue()
+# END class - _XMLBuffer
 
 
 #=============================================================================#
 #--
-# Function: getXMLTagValue(...)
+# Function: _appendXMLChildren(...)
 #++
 #
-# Description:  Parses an XML string containing XML Tags to get the values of the 
-#               first occurrence of the specified tag name.
-#
-#               If more than one occurrence of the specified tag name can exist
-#               in the XML string use: getMultipleXMLTagValues()
-#                
-#               Checks that the Tag exists, NOT if it holds any content.
-#               Note that a Closing XML tag </tag_name> with 
-#               no Opening tag <tag_name> proceeding it will return None.
+# Description:  Adds the XML for the child tags held in a DICT, or in a LIST (or
+#               iterator) of (tag name, value) TUPLES, to an _XMLBuffer
 #
-# Returns: STRING = The STRING between the Opening and Closing XML Tags, or None
+#=============================================================================#
+def _appendXMLChildren(oBuffer, oChildren):
+    
+    if (hasattr(oChildren, "items")):
+        oChildren = oChildren.items()
+    # end
+    
+    for sTagName, oValue in oChildren:
+        _appendXMLElement(oBuffer, sTagName, oValue)
+        oBuffer.checkFlush()
+    # end
+    
+# END method - _appendXMLChildren()
+
+
+#=============================================================================#
+#--
+# Function: _appendXMLElement(...)
+#++
 #
-# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
-#         sTagName =  STRING - The name of the XML tags to match. Tags can be
-#                              specified with or without the enclosing brackets "<>"
+# Description:  Adds the XML for a tag and its value to an _XMLBuffer, see buildXML()
+#               for how each type of value is written
 #
-# Usage Examples:
-#                   sXML = '<response><UserName>Bob</UserName></Nickname></response>'
+#=============================================================================#
+def _appendXMLElement(oBuffer, sTagName, oValue):
+    
+    sOpeningTag, sClosingTag = _getXMLBuildTags(sTagName)
+    aParts = oBuffer.aParts
+    
+    if (oValue == None):
+        aParts.append(sOpeningTag + sClosingTag)
+        
+    elif (type(oValue) in _XML_STRING_TYPES):
+        aParts.append(sOpeningTag + escapeXMLValue(oValue) + sClosingTag)
+        
+    elif (hasattr(oValue, "items")):
+        # A DICT of child tags
+        aParts.append(sOpeningTag)
+        _appendXMLChildren(oBuffer, oValue.items())
+        aParts.append(sClosingTag)
+        
+    elif (hasattr(oValue, "__iter__") or (type(oValue) in (type([]), type(())))):
+        
+        # The first item tells a LIST of (tag name, value) TUPLES for the child tags
+        # from a LIST of values for repeated tags of this name
+        oIterator = iter(oValue)
+        try:
+            oFirstValue = oIterator.next()
+        except StopIteration:
+            return
+        # end
+        
+        if (type(oFirstValue) == type(())):
+            aParts.append(sOpeningTag)
+            _appendXMLElement(oBuffer, oFirstValue[0], oFirstValue[1])
+            _appendXMLChildren(oBuffer, oIterator)
+            aParts.append(sClosingTag)
+        else:
+            _appendXMLElement(oBuffer, sTagName, oFirstValue)
+            for oItemValue in oIterator:
+                _appendXMLElement(oBuffer, sTagName, oItemValue)
+                oBuffer.checkFlush()
+            # end
+        # end
+        
+    else:
+        aParts.append(sOpeningTag + escapeXMLValue(str(oValue)) + sClosingTag)
+    # end
+    
+# END method - _appendXMLElement()
+
+
+#=============================================================================#
+#--
+# Function: _appendXMLRecords(...)
+#++
 #
-#                   sTagName = "UserName"
-#                   getXMLTagValue(sXML, sTag)  #=>  Bob
+# Description:  Adds the XML for rows of values to an _XMLBuffer, see buildXMLRecords()
 #
-#                   sTagName = "response"       # XML Tag containing other XML Tags
-#                   getXMLTagValue(sXML, sTag)  #=>  <UserName>Bob</UserName></Nickname>
+#=============================================================================#
+def _appendXMLRecords(oBuffer, aRows, sRecordTagName, aFieldTagNames):
+    
+    sRecordOpeningTag, sRecordClosingTag = _getXMLBuildTags(sRecordTagName)
+    
+    aFieldTags = []
+    for sFieldTagName in aFieldTagNames:
+        aFieldTags.append(_getXMLBuildTags(sFieldTagName))
+    # end
+    aColumns = range(len(aFieldTags))
+    
+    aParts = oBuffer.aParts
+    
+    for tRow in aRows:
+        
+        aParts.append(sRecordOpeningTag)
+        
+        for iColumn in aColumns:
+            oValue = tRow[iColumn]
+            
+            # A missing value leaves out the tag, as iterXMLRecords() reads it
+            if (oValue != None):
+                if (type(oValue) not in _XML_STRING_TYPES):
+                    oValue = str(oValue)
+                # end
+                aParts.append(aFieldTags[iColumn][0] + escapeXMLValue(oValue) + aFieldTags[iColumn][1])
+            # end
+        # end
+        
+        aParts.append(sRecordClosingTag)
+        oBuffer.checkFlush()
+        
+    # end
+    
+# END method - _appendXMLRecords()
+
+
+#=============================================================================#
+#--
+# Function: _iterXMLLeaves(...)
+#++
 #
-#                   sTagName = "Nickname"  # Closing XML tag with no Opening Tag
-#                   getXMLTagValue(sXML, sTag)  #=>  None
+# Description:  Generates a (path, value, offset) TUPLE for each tag of an XML source that
+#               holds no other tags, in document order, reading the source a chunk at a time.
+#               The path is the names of the enclosing tags and the tag joined by '/',
+#               e.g. 'soapenv:Body/queryResponse/result/records/sf:Id', and the offset is
+#               that of the Opening tag. Tags named in hIgnoreTags (by name, or by local
+#               name for names without a prefix), and all the tags inside them, are skipped.
 #
 #=============================================================================#
-def getXMLTagValue(sXML, sTagName):
-    '''
-    Parses an  XML string containing XML Tags to get the values of the 
-    first occurrence of the specified tag name.
+def _iterXMLLeaves(oSource, hIgnoreTags, iChunkSize=XML_CHUNK_SIZE):
     
-    If more than one occurrence of the specified tag name can exist
-    in the XML string use: getMultipleXMLTagValues()
+    oPattern = XMLPath.oTagPattern
     
-    Note that a Closing XML tag (</tag_name> ) with no Opening XML Tag
-    <tag_name> proceeding it will return None
-    '''
+    # DICT of tag name : True if the tag is ignored
+    hIgnored = {}
     
-    #VERBOSE = True
+    aOpenTags = []        # Names of the open tags
+    bLeaf = False         # True while the innermost open tag holds no tags
+    iLeafOffset = 0       # Offset of the Opening tag of the innermost open tag
+    iValueStart = 0       # Offset of the value of the innermost open tag
+    iIgnoreDepth = 0      # Nesting level within an ignored tag
     
-    if(VERBOSE == True):
-        print2("Parameters - getXMLTagValue:")
-        print2("  sXML: " + sXML)
-        print2("  sTagName: " + sTagName)
-    # end
+    sBuffer = ""
+    iBufferOffset = 0     # Offset of sBuffer[0] in the XML
+    iScanStart = 0        # Where to start scanning sBuffer for tags
     
-    # Verify that the specified tag exists
-    if (isTagInXML == False):
-        if (VERBOSE == True):
-            print2("No tag:  " + sTagName)
+    oChunks = _iterXMLChunks(oSource, iChunkSize)
+    bLastChunk = False
+    
+    while (bLastChunk == False):
+        
+        try:
+            sBuffer = sBuffer + oChunks.next()
+        except StopIteration:
+            bLastChunk = True
         # end
-        return None
+        
+        # A tag may be split at the end of the buffer, so only scan up to the last '<'
+        if (bLastChunk == True):
+            iScanEnd = len(sBuffer)
+        else:
+            iScanEnd = sBuffer.rfind("<")
+            if (iScanEnd < iScanStart):
+                continue
+            # end
+        # end
+        
+        for oMatch in oPattern.finditer(sBuffer, iScanStart, iScanEnd):
+            
+            sClosingSlash, sTagName, sSelfClosingSlash = oMatch.groups()
+            
+            if (iIgnoreDepth > 0):
+                if (sClosingSlash):
+                    iIgnoreDepth = iIgnoreDepth - 1
+                elif (sSelfClosingSlash == ""):
+                    iIgnoreDepth = iIgnoreDepth + 1
+                # end
+                continue
+            # end
+            
+            if (sClosingSlash):
+                
+                # Close the tag, and any tags inside it left open
+                iOpenTag = len(aOpenTags) - 1
+                while ((iOpenTag >= 0) and (aOpenTags[iOpenTag] != sTagName)):
+                    iOpenTag = iOpenTag - 1
+                # end
+                
+                # A Closing tag with no Opening tag is skipped
+                if (iOpenTag >= 0):
+                    if ((bLeaf == True) and (iOpenTag == len(aOpenTags) - 1)):
+                        yield ("/".join(aOpenTags), sBuffer[(iValueStart - iBufferOffset):oMatch.start()], iLeafOffset)
+                    # end
+                    del aOpenTags[iOpenTag:]
+                    bLeaf = False
+                # end
+                
+                continue
+            # end
+            
+            bIgnored = hIgnored.get(sTagName)
+            if (bIgnored == None):
+                bIgnored = (hIgnoreTags.has_key(sTagName) or 
+                            hIgnoreTags.has_key(sTagName[(sTagName.rfind(":") + 1):]))
+                hIgnored[sTagName] = bIgnored
+            # end
+            
+            if (bIgnored):
+                if (sSelfClosingSlash == ""):
+                    iIgnoreDepth = 1
+                # end
+                
+            elif (sSelfClosingSlash):
+                aOpenTags.append(sTagName)
+                yield ("/".join(aOpenTags), "", iBufferOffset + oMatch.start())
+                aOpenTags.pop()
+                bLeaf = False
+                
+            else:
+                aOpenTags.append(sTagName)
+                bLeaf = True
+                iLeafOffset = iBufferOffset + oMatch.start()
+                iValueStart = iBufferOffset + oMatch.end()
+            # end
+            
+        # end
+        
+        # Keep the rest of the buffer, and the value of the innermost tag if it may be a leaf
+        iKeep = iScanEnd
+        if (bLeaf == True):
+            iKeep = min(iKeep, iValueStart - iBufferOffset)
+        # end
+        sBuffer = sBuffer[iKeep:]
+        iBufferOffset = iBufferOffset + iKeep
+        iScanStart = iScanEnd - iKeep
+        
     # end
     
-    # Generate the Opening and Closing XML tags
-    
-    # Its easier to first remove brackets (if they existed).
-    sTagWithoutBrackets = removeXMLBrackets(sTagName)
-    
-    # Generate the Opening and Closing tags (with brackets)
-    aXMLTags = createXMLTags(sTagWithoutBrackets)
+# END method - _iterXMLLeaves()
+
+
+#=============================================================================#
+#--
+# Function: _diffXMLLeaves(...)
+#++
+#
+# Description:  Compares the (path, value, offset) TUPLES generated by _iterXMLLeaves()
+#               for two XML sources, returning up to iMaxDiffs differences, see diffXML()
+#
+#=============================================================================#
+def _diffXMLLeaves(oExpectedLeaves, oActualLeaves, iMaxDiffs, bIgnoreOrder):
     
-    sFullOpeningTag = aXMLTags[0]
-    sFullClosingTag = aXMLTags[1]
+    aDiffs = []
     
-    if (VERBOSE == True):
-        print2("Opening tag:  " + sFullOpeningTag)
-        print2("Closing tag:  " + sFullClosingTag)
+    if (iMaxDiffs < 1):
+        return aDiffs
     # end
     
-    # Determine the length of the Opening and Closing Tags
-    iOpeningTagLength = len(sFullOpeningTag)
-    iClosingTagLength = len(sFullClosingTag)
+    if (bIgnoreOrder == False):
+        
+        # The tags read ahead of the ones being compared
+        aExpected = []
+        aActual = []
+        iLookAhead = XML_DIFF_RESYNC_TAGS + XML_DIFF_RESYNC_MATCHES
+        
+        # Walk both documents together, stopping once iMaxDiffs differences are found
+        while (len(aDiffs) < iMaxDiffs):
+            
+            _readXMLLeaves(oExpectedLeaves, aExpected, 1)
+            _readXMLLeaves(oActualLeaves, aActual, 1)
+            
+            if ((len(aExpected) == 0) and (len(aActual) == 0)):
+                break
+            # end
+            
+            if (len(aExpected) == 0):
+                aDiffs.append(_makeXMLDiff(None, aActual.pop(0)))
+                continue
+            elif (len(aActual) == 0):
+                aDiffs.append(_makeXMLDiff(aExpected.pop(0), None))
+                continue
+            # end
+            
+            tExpected = aExpected[0]
+            tActual = aActual[0]
+            if ((tExpected[0] == tActual[0]) and (tExpected[1] == tActual[1])):
+                del aExpected[0]
+                del aActual[0]
+                continue
+            # end
+            
+            # Look ahead for where the documents match again, after tags added to the
+            # actual document, or removed from it, rather than reporting every later tag
+            _readXMLLeaves(oExpectedLeaves, aExpected, iLookAhead)
+            _readXMLLeaves(oActualLeaves, aActual, iLookAhead)
+            
+            iUnexpected = _findXMLResync(aExpected, aActual)
+            iMissing = _findXMLResync(aActual, aExpected)
+            
+            if ((iUnexpected == None) and (iMissing == None)):
+                aDiffs.append(_makeXMLDiff(aExpected.pop(0), aActual.pop(0)))
+            elif ((iMissing == None) or ((iUnexpected != None) and (iUnexpected <= iMissing))):
+                for iTag in range(min(iUnexpected, iMaxDiffs - len(aDiffs))):
+                    aDiffs.append(_makeXMLDiff(None, aActual.pop(0)))
+                # end
+            else:
+                for iTag in range(min(iMissing, iMaxDiffs - len(aDiffs))):
+                    aDiffs.append(_makeXMLDiff(aExpected.pop(0), None))
+                # end
+            # end
+            
+        # end
+        
+        return aDiffs
+    # end
     
-    if (VERBOSE == True):
-        print2("Opening tag length:  " + str(iOpeningTagLength))
-        print2("Closing tag length:  " + str(iClosingTagLength))
+    # Count each (path, value) of the expected document,
+    # as a LIST of [LIST of offsets, number of them matched so far]
+    hExpected = {}
+    for sPath, sValue, iOffset in oExpectedLeaves:
+        aEntry = hExpected.get((sPath, sValue))
+        if (aEntry == None):
+            hExpected[(sPath, sValue)] = [[iOffset], 0]
+        else:
+            aEntry[0].append(iOffset)
+        # end
     # end
-    #
-    # Find the position of the first character of each Tag in the XML string
-    iIndexOfOpeningTag = sXML.find(sFullOpeningTag)
-    iIndexOfClosingTag = sXML.find(sFullClosingTag)
     
-    if (VERBOSE == True):
-        print2("Opening tag index:  " + str(iIndexOfOpeningTag))
-        print2("Closing tag index:  " + str(iIndexOfClosingTag))
+    # Match each tag of the actual document with an unmatched one of the same path and value
+    for tActual in oActualLeaves:
+        aEntry = hExpected.get((tActual[0], tActual[1]))
+        if ((aEntry != None) and (aEntry[1] < len(aEntry[0]))):
+            aEntry[1] = aEntry[1] + 1
+        else:
+            aDiffs.append(_makeXMLDiff(None, tActual))
+            if (len(aDiffs) >= iMaxDiffs):
+                return aDiffs
+            # end
+        # end
     # end
     
-    # If either of the Tags can't be found, return None
-    if ((iIndexOfOpeningTag == -1 ) | (iIndexOfClosingTag == -1 )):
-        if (VERBOSE == True):
-            print2("Missing either Opening XML Tag or Closing XML tag")
+    # The expected tags left unmatched, in document order
+    aMissing = []
+    for (sPath, sValue), aEntry in hExpected.items():
+        aOffsets, iMatched = aEntry
+        for iOffset in aOffsets[iMatched:]:
+            aMissing.append((iOffset, sPath, sValue))
         # end
-        return None
     # end
+    aMissing.sort()
     
-    # Save the STRING between the Opening and Closing Tags
-    sXMLTagValue = sXML[(iIndexOfOpeningTag + iOpeningTagLength):iIndexOfClosingTag]
+    for iOffset, sPath, sValue in aMissing[:(iMaxDiffs - len(aDiffs))]:
+        aDiffs.append(_makeXMLDiff((sPath, sValue, iOffset), None))
+    # end
     
-    return sXMLTagValue
+    return aDiffs
     
-# END method - getXMLTagValue()
+# END method - _diffXMLLeaves()
+
 
 #=============================================================================#
 #--
-# Function: isTagInXML(...)
+# Function: _findXMLResync(...)
 #++
 #
-# Description:  Parses a string containing XML Tags to see if the specified
-#               tag name exists. 
-#               Checks that the Tag exists, NOT if it holds any content.
-#               Note that a null tag (e.g. a Closing tag </tag_name> with 
-#               no Opening tag <tag_name>) will be identified as existing.
-#
-# Returns: BOOLEAN = True if the Tag exists, otherwise False
-#
-# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
-#         sTagName =  STRING - The name of the XML tags to match. Names can be
-#                          specified with or without the enclosing brackets "<>"
-#
-# Usage Examples:
-#                   sXML = '<response><UserName>Bob</UserName></Password></response>'
-#                   sTagName = "UserName"
-#                   isTagInXML(sXML, sTag)  #=>  True
-#
-#                   sTagName = "Username"
-#                   isTagInXML(sXML, sTag)  #=>  False
-#
-#                   sTagName = "<UserName>"  # With Brackets
-#                   isTagInXML(sXML, sTag)  #=>  True
-#
-#                   sTagName = "Password"  # With no Opening tag
-#                   isTagInXML(sXML, sTag)  #=>  True
+# Description:  Returns the number of tags at the start of aOtherLeaves to skip, (1 to
+#               XML_DIFF_RESYNC_TAGS), so that the next XML_DIFF_RESYNC_MATCHES tags of both LISTS
+#               have the same paths and values, (or fewer, when both documents end there),
+#               or None when there is no such place, see _diffXMLLeaves()
 #
 #=============================================================================#
-def isTagInXML(sXML, sTagName):
-    '''
-    Parse a string containing XML Tags to see if the specified tag name exists.
-    Note that a empty closing tag (e.g. </tag_name> ) with no opening  <tag_name> 
-    will be identified as existing
-    '''
+def _findXMLResync(aLeaves, aOtherLeaves):
     
-    # VERBOSE = True
+    sPath, sValue, iOffset = aLeaves[0]
     
-    if(VERBOSE == True):
-        print2("Parameters - isTagInXML:")
-        print2("  sXML: " + sXML)
-        print2("  sTagName: " + sTagName)
+    for iSkip in range(1, min(XML_DIFF_RESYNC_TAGS, len(aOtherLeaves) - 1) + 1):
+        
+        tOther = aOtherLeaves[iSkip]
+        if ((tOther[0] != sPath) or (tOther[1] != sValue)):
+            continue
+        # end
+        
+        # Confirm the match with the tags after it
+        bMatched = True
+        for iTag in range(1, XML_DIFF_RESYNC_MATCHES):
+            
+            bEnded = (iTag >= len(aLeaves))
+            bOtherEnded = (iSkip + iTag >= len(aOtherLeaves))
+            if (bEnded or bOtherEnded):
+                bMatched = (bEnded and bOtherEnded)
+                break
+            # end
+            
+            tLeaf = aLeaves[iTag]
+            tOther = aOtherLeaves[iSkip + iTag]
+            if ((tLeaf[0] != tOther[0]) or (tLeaf[1] != tOther[1])):
+                bMatched = False
+                break
+            # end
+        # end
+        
+        if (bMatched == True):
+            return iSkip
+        # end
     # end
     
-    # Set default return value
-    bFound = False
-    
-    # Instead of checking the specified tag for enclosing brackets <tag_name>.
-    # ITs easier to just remove them (if they existed) and then adding them.
-    sTagWithoutBrackets = removeXMLBrackets(sTagName)
+    return None
     
-    # Generate the Opening and Closing tags (with brackets)
-    aXMLTags = createXMLTags(sTagWithoutBrackets)
+# END method - _findXMLResync()
+
+
+#=============================================================================#
+#--
+# Function: _makeXMLDiff(...)
+#++
+#
+# Description:  Returns the DICT describing a difference found by diffXML(), from
+#               the (path, value, offset) TUPLES of the expected and actual tags
+#
+#=============================================================================#
+def _makeXMLDiff(tExpected, tActual):
     
-    #sFullOpeningTag = aTags[0]
-    sFullClosingTag = aXMLTags[1]
+    hDiff = {"expectedPath": None, "expectedValue": None, "expectedOffset": None,
+             "actualPath": None, "actualValue": None, "actualOffset": None}
     
-    if (VERBOSE == True):
-        #print2("Opening tag:  " + sFullOpeningTag)
-        print2("Closing tag:  " + sFullClosingTag)
+    if (tExpected == None):
+        hDiff["type"] = "unexpected"
+    elif (tActual == None):
+        hDiff["type"] = "missing"
+    else:
+        hDiff["type"] = "changed"
     # end
     
-    # Parse the XML String to see if there is a Closing Tag
-    # If the Closing tag is found then the tag exists, even if
-    # there is no Opening tag
-    if(re.search(sFullClosingTag, sXML)):
-        bFound = True
+    if (tExpected != None):
+        hDiff["expectedPath"], hDiff["expectedValue"], hDiff["expectedOffset"] = tExpected
     # end
     
+    if (tActual != None):
+        hDiff["actualPath"], hDiff["actualValue"], hDiff["actualOffset"] = tActual
+    # end
     
-    return bFound
+    return hDiff
     
-# END method - isTagInXML()
-
+# END method - _makeXMLDiff()
 
 
 #=============================================================================#
 #--
-# Function: removeXMLBrackets(...)
+# Function: _readXMLLeaves(...)
 #++
 #
-# Description:  Removes the brackets from Opening or Closing tags
-#               Modifies '</tag_name>'  or '<tag_name>'  to 'tag_name' 
-#
-# Returns: STRING = The modified tag without the brackets
-#
-# Syntax: sTag =  STRING - The XML tags to strip of the enclosing brackets "<>"
+# Description:  Appends the TUPLES generated by _iterXMLLeaves() to aLeaves,
+#               until it holds iCount of them, or the document ends
+#
+#=============================================================================#
+def _readXMLLeaves(oLeaves, aLeaves, iCount):
+    
+    while (len(aLeaves) < iCount):
+        try:
+            aLeaves.append(oLeaves.next())
+        except StopIteration:
+            return
+        # end
+    # end
+    
+# END method - _readXMLLeaves()
+
+
+
+#=============================================================================#
+#--
+# Function: areTagsInXML(...)
+#++
+#
+# Description:  Parses a string containing XML Tags to see which of the specified
+#               tag names exist, in a single scan of the XML string.
+#               Like isTagInXML(), a tag exists when its Closing tag </tag_name> is found.
+#
+#               The scan stops as soon as every one of the tags has been found, and the
+#               tag names are matched literally, even if they contain characters like '.'
+#
+# Returns: DICT of BOOLEANS - Keyed by each tag name as specified in aTagNames,
+#                             True if the Tag exists, otherwise False
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         aTagNames =  LIST of STRINGS - The names of the XML tags to match. Names can be
+#                                        specified with or without the enclosing brackets "<>"
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName></Password></response>'
+#                   areTagsInXML(sXML, ["UserName", "Password", "Email"])  #=>  {'UserName': True, 'Password': True, 'Email': False}
+#
+#=============================================================================#
+def areTagsInXML(sXML, aTagNames):
+    '''
+    Parses a string containing XML Tags to see which of the specified
+    tag names exist, in a single scan that stops once all are found
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - areTagsInXML:")
+        print2("  aTagNames: " + str(aTagNames))
+    # end
+    
+    oScanner = _getXMLTagScanner(aTagNames)
+    
+    # Tag names (w/o brackets) found so far
+    hFound = {}
+    iTagCount = len(oScanner.hTagKeys)
+    
+    if (iTagCount > 0):
+        for oMatch in oScanner.oClosingPattern.finditer(sXML):
+            hFound[oMatch.group(1)] = True
+            
+            # Stop as soon as all the tags were found
+            if (len(hFound) == iTagCount):
+                break
+            # end
+        # end
+    # end
+    
+    hTagsFound = {}
+    for sTagWithoutBrackets, aKeys in oScanner.hTagKeys.items():
+        for sTagName in aKeys:
+            hTagsFound[sTagName] = hFound.has_key(sTagWithoutBrackets)
+        # end
+    # end
+    
+    if (VERBOSE == True):
+        print2("Tags found: " + str(hTagsFound))
+    # end
+    
+    return hTagsFound
+    
+# END method - areTagsInXML()
+
+
+#=============================================================================#
+#--
+# Function: buildXML(...)
+#++
+#
+# Description:  Builds a string of XML from nested DICTs and LISTs, (e.g. a request
+#               envelope to create many SFDC objects), in place of adding together the
+#               tags made by createXMLTags() in a loop.
+#
+#               The pieces of XML are collected in a LIST and joined once at the end, so
+#               the time taken grows linearly with the size of the XML, and values are
+#               only escaped (see escapeXMLValue()) when they hold '&', '<' or '>'.
+#               Use writeXML() to write the XML straight to a file instead.
+#
+#               Each (tag name, value) pair is written as:
+#                   STRING - <tag_name>value</tag_name>
+#                   None - <tag_name></tag_name>
+#                   DICT - <tag_name> followed by the child tags it holds, then </tag_name>
+#                   LIST of (tag name, value) TUPLES - The same as a DICT, with the child tags in order
+#                   LIST (or iterator) of other values - One <tag_name> for each value, in order
+#                   Anything else - <tag_name>str(value)</tag_name>
+#               Tag names can be specified with or without the enclosing brackets "<>"
+#               The order of the child tags of a DICT is the order of its items(),
+#               so use a LIST of TUPLES where the order matters.
+#
+# Returns: STRING - The XML
+#
+# Syntax: oData = DICT, or LIST of (tag name, value) TUPLES - The tags to write
+#         sRootTagName = STRING - The name of a tag to enclose all the tags in, (optional)
+#
+# Usage Examples:
+#                   buildXML([("sf:Name", "Bob & Co"), ("sf:Phone", None)], "sObjects")
+#                   #=>  '<sObjects><sf:Name>Bob &amp; Co</sf:Name><sf:Phone></sf:Phone></sObjects>'
+#
+#                   aAccounts = [[("type", "Account"), ("Name", "A1")], [("type", "Account"), ("Name", "A2")]]
+#                   buildXML({"create": {"sObjects": aAccounts}})
+#                   #=>  '<create><sObjects><type>Account</type><Name>A1</Name></sObjects><sObjects>...</sObjects></create>'
+#
+#=============================================================================#
+def buildXML(oData, sRootTagName=None):
+    '''
+    Builds a string of XML from nested DICTs and LISTs, joining
+    the pieces once at the end.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - buildXML:")
+        print2("  sRootTagName: " + str(sRootTagName))
+    # end
+    
+    oBuffer = _XMLBuffer()
+    
+    if (sRootTagName != None):
+        _appendXMLElement(oBuffer, sRootTagName, oData)
+    else:
+        _appendXMLChildren(oBuffer, oData)
+    # end
+    
+    return "".join(oBuffer.aParts)
+    
+# END method - buildXML()
+
+
+#=============================================================================#
+#--
+# Function: buildXMLRecords(...)
+#++
+#
+# Description:  Builds a string of XML with one record tag for each row of values,
+#               (the reverse of iterXMLRecords()), e.g. the <sObjects> of a bulk create.
+#
+#               Each row is a TUPLE or LIST of values in the same order as aFieldTagNames.
+#               A value of None leaves out that tag, other values are written
+#               as for buildXML(). Rows can come from any iterator, so they do not
+#               all have to be held in memory, see writeXMLRecords().
+#
+# Returns: STRING - The XML
+#
+# Syntax: aRows = LIST (or iterator) of TUPLES - The values of each record
+#         sRecordTagName = STRING - The name of the XML tag enclosing each record
+#         aFieldTagNames = LIST of STRINGS - The names of the XML tags of each value
+#         sRootTagName = STRING - The name of a tag to enclose all the records in, (optional)
+#         Tags can be specified with or without the enclosing brackets "<>"
+#
+# Usage Examples:
+#                   aRows = [("A1", "Boston"), ("A2", None)]
+#                   buildXMLRecords(aRows, "sObjects", ["Name", "BillingCity"])
+#                   #=>  '<sObjects><Name>A1</Name><BillingCity>Boston</BillingCity></sObjects><sObjects><Name>A2</Name></sObjects>'
+#
+#=============================================================================#
+def buildXMLRecords(aRows, sRecordTagName, aFieldTagNames, sRootTagName=None):
+    '''
+    Builds a string of XML with one record tag for each row of values
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - buildXMLRecords:")
+        print2("  sRecordTagName: " + sRecordTagName)
+        print2("  aFieldTagNames: " + str(aFieldTagNames))
+        print2("  sRootTagName: " + str(sRootTagName))
+    # end
+    
+    oBuffer = _XMLBuffer()
+    
+    if (sRootTagName != None):
+        oBuffer.aParts.append(_getXMLBuildTags(sRootTagName)[0])
+    # end
+    
+    _appendXMLRecords(oBuffer, aRows, sRecordTagName, aFieldTagNames)
+    
+    if (sRootTagName != None):
+        oBuffer.aParts.append(_getXMLBuildTags(sRootTagName)[1])
+    # end
+    
+    return "".join(oBuffer.aParts)
+    
+# END method - buildXMLRecords()
+
+
+# Compiled paths, by path, see compileXMLPath()
+_XML_PATHS = {}
+_XML_PATHS_MAX = 100
+
+#=============================================================================#
+#--
+# Function: compileXMLPath(...)
+#++
+#
+# Description:  Compiles a path query on XML tags, (e.g. "result/records/Id" for the
+#               Id of each record of a query result), into an XMLPath that can be run
+#               on many XML strings. See XMLPath for the path syntax.
+#
+#               This replaces nested calls of getMultipleXMLTagValues() on the values
+#               of the enclosing tags, which copy the XML again at each level; the
+#               XMLPath finds the values in a single pass, without copying the XML.
+#               Compiled paths are cached, so compiling the same path again is free.
+#
+# Returns: XMLPath - The compiled path
+#
+# Syntax: sPath = STRING - The path, with the steps separated by '/'
+#
+# Usage Examples:
+#                   sXML = '<result><records><sf:Id>01</sf:Id></records><sf:Id>99</sf:Id></result>'
+#                   compileXMLPath("result/records/Id").getValues(sXML)  #=>  ['01']
+#                   compileXMLPath("/result/*").getValues(sXML)  #=>  ['<sf:Id>01</sf:Id>', '99']
+#
+#=============================================================================#
+def compileXMLPath(sPath):
+    '''
+    Compiles a path query on XML tags, e.g. "result/records/Id",
+    into a reusable XMLPath
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - compileXMLPath:")
+        print2("  sPath: " + sPath)
+    # end
+    
+    oXMLPath = _XML_PATHS.get(sPath)
+    if (oXMLPath == None):
+        
+        # Keep the cache bounded
+        if (len(_XML_PATHS) >= _XML_PATHS_MAX):
+            _XML_PATHS.clear()
+        # end
+        
+        oXMLPath = XMLPath(sPath)
+        _XML_PATHS[sPath] = oXMLPath
+    # end
+    
+    return oXMLPath
+    
+# END method - compileXMLPath()
+
+
+#=============================================================================#
+#--
+# Function: countXMLTags(...)
+#++
+#
+# Description:  Counts the occurrences of the specified tag name in a string containing XML Tags.
+#               Like isTagInXML(), it is the Closing tags </tag_name> that are counted,
+#               which is also the number of values getMultipleXMLTagValues() returns.
+#
+# Returns: INTEGER - The number of Closing tags of the specified tag name
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sTagName =  STRING - The name of the XML tag to count. Names can be
+#                              specified with or without the enclosing brackets "<>"
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName><UserName>Pat</UserName></response>'
+#                   countXMLTags(sXML, "UserName")   #=>  2
+#                   countXMLTags(sXML, "Password")   #=>  0
+#
+#=============================================================================#
+def countXMLTags(sXML, sTagName):
+    '''
+    Counts the occurrences of the Closing tag of the specified tag name
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - countXMLTags:")
+        print2("  sTagName: " + sTagName)
+    # end
+    
+    sFullClosingTag = createXMLTags(removeXMLBrackets(sTagName))[1]
+    
+    return sXML.count(sFullClosingTag)
+    
+# END method - countXMLTags()
+
+
+#=============================================================================#
+#--
+# Function: countXMLTagsForTags(...)
+#++
+#
+# Description:  Counts the occurrences of each of the specified tag names in a string
+#               containing XML Tags, in a single scan of the XML string.
+#               Like countXMLTags(), it is the Closing tags </tag_name> that are counted.
+#
+# Returns: DICT of INTEGERS - Keyed by each tag name as specified in aTagNames,
+#                             holding the number of its Closing tags
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         aTagNames =  LIST of STRINGS - The names of the XML tags to count. Names can be
+#                                        specified with or without the enclosing brackets "<>"
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName><UserName>Pat</UserName></response>'
+#                   countXMLTagsForTags(sXML, ["UserName", "Password"])  #=>  {'UserName': 2, 'Password': 0}
+#
+#=============================================================================#
+def countXMLTagsForTags(sXML, aTagNames):
+    '''
+    Counts the Closing tags of each of the specified tag names in a single scan
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - countXMLTagsForTags:")
+        print2("  aTagNames: " + str(aTagNames))
+    # end
+    
+    oScanner = _getXMLTagScanner(aTagNames)
+    
+    hCounts = {}
+    for sTagWithoutBrackets in oScanner.hTagKeys.keys():
+        hCounts[sTagWithoutBrackets] = 0
+    # end
+    
+    if (oScanner.oClosingPattern != None):
+        for oMatch in oScanner.oClosingPattern.finditer(sXML):
+            sTagWithoutBrackets = oMatch.group(1)
+            hCounts[sTagWithoutBrackets] = hCounts[sTagWithoutBrackets] + 1
+        # end
+    # end
+    
+    hTagCounts = {}
+    for sTagWithoutBrackets, aKeys in oScanner.hTagKeys.items():
+        for sTagName in aKeys:
+            hTagCounts[sTagName] = hCounts[sTagWithoutBrackets]
+        # end
+    # end
+    
+    return hTagCounts
+    
+# END method - countXMLTagsForTags()
+
+
+#=============================================================================#
+#--
+# Function: createXMLTags(...)
+#++
+#
+# Description:  Adds the brackets to tag name to make Opening and Closing XML tags
+#               Returns '<tag_name>' and '</tag_name>'  from 'tag_name' 
+#
+# Returns: LIST = The Opening and Closing XML tags
+#                 [0] = STRING - Opening Tag
+#                 [1] = STRING - Closing Tag
+#
+# Syntax: sTag =  STRING - The XML tags to strip of the enclosing brackets "<>"
 #
 # Usage Examples:
 #                    sTag = 'UserName'     # Tag name w/o brackets
-#                    removeXMLBrackets(sTag)  #=>  UserName
+#                    addXMLBrackets(sTag)  #=>  UserName
 #
 #                    sTag = '<Username>'   # Opening tag with Brackets
-#                    removeXMLBrackets(sTag)  #=>  UserName
+#                    addXMLBrackets(sTag)  #=>  UserName
 #
 #                    sTag = '</UserName>'  # Closing tag with Brackets
-#                    removeXMLBrackets(sTag)  #=>  UserName
+#                    createXMLTags(sTag)  #=>  UserName
 #
 #=============================================================================#
-def removeXMLBrackets(sTag):
+def createXMLTags(sTagName):
     '''
-    Removes the brackets from Opening or Closing tags
-    Modifies '</tag_name>'  or '<tag_name>'  to 'tag_name' 
+    Adds the brackets to tag name to make Opening and Closing XML tags
+    Returns '<tag_name>' and '</tag_name>'  from 'tag_name' 
     '''
     
     #VERBOSE = True
     
     if(VERBOSE == True):
-        print2("Parameters - removeBrackets:")
-        print2("  sTag: " + sTag)
+        print2("Parameters - createXMLTags:")
+        print2("  sTagName: " + sTagName)
     # end
     
-    # TODO: Improve to ignore brackets within the tag name 
-    # Remove the brackets and slash from the Closing tag
-    sTag = sTag.replace('</', '')
-    #sTag = sTag.replace(r'^</', '')
-    
-    # Remove the bracket from the Opening tag
-    sTag = sTag.replace('<', '')
-    #sTag = sTag.replace(r'^<', '')
+    # Add the brackets to make the Opening tag
+    sFullOpeningTag = "<" + sTagName + ">"
     
-    # Remove the trailing bracket
-    sTag = sTag.replace('>', '')
-    #sTag = sTag.replace(r'>$', '')
+    # Add the brackets and slash to make the Closing tag
+    sFullClosingTag = "</" + sTagName + ">"
     
     if (VERBOSE == True):
-        print2("Tag w/o brackets:  " + sTag)
+        print2("Opening tag:  " + sFullOpeningTag)
+        print2("Closing tag:  " + sFullClosingTag)
     # end
     
-    return sTag
+    sXMLTags = [sFullOpeningTag, sFullClosingTag]
     
-# END method - removeXMLBrackets()
+    return sXMLTags
+    
+# END method - createXMLTags()
+
+
+# The entities decoded by decodeXMLEntities()
+# group(1) = decimal character number,  group(2) = hex character number,  group(3) = entity name
+_XML_ENTITY_PATTERN = re.compile("&(?:#([0-9]+)|#[xX]([0-9a-fA-F]+)|(amp|lt|gt|quot|apos));")
+_XML_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'"}
+
+#=============================================================================#
+#--
+# Function: _decodeXMLEntity(...)
+#++
+#
+# Description:  Returns the character for an entity matched by _XML_ENTITY_PATTERN.
+#               Characters past ASCII are returned as UNICODE for a UNICODE value,
+#               or UTF-8 encoded for a STRING value
+#
+#=============================================================================#
+def _decodeXMLEntity(oMatch):
+    
+    sDecimal, sHex, sName = oMatch.groups()
+    
+    if (sName != None):
+        return _XML_ENTITIES[sName]
+    # end
+    
+    if (sDecimal != None):
+        iCharacter = int(sDecimal)
+    else:
+        iCharacter = int(sHex, 16)
+    # end
+    
+    try:
+        if (iCharacter < 128):
+            return chr(iCharacter)
+        # end
+        
+        if (type(oMatch.string) == type(u"")):
+            return unichr(iCharacter)
+        # end
+        
+        return unichr(iCharacter).encode("utf-8")
+        
+    except ValueError:
+        # Not a valid character, leave the entity as it is
+        return oMatch.group(0)
+    # end
+    
+# END method - _decodeXMLEntity()
+
+
+#=============================================================================#
+#--
+# Function: decodeXMLEntities(...)
+#++
+#
+# Description:  Decodes the entities in the value of an XML tag: &amp; &lt; &gt; &quot; &apos;
+#               and character numbers like &#233; or &#xE9;
+#               Other entities are left as they are.
+#
+#               A value without any '&' is returned as it is, without copying it, so
+#               decoding the values of a typical response costs one find() per value.
+#               The extraction functions take a bDecode option that calls this on each value.
+#
+# Returns: STRING - The decoded value
+#
+# Syntax: sValue = STRING - The value of an XML tag
+#
+# Usage Examples:
+#                   decodeXMLEntities("Bob &amp; Co &lt;Sales&gt;")  #=>  'Bob & Co <Sales>'
+#                   decodeXMLEntities("Caf&#233;")  #=>  'Caf\xc3\xa9'  (UTF-8)
+#
+#                   getXMLTagValue(sXML, "sf:Name", bDecode=True)
+#
+#=============================================================================#
+def decodeXMLEntities(sValue):
+    '''
+    Decodes the entities in the value of an XML tag, returning
+    a value without any '&' as it is
+    '''
+    
+    if (sValue.find("&") == -1):
+        return sValue
+    # end
+    
+    return _XML_ENTITY_PATTERN.sub(_decodeXMLEntity, sValue)
+    
+# END method - decodeXMLEntities()
+
+
+#=============================================================================#
+#--
+# Function: diffXML(...)
+#++
+#
+# Description:  Compares an expected and an actual XML string (e.g. SOAP responses) tag
+#               by tag, and returns the first iMaxDiffs differences found, with their offsets.
+#
+#               The tags that hold a value, (rather than other tags), are compared by their
+#               path from the outermost tag, e.g. 'soapenv:Body/queryResponse/result/records/sf:Id',
+#               and their value. Attributes, and the white space between tags, are not compared.
+#
+#               Both documents are walked together and the comparison stops as soon as
+#               iMaxDiffs differences have been found, so comparing two large responses
+#               that differ early costs little.
+#
+#               When the tags being compared differ, the next XML_DIFF_RESYNC_TAGS tags of each
+#               document are searched for where they match again, so a record added to or
+#               removed from the actual document is reported as its 'unexpected' or 'missing'
+#               tags, and the tags after it are compared with their own counterparts.
+#
+#               With bIgnoreOrder set to True, the same tags holding the same values in
+#               any order are equal. The expected document is then read in full first,
+#               and the tags left over on either side are the differences.
+#
+#               Tags named in aIgnoreTags, (e.g. Ids and timestamps that change on every
+#               run), and all the tags inside them, are skipped in both documents. A name
+#               without a prefix matches any prefix, e.g. 'Id' matches <sf:Id>.
+#
+# Returns: LIST of DICTS - One per difference, in the order found, (empty when equal)
+#                          with the keys:
+#                              "type" - 'changed', 'missing' (from the actual XML) or 'unexpected'
+#                              "expectedPath", "expectedValue", "expectedOffset"
+#                              "actualPath", "actualValue", "actualOffset"
+#                          where the offset is that of the Opening tag, and the keys
+#                          for the side without the tag are None
+#
+# Syntax: sExpectedXML = STRING - The expected XML
+#         sActualXML = STRING - The actual XML
+#         iMaxDiffs = INTEGER - The most differences to return
+#         aIgnoreTags = LIST of STRINGS - The names of the tags to skip, (optional)
+#         bIgnoreOrder = BOOLEAN - True to compare the tags in any order
+#
+# Usage Examples:
+#                   aDiffs = diffXML(sExpectedXML, sActualXML, 5, ["Id", "CreatedDate"])
+#                   for hDiff in aDiffs:
+#                       print2(hDiff["type"] + " " + str(hDiff["expectedPath"]) + ": " +
+#                              str(hDiff["expectedValue"]) + " != " + str(hDiff["actualValue"]))
+#                   # end
+#
+#                   diffXML('<a><b>1</b><c>2</c></a>', '<a><c>2</c><b>1</b></a>', 10, None, True)  #=>  []
+#
+#=============================================================================#
+def diffXML(sExpectedXML, sActualXML, iMaxDiffs=10, aIgnoreTags=None, bIgnoreOrder=False):
+    '''
+    Compares two XML strings tag by tag, returning the first
+    iMaxDiffs differences with their offsets.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - diffXML:")
+        print2("  iMaxDiffs: " + str(iMaxDiffs))
+        print2("  aIgnoreTags: " + str(aIgnoreTags))
+        print2("  bIgnoreOrder: " + str(bIgnoreOrder))
+    # end
+    
+    hIgnoreTags = {}
+    if (aIgnoreTags != None):
+        for sTagName in aIgnoreTags:
+            hIgnoreTags[removeXMLBrackets(sTagName)] = True
+        # end
+    # end
+    
+    # Each STRING is a source of a single chunk
+    oExpectedLeaves = _iterXMLLeaves([sExpectedXML], hIgnoreTags)
+    oActualLeaves = _iterXMLLeaves([sActualXML], hIgnoreTags)
+    
+    aDiffs = _diffXMLLeaves(oExpectedLeaves, oActualLeaves, iMaxDiffs, bIgnoreOrder)
+    
+    if (VERBOSE == True):
+        print2("Found differences: " + str(aDiffs))
+    # end
+    
+    return aDiffs
+    
+# END method - diffXML()
+
+
+#=============================================================================#
+#--
+# Function: diffXMLFiles(...)
+#++
+#
+# Description:  Compares an expected and an actual file containing XML tag by tag,
+#               as diffXML() does, reading both files a chunk at a time instead of
+#               reading them whole, (or line by line as compare_files() does).
+#
+# Returns: LIST of DICTS - The differences, as diffXML() returns them
+#
+# Syntax: sExpectedFilePath = STRING - Full pathname/filename of the expected XML
+#         sActualFilePath = STRING - Full pathname/filename of the actual XML
+#         iMaxDiffs = INTEGER - The most differences to return
+#         aIgnoreTags = LIST of STRINGS - The names of the tags to skip, (optional)
+#         bIgnoreOrder = BOOLEAN - True to compare the tags in any order
+#         iChunkSize = INTEGER - Number of characters to read from a file at a time
+#
+# Usage Examples:
+#                   aDiffs = diffXMLFiles("data/QueryAccount_expected.xml", "results/QueryAccount.xml", 1)
+#                   if (aDiffs != []):
+#                       print2("First difference at offset " + str(aDiffs[0]["actualOffset"]))
+#                   # end
+#
+#=============================================================================#
+def diffXMLFiles(sExpectedFilePath, sActualFilePath, iMaxDiffs=10, aIgnoreTags=None, bIgnoreOrder=False, iChunkSize=XML_CHUNK_SIZE):
+    '''
+    Compares two XML files tag by tag, reading them a chunk at a time,
+    returning the first iMaxDiffs differences with their offsets.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - diffXMLFiles:")
+        print2("  sExpectedFilePath: " + sExpectedFilePath)
+        print2("  sActualFilePath: " + sActualFilePath)
+        print2("  iMaxDiffs: " + str(iMaxDiffs))
+        print2("  aIgnoreTags: " + str(aIgnoreTags))
+        print2("  bIgnoreOrder: " + str(bIgnoreOrder))
+    # end
+    
+    hIgnoreTags = {}
+    if (aIgnoreTags != None):
+        for sTagName in aIgnoreTags:
+            hIgnoreTags[removeXMLBrackets(sTagName)] = True
+        # end
+    # end
+    
+    oExpectedLeaves = _iterXMLLeaves(sExpectedFilePath, hIgnoreTags, iChunkSize)
+    oActualLeaves = _iterXMLLeaves(sActualFilePath, hIgnoreTags, iChunkSize)
+    
+    return _diffXMLLeaves(oExpectedLeaves, oActualLeaves, iMaxDiffs, bIgnoreOrder)
+    
+# END method - diffXMLFiles()
+
+
+#=============================================================================#
+#--
+# Function: disableXMLCache()
+#++
+#
+# Description:  Turns off the caching of extraction results started by enableXMLCache(),
+#               and frees the cached results.
+#
+# Returns: None
+#
+# Syntax: N/A
+#
+# Usage Examples:
+#                   disableXMLCache()
+#
+#=============================================================================#
+def disableXMLCache():
+    '''
+    Turns off the caching of XML extraction results.
+    '''
+    
+    global _XML_EXTRACTION_CACHE
+    
+    _XML_EXTRACTION_CACHE = None
+    
+# END method - disableXMLCache()
+
+
+#=============================================================================#
+#--
+# Function: enableXMLCache(...)
+#++
+#
+# Description:  Turns on caching of the results of getMultipleXMLTagValues() and
+#               getMultipleXMLTagValuesForTags(), for flows where the same XML response
+#               (e.g. "SFDC: QueryAccount_XML") is parsed by several scripts in a row.
+#
+#               Results are kept in a bounded XMLExtractionCache, keyed by the length and
+#               hash() of the XML string plus the tag names and options, so repeating an
+#               extraction on an identical XML string returns a copy of the earlier result
+#               without scanning the XML again.
+#               Calling it again replaces the cache, (and its counters) with an empty one.
+#
+#               Caching is off by default. Note that the key does not compare the XML
+#               itself, so two different XML strings of the same length and hash() value
+#               would share their results.
+#
+# Returns: XMLExtractionCache - The cache now in use
+#
+# Syntax: iMaxEntries = INTEGER - Maximum number of results held
+#         iMaxBytes = INTEGER - Maximum (approximate) number of characters held in the results
+#
+# Usage Examples:
+#                   enableXMLCache()
+#                   aIds = getMultipleXMLTagValues(sXML, "sf:Id")   # Scans the XML
+#                   aIds = getMultipleXMLTagValues(sXML, "sf:Id")   # From the cache
+#                   print2(str(getXMLCacheStats()))
+#
+#                   enableXMLCache(1000, 64 * 1024 * 1024)
+#
+#=============================================================================#
+def enableXMLCache(iMaxEntries=XML_CACHE_MAX_ENTRIES, iMaxBytes=XML_CACHE_MAX_BYTES):
+    '''
+    Turns on a bounded LRU cache of XML extraction results.
+    '''
+    
+    global _XML_EXTRACTION_CACHE
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - enableXMLCache:")
+        print2("  iMaxEntries: " + str(iMaxEntries))
+        print2("  iMaxBytes: " + str(iMaxBytes))
+    # end
+    
+    _XML_EXTRACTION_CACHE = XMLExtractionCache(iMaxEntries, iMaxBytes)
+    
+    return _XML_EXTRACTION_CACHE
+    
+# END method - enableXMLCache()
+
+
+#=============================================================================#
+#--
+# Function: escapeXMLValue(...)
+#++
+#
+# Description:  Escapes the characters '&', '<' and '>' in a value to be written
+#               between an Opening and Closing XML tag.
+#               A value without any of them is returned as it is, without copying it.
+#
+# Returns: STRING - The escaped value
+#
+# Syntax: sValue = STRING - The value to escape
+#
+# Usage Examples:
+#                   escapeXMLValue("Bob & Co <Sales>")  #=>  'Bob &amp; Co &lt;Sales&gt;'
+#
+#=============================================================================#
+def escapeXMLValue(sValue):
+    '''
+    Escapes the characters '&', '<' and '>' in the value of an XML tag
+    '''
+    
+    if (_XML_SPECIAL_CHARS.search(sValue) == None):
+        return sValue
+    # end
+    
+    # '&' first, so the other entities are not escaped again
+    return sValue.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    
+# END method - escapeXMLValue()
+
+
+
+#=============================================================================#
+#--
+# Function: getMultipleXMLTagSpans(...)
+#++
+#
+# Description:  Parses a string containing XML Tags to get the positions of the values of the
+#               specified XML tag name, when there are multiple occurrences of the same Tag name.
+#               Works like getMultipleXMLTagValues() but returns the (start, end) offsets of each
+#               value instead of copying the values out of the XML string, so sXML[start:end]
+#               is the value that getMultipleXMLTagValues() would return.
+#               A Closing XML tag </tag_name> with no Opening tag <tag_name> proceeding it
+#               returns an empty span (end, end).
+#
+#               sXML may also be a memory-mapped file (see mapXMLFile()), which is then
+#               scanned in place without reading it into memory.
+#
+#               The XML string is scanned once from start to end with a moving offset,
+#               so the time taken grows linearly with the size of the XML string,
+#               not with the square of the number of Tags found.
+#
+# Returns: LIST of TUPLES - Each TUPLE holds the INTEGER offsets of the value of an XML Tag
+#                 [0] = (start, end) of the value between the first Opening and Closing XML Tags
+#                 [n] = (start, end) of the value between the nth Tags
+#
+#                 Returns [] If no occurrence of the Tag exists in the XML STRING
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sTagName =  STRING - The name of the XML tag to match. Tags can be
+#                              specified with or without the enclosing brackets "<>"
+#         bAttributes = BOOLEAN - True to also match Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag name with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing tags, e.g. <sf:Id/>, as a value of ''
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName><UserName>Pat</UserName></Nickname></response>'
+#
+#                   sTagName = "UserName"
+#                   getMultipleXMLTagSpans(sXML, sTag)  #=>  [(20, 23), (44, 47)]
+#
+#                   sTagName = "Nickname"  # Closing XML tag with no Opening Tag
+#                   getMultipleXMLTagSpans(sXML, sTag)  #=>  [(58, 58)]
+#
+#=============================================================================#
+def getMultipleXMLTagSpans(sXML, sTagName, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False):
+    '''
+    Parses a string containing XML Tags to get the (start, end) offsets of the values
+    of the specified XML tag name, when there are multiple occurrences of the same Tag name
+    '''
+    
+    #VERBOSE = True
+    
+    # Define default return value
+    aMatchingTagSpans = []
+    
+    if(VERBOSE == True):
+        print2("Parameters - getMultipleXMLTagSpans:")
+        print2("  sTagName: " + sTagName)
+    # end
+    
+    # Matching attributes, namespace prefixes or self-closing tags takes the
+    # Regular Expression scanner, which pairs the tags the same way
+    if ((bAttributes == True) | (bIgnoreNamespace == True) | (bSelfClosing == True)):
+        oScanner = _getXMLTagScanner([sTagName], bAttributes, bIgnoreNamespace, bSelfClosing)
+        for sMatchName, iValueStart, iValueEnd in oScanner.iterSpans(sXML):
+            aMatchingTagSpans.append((iValueStart, iValueEnd))
+        # end
+        return aMatchingTagSpans
+    # end
+    
+    # Generate the Opening and Closing XML tags
+    #
+    # Its easier to first remove brackets (if they existed).
+    sTagWithoutBrackets = removeXMLBrackets(sTagName)
+    
+    # Generate the Opening and Closing tags (with brackets)
+    aXMLTags = createXMLTags(sTagWithoutBrackets)
+    
+    sFullOpeningTag = aXMLTags[0]
+    sFullClosingTag = aXMLTags[1]
+    
+    if (VERBOSE == True):
+        print2("Opening tag:  " + sFullOpeningTag)
+        print2("Closing tag:  " + sFullClosingTag)
+    # end
+    
+    # Determine the length of the Opening and Closing Tags
+    iOpeningTagLength = len(sFullOpeningTag)
+    iClosingTagLength = len(sFullClosingTag)
+    
+    # Walk the XML STRING once with a moving offset instead of slicing off
+    # the part already parsed and re-counting the remaining Closing tags.
+    # Each find() starts where the previous Closing tag ended, so every
+    # character of the XML STRING is only looked at a constant number of times.
+    iCurrentOffset = 0
+    
+    # Position of the first Opening tag at or after the current offset.
+    # It is only searched for again once the offset has moved past it, and
+    # never again once no more Opening tags exist.
+    iIndexOfOpeningTag = sXML.find(sFullOpeningTag)
+    
+    # Loop to get that positions of each of the Tags
+    while True:
+        
+        # Find the position of the next Closing Tag in the XML string
+        iIndexOfClosingTag = sXML.find(sFullClosingTag, iCurrentOffset)
+        
+        if (iIndexOfClosingTag == -1):
+            # No more occurrences of the Closing Tag
+            break
+        # end
+        
+        # Re-locate the next Opening tag if the last one found was already used
+        if ((iIndexOfOpeningTag != -1) & (iIndexOfOpeningTag < iCurrentOffset)):
+            iIndexOfOpeningTag = sXML.find(sFullOpeningTag, iCurrentOffset)
+        # end
+        
+        if (VERBOSE == True):
+            print2("Opening tag index:  " + str(iIndexOfOpeningTag))
+            print2("Closing tag index:  " + str(iIndexOfClosingTag))
+        # end
+        
+        # Start of the text between the Opening and Closing Tags.
+        # A missing Opening tag, or one that follows the Closing tag, yields ''
+        iValueStart = iIndexOfOpeningTag + iOpeningTagLength
+        if ((iIndexOfOpeningTag == -1) | (iValueStart > iIndexOfClosingTag)):
+            if (VERBOSE == True):
+                print2("Missing either Opening XML Tag or Closing XML tag")
+            # end
+            iValueStart = iIndexOfClosingTag
+        # end
+        
+        # Save the position of the STRING between the Opening and Closing Tags
+        aMatchingTagSpans.append((iValueStart, iIndexOfClosingTag))
+        
+        # Move the offset past the current Closing tag
+        iCurrentOffset = iIndexOfClosingTag + iClosingTagLength
+        
+    # end - Loop to get that positions
+    
+    if (VERBOSE == True):
+        print2("Total Closing tags found:  " + str(len(aMatchingTagSpans)))
+    # end
+    
+    return aMatchingTagSpans
+    
+# END method - getMultipleXMLTagSpans()
+
+
+#=============================================================================#
+#--
+# Function: getMultipleXMLTagValues(...)
+#++
+#
+# Description:  Parses a string containing XML Tags to get the values of the specified
+#               XML tag name, when there are multiple occurrences of the same Tag name . 
+#               Checks that the Tags exists, NOT if they holds any content.
+#               Note that a Closing XML tag </tag_name> with 
+#               no Opening tag <tag_name> proceeding it will return ''.
+#
+#               The XML string is scanned once from start to end with a moving offset,
+#               so the time taken grows linearly with the size of the XML string,
+#               not with the square of the number of Tags found.
+#               (see getMultipleXMLTagSpans() for the positions of the values instead)
+#
+#               When enableXMLCache() has been called, the values for an identical
+#               XML string are returned from the cache instead.
+#
+# Returns: LIST of STRINGS - Each STRING in the LIST contains the value of an XML Tag
+#                 [0] = The STRING between the first Opening and Closing XML Tags, or None
+#                 [1] = The STRING between the second Opening and Closing XML Tags, or None
+#                 [n] = The STRING between the nth Tags
+#
+#                 Returns [] If no occurrence of the Tag exists in the XML STRING
+#                 Returns a empty STRING' For any an occurrence of the Closing Tag, 
+#                 with not Opening Tag in the XML STRING
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sTagName =  STRING - The name of the XML tag to match. Tags can be
+#                              specified with or without the enclosing brackets "<>"
+#         bAttributes = BOOLEAN - True to also match Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag name with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing tags, e.g. <sf:Id/>, as a value of ''
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName><UserName>Pat</UserName><UserName>Tom</UserName></Nickname></response>'
+#
+#                   sTagName = "UserName"
+#                   getMultipleXMLTagValues(sXML, sTag)  #=>  ['Bob','Pat','Tom'] 
+#
+#                   sTagName = "response"       # XML Tag containing other XML Tags
+#                   getXMLTagValue(sXML, sTag)  #=>  ['<UserName>Bob</UserName><UserName>Pat</UserName><UserName>Tom</UserName></Nickname>']
+#
+#                   sTagName = "Nickname"  # Closing XML tag with no Opening Tag
+#                   getXMLTagValue(sXML, sTag)  #=>  ['']
+#
+#                   sTagName = "<BogusTag>"  # An XML tag not contained within the XML String
+#                   getXMLTagValue(sXML, sTag)  #=>  []
+#
+#=============================================================================#
+def getMultipleXMLTagValues(sXML, sTagName, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False, bDecode=False):
+    '''
+    Parses a string containing XML Tags to get the values of the specified
+    XML tag name, when there are multiple occurrences of the same Tag name 
+    Note that a Closing XML tag (</tag_name> ) with no Opening XML Tag
+    <tag_name> proceeding it will return ''
+    '''
+    
+    #VERBOSE = True
+    
+    # Define default return value
+    aMatchingTagValues = []
+    
+    if(VERBOSE == True):
+        print2("Parameters - getMultipleXMLTagValues:")
+        print2("  sXML: " + sXML)
+        print2("  sTagName: " + sTagName)
+    # end
+    
+    # Use the earlier result for an identical XML string, when caching is enabled
+    oCache = _XML_EXTRACTION_CACHE
+    tCacheKey = None
+    if (oCache != None):
+        tCacheKey = oCache.getKey(sXML, ("getMultipleXMLTagValues", sTagName, bAttributes, bIgnoreNamespace, bSelfClosing, bDecode))
+        if (tCacheKey != None):
+            aCachedValues = oCache.get(tCacheKey)
+            if (aCachedValues != None):
+                return aCachedValues[:]
+            # end
+        # end
+    # end
+    
+    # Copy the STRING between each of the Opening and Closing Tags
+    for iValueStart, iValueEnd in getMultipleXMLTagSpans(sXML, sTagName, bAttributes, bIgnoreNamespace, bSelfClosing):
+        aMatchingTagValues.append(sXML[iValueStart:iValueEnd])
+    # end
+    
+    if (bDecode == True):
+        aMatchingTagValues = map(decodeXMLEntities, aMatchingTagValues)
+    # end
+    
+    if (tCacheKey != None):
+        oCache.put(tCacheKey, aMatchingTagValues[:], oCache.getSize(aMatchingTagValues))
+    # end
+    
+    if (VERBOSE == True):
+        print2("Found XML tag values: " + str(aMatchingTagValues))
+    # end
+    
+    return aMatchingTagValues
+    
+# END method - getMultipleXMLTagValues()
+
+
+#=============================================================================#
+#--
+# Function: getMultipleXMLTagValuesBatch(...)
+#++
+#
+# Description:  Gets the values of the specified XML tag names from each of a LIST of
+#               XML documents, (e.g. the responses saved to the results directory by a
+#               nightly run), spreading the work over a pool of processes.
+#
+#               Each document is either a string containing XML, or the full pathname of
+#               a file containing XML, which is memory-mapped by the process that reads it
+#               (see getMultipleXMLTagValuesFromFile()). A document containing '<' is XML.
+#
+#               The documents are handed to the processes in chunks of neighbouring
+#               documents, holding about 1/4 of each process' share of the XML but at
+#               least XML_BATCH_CHUNK_BYTES, so small documents do not each pay the
+#               cost of a separate task. The results are returned in input order.
+#
+#               File names are the cheaper input, since XML strings have to be copied
+#               to the process that scans them.
+#               Without the multiprocessing module (e.g. Jython), with iProcesses of 1,
+#               or when there is only one chunk of work, the documents are scanned in
+#               this process instead.
+#
+# Returns: LIST of DICTS - One per document, in the same order as aDocuments, each holding
+#                          what getMultipleXMLTagValuesForTags() returns for that document
+#
+# Syntax: aDocuments = LIST of STRINGS - XML strings and/or full pathname/filenames of XML files
+#         aTagNames =  LIST of STRINGS - The names of the XML tags to match. Tags can be
+#                                        specified with or without the enclosing brackets "<>"
+#         iProcesses = INTEGER - Number of processes to use, (default is the number of CPUs)
+#         iChunkSize = INTEGER - Number of documents per task, (default is by size, see above)
+#
+# Usage Examples:
+#                   aFiles = glob.glob("results/*.xml")
+#                   aResults = getMultipleXMLTagValuesBatch(aFiles, ["sf:Id", "sf:Name"])
+#                   for iFile in range(len(aFiles)):
+#                       print2(aFiles[iFile] + ": " + str(len(aResults[iFile]["sf:Id"])) + " Ids")
+#                   # end
+#
+#=============================================================================#
+def getMultipleXMLTagValuesBatch(aDocuments, aTagNames, iProcesses=None, iChunkSize=None):
+    '''
+    Gets the values of the specified XML tag names from each of a LIST of XML
+    strings or files, using a pool of processes, with the results in input order.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - getMultipleXMLTagValuesBatch:")
+        print2("  aDocuments: " + str(len(aDocuments)) + " documents")
+        print2("  aTagNames: " + str(aTagNames))
+        print2("  iProcesses: " + str(iProcesses))
+        print2("  iChunkSize: " + str(iChunkSize))
+    # end
+    
+    aTagNames = list(aTagNames)
+    
+    if (iProcesses == None):
+        iProcesses = 1
+        if (multiprocessing != None):
+            try:
+                iProcesses = multiprocessing.cpu_count()
+            except NotImplementedError:
+                pass
+            # end
+        # end
+    # end
+    
+    # Split the documents into chunks of neighbouring documents
+    aChunks = []
+    if (iChunkSize != None):
+        iChunkSize = max(iChunkSize, 1)
+        for iStart in range(0, len(aDocuments), iChunkSize):
+            aChunks.append(aDocuments[iStart:(iStart + iChunkSize)])
+        # end
+        
+    else:
+        aSizes = []
+        iTotalBytes = 0
+        for sDocument in aDocuments:
+            if (sDocument.find("<") != -1):
+                iBytes = len(sDocument)
+            else:
+                iBytes = os.path.getsize(sDocument)
+            # end
+            aSizes.append(iBytes)
+            iTotalBytes = iTotalBytes + iBytes
+        # end
+        
+        iChunkBytes = max(iTotalBytes / (iProcesses * 4), XML_BATCH_CHUNK_BYTES)
+        
+        aChunk = []
+        iBytes = 0
+        for iDocument in range(len(aDocuments)):
+            aChunk.append(aDocuments[iDocument])
+            iBytes = iBytes + aSizes[iDocument]
+            if (iBytes >= iChunkBytes):
+                aChunks.append(aChunk)
+                aChunk = []
+                iBytes = 0
+            # end
+        # end
+        if (aChunk != []):
+            aChunks.append(aChunk)
+        # end
+    # end
+    
+    aWork = []
+    for aChunk in aChunks:
+        aWork.append((aChunk, aTagNames))
+    # end
+    
+    if (VERBOSE == True):
+        print2(str(len(aWork)) + " chunks for " + str(iProcesses) + " processes")
+    # end
+    
+    if ((multiprocessing == None) | (iProcesses < 2) | (len(aWork) < 2)):
+        aChunkResults = map(_getXMLTagValuesForDocuments, aWork)
+    else:
+        oPool = multiprocessing.Pool(min(iProcesses, len(aWork)))
+        try:
+            aChunkResults = oPool.map(_getXMLTagValuesForDocuments, aWork, 1)
+            oPool.close()
+        finally:
+            oPool.terminate()
+            oPool.join()
+        # end
+    # end
+    
+    # Flatten the results of the chunks, which are still in input order
+    aResults = []
+    for aChunkResult in aChunkResults:
+        aResults.extend(aChunkResult)
+    # end
+    
+    return aResults
+    
+# END method - getMultipleXMLTagValuesBatch()
+
+
+#=============================================================================#
+#--
+# Function: getMultipleXMLTagValuesForTags(...)
+#++
+#
+# Description:  Parses a string containing XML Tags to get the values of each of the
+#               specified XML tag names, when there are multiple occurrences of the same Tag names.
+#
+#               Works like calling getMultipleXMLTagValues() once for each tag name, but
+#               the XML string is only scanned once, so asking for more tags costs about
+#               the same as asking for one.
+#
+#               When enableXMLCache() has been called, the values for an identical
+#               XML string are returned from the cache instead.
+#
+# Returns: DICT of LISTS - Keyed by each tag name as specified in aTagNames, holding
+#                          the LIST of values that getMultipleXMLTagValues() would return for it.
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         aTagNames =  LIST of STRINGS - The names of the XML tags to match. Tags can be
+#                                        specified with or without the enclosing brackets "<>"
+#         bAttributes = BOOLEAN - True to also match Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag name with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing tags, e.g. <sf:Id/>, as a value of ''
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   sXML = '<records><sf:Id>01</sf:Id><sf:Name>Bob</sf:Name></records><records><sf:Id>02</sf:Id><sf:Name>Pat</sf:Name></records>'
+#
+#                   aTagNames = ["sf:Id", "sf:Name"]
+#                   getMultipleXMLTagValuesForTags(sXML, aTagNames)  #=>  {'sf:Id': ['01','02'], 'sf:Name': ['Bob','Pat']}
+#
+#                   aTagNames = ["sf:Id", "<BogusTag>"]
+#                   getMultipleXMLTagValuesForTags(sXML, aTagNames)  #=>  {'sf:Id': ['01','02'], '<BogusTag>': []}
+#
+#=============================================================================#
+def getMultipleXMLTagValuesForTags(sXML, aTagNames, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False, bDecode=False):
+    '''
+    Parses a string containing XML Tags to get the values of each of the
+    specified XML tag names, in a single scan of the XML string.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - getMultipleXMLTagValuesForTags:")
+        print2("  sXML: " + sXML)
+        print2("  aTagNames: " + str(aTagNames))
+    # end
+    
+    oScanner = _getXMLTagScanner(aTagNames, bAttributes, bIgnoreNamespace, bSelfClosing)
+    
+    # Use the earlier values for an identical XML string, when caching is enabled
+    oCache = _XML_EXTRACTION_CACHE
+    tCacheKey = None
+    hValuesByName = None
+    if (oCache != None):
+        tCacheKey = oCache.getKey(sXML, ("getMultipleXMLTagValuesForTags", tuple(oScanner.hTagKeys.keys()), bAttributes, bIgnoreNamespace, bSelfClosing, bDecode))
+        if (tCacheKey != None):
+            hValuesByName = oCache.get(tCacheKey)
+        # end
+    # end
+    
+    if (hValuesByName == None):
+        
+        # Collect the values by the tag name matched
+        hValuesByName = {}
+        for sTagWithoutBrackets in oScanner.hTagKeys.keys():
+            hValuesByName[sTagWithoutBrackets] = []
+        # end
+        
+        for sTagWithoutBrackets, iValueStart, iValueEnd in oScanner.iterSpans(sXML):
+            hValuesByName[sTagWithoutBrackets].append(sXML[iValueStart:iValueEnd])
+        # end
+        
+        if (bDecode == True):
+            for sTagWithoutBrackets, aValues in hValuesByName.items():
+                hValuesByName[sTagWithoutBrackets] = map(decodeXMLEntities, aValues)
+            # end
+        # end
+        
+        if (tCacheKey != None):
+            iBytes = 0
+            for aValues in hValuesByName.values():
+                iBytes = iBytes + oCache.getSize(aValues)
+            # end
+            oCache.put(tCacheKey, hValuesByName, iBytes)
+        # end
+        
+    # end
+    
+    # Return the values keyed the way the caller specified the tag names,
+    # with a separate LIST for each of them
+    hMatchingTagValues = {}
+    for sTagWithoutBrackets, aKeys in oScanner.hTagKeys.items():
+        for sTagName in aKeys:
+            hMatchingTagValues[sTagName] = hValuesByName[sTagWithoutBrackets][:]
+        # end
+    # end
+    
+    if (VERBOSE == True):
+        print2("Found XML tag values: " + str(hMatchingTagValues))
+    # end
+    
+    return hMatchingTagValues
+    
+# END method - getMultipleXMLTagValuesForTags()
+
+
+#=============================================================================#
+#--
+# Function: getMultipleXMLTagValuesFromFile(...)
+#++
+#
+# Description:  Gets the values of the specified XML tag name from a file containing XML,
+#               (e.g. a SOAP response saved to the results directory), when there are
+#               multiple occurrences of the same Tag name.
+#
+#               The file is memory-mapped and scanned in place (see mapXMLFile()) rather than
+#               read into a STRING first, so only the values asked for are copied into memory.
+#               With bSpansOnly set to True nothing is copied at all, and the (start, end)
+#               offsets of the values in the file are returned instead.
+#
+# Returns: LIST of STRINGS - The values of the XML Tag, as getMultipleXMLTagValues() returns them
+#          or when bSpansOnly is True:
+#          LIST of TUPLES - The (start, end) offsets of the values, as getMultipleXMLTagSpans() returns them
+#
+# Syntax: sFilePath = STRING - Full pathname/filename of the file containing the XML
+#         sTagName =  STRING - The name of the XML tag to match. Tags can be
+#                              specified with or without the enclosing brackets "<>"
+#         bSpansOnly = BOOLEAN - True to return the offsets of the values instead of the values
+#
+# Usage Examples:
+#                   aIds = getMultipleXMLTagValuesFromFile("results/QueryAccount.xml", "sf:Id")
+#
+#                   aIdSpans = getMultipleXMLTagValuesFromFile("results/QueryAccount.xml", "sf:Id", True)
+#                   print2(str(len(aIdSpans)) + " Ids found")
+#
+#=============================================================================#
+def getMultipleXMLTagValuesFromFile(sFilePath, sTagName, bSpansOnly=False):
+    '''
+    Gets the values (or their offsets) of the specified XML tag name
+    from a file containing XML, by scanning the memory-mapped file in place.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - getMultipleXMLTagValuesFromFile:")
+        print2("  sFilePath: " + sFilePath)
+        print2("  sTagName: " + sTagName)
+        print2("  bSpansOnly: " + str(bSpansOnly))
+    # end
+    
+    oXMLMap = mapXMLFile(sFilePath)
+    
+    try:
+        aMatchingTagSpans = getMultipleXMLTagSpans(oXMLMap, sTagName)
+        
+        if (bSpansOnly == True):
+            return aMatchingTagSpans
+        # end
+        
+        aMatchingTagValues = []
+        for iValueStart, iValueEnd in aMatchingTagSpans:
+            aMatchingTagValues.append(oXMLMap[iValueStart:iValueEnd])
+        # end
+        
+        return aMatchingTagValues
+        
+    finally:
+        unmapXMLFile(oXMLMap)
+    # end
+    
+# END method - getMultipleXMLTagValuesFromFile()
+
+
+#=============================================================================#
+#--
+# Function: getXMLCacheStats()
+#++
+#
+# Description:  Gets the counters of the extraction cache started by enableXMLCache()
+#
+# Returns: DICT - The keys "hits", "misses", "evictions", "entries", "bytes",
+#                 "maxEntries" and "maxBytes", or None when caching is disabled
+#
+# Syntax: N/A
+#
+# Usage Examples:
+#                   hStats = getXMLCacheStats()
+#                   print2("XML cache hits: " + str(hStats["hits"]))
+#
+#=============================================================================#
+def getXMLCacheStats():
+    '''
+    Gets the counters of the XML extraction cache.
+    '''
+    
+    if (_XML_EXTRACTION_CACHE == None):
+        return None
+    # end
+    
+    return _XML_EXTRACTION_CACHE.getStats()
+    
+# END method - getXMLCacheStats()
+
+
+#=============================================================================#
+#--
+# Function: getXMLPathValues(...)
+#++
+#
+# Description:  Gets the values of the tags matching a path query, (e.g. "result/records/Id"),
+#               in a single pass over the XML. See XMLPath for the path syntax.
+#
+# Returns: LIST of STRINGS - The values of the matching tags
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sPath = STRING - The path, with the steps separated by '/'
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   aIds = getXMLPathValues(sXML, "result/records/Id")
+#
+#=============================================================================#
+def getXMLPathValues(sXML, sPath, bDecode=False):
+    '''
+    Gets the values of the tags matching a path query, e.g. "result/records/Id"
+    '''
+    
+    return compileXMLPath(sPath).getValues(sXML, bDecode)
+    
+# END method - getXMLPathValues()
+
+
+#=============================================================================#
+#--
+# Function: getXMLTagValue(...)
+#++
+#
+# Description:  Parses an XML string containing XML Tags to get the values of the 
+#               first occurrence of the specified tag name.
+#
+#               If more than one occurrence of the specified tag name can exist
+#               in the XML string use: getMultipleXMLTagValues()
+#                
+#               Checks that the Tag exists, NOT if it holds any content.
+#               Note that a Closing XML tag </tag_name> with 
+#               no Opening tag <tag_name> proceeding it will return None.
+#
+#               With any of the options bAttributes, bIgnoreNamespace or bSelfClosing set,
+#               returns the first value getMultipleXMLTagValues() would return, or None.
+#
+# Returns: STRING = The STRING between the Opening and Closing XML Tags, or None
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sTagName =  STRING - The name of the XML tags to match. Tags can be
+#                              specified with or without the enclosing brackets "<>"
+#         bAttributes = BOOLEAN - True to also match Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag name with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing tags, e.g. <sf:Id/>, as a value of ''
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName></Nickname></response>'
+#
+#                   sTagName = "UserName"
+#                   getXMLTagValue(sXML, sTag)  #=>  Bob
+#
+#                   sTagName = "response"       # XML Tag containing other XML Tags
+#                   getXMLTagValue(sXML, sTag)  #=>  <UserName>Bob</UserName></Nickname>
+#
+#                   sTagName = "Nickname"  # Closing XML tag with no Opening Tag
+#                   getXMLTagValue(sXML, sTag)  #=>  None
+#
+#=============================================================================#
+def getXMLTagValue(sXML, sTagName, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False, bDecode=False):
+    '''
+    Parses an  XML string containing XML Tags to get the values of the 
+    first occurrence of the specified tag name.
+    
+    If more than one occurrence of the specified tag name can exist
+    in the XML string use: getMultipleXMLTagValues()
+    
+    Note that a Closing XML tag (</tag_name> ) with no Opening XML Tag
+    <tag_name> proceeding it will return None
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - getXMLTagValue:")
+        print2("  sXML: " + sXML)
+        print2("  sTagName: " + sTagName)
+    # end
+    
+    # Matching attributes, namespace prefixes or self-closing tags takes the
+    # Regular Expression scanner, stopping at the first value found
+    if ((bAttributes == True) | (bIgnoreNamespace == True) | (bSelfClosing == True)):
+        oScanner = _getXMLTagScanner([sTagName], bAttributes, bIgnoreNamespace, bSelfClosing)
+        for sMatchName, iValueStart, iValueEnd in oScanner.iterSpans(sXML):
+            if (bDecode == True):
+                return decodeXMLEntities(sXML[iValueStart:iValueEnd])
+            # end
+            return sXML[iValueStart:iValueEnd]
+        # end
+        return None
+    # end
+    
+    # Generate the Opening and Closing XML tags
+    
+    # Its easier to first remove brackets (if they existed).
+    sTagWithoutBrackets = removeXMLBrackets(sTagName)
+    
+    # Generate the Opening and Closing tags (with brackets)
+    aXMLTags = createXMLTags(sTagWithoutBrackets)
+    
+    sFullOpeningTag = aXMLTags[0]
+    sFullClosingTag = aXMLTags[1]
+    
+    if (VERBOSE == True):
+        print2("Opening tag:  " + sFullOpeningTag)
+        print2("Closing tag:  " + sFullClosingTag)
+    # end
+    
+    # Determine the length of the Opening and Closing Tags
+    iOpeningTagLength = len(sFullOpeningTag)
+    iClosingTagLength = len(sFullClosingTag)
+    
+    if (VERBOSE == True):
+        print2("Opening tag length:  " + str(iOpeningTagLength))
+        print2("Closing tag length:  " + str(iClosingTagLength))
+    # end
+    #
+    # Verify that the specified tag exists, (the same check as isTagInXML()).
+    # Find the position of the first character of the Closing Tag in the XML string
+    iIndexOfClosingTag = sXML.find(sFullClosingTag)
+    
+    if (iIndexOfClosingTag == -1):
+        if (VERBOSE == True):
+            print2("No tag:  " + sTagName)
+        # end
+        return None
+    # end
+    
+    # Find the position of the first character of the Opening Tag in the XML string
+    iIndexOfOpeningTag = sXML.find(sFullOpeningTag)
+    
+    if (VERBOSE == True):
+        print2("Opening tag index:  " + str(iIndexOfOpeningTag))
+        print2("Closing tag index:  " + str(iIndexOfClosingTag))
+    # end
+    
+    # If either of the Tags can't be found, return None
+    if ((iIndexOfOpeningTag == -1 ) | (iIndexOfClosingTag == -1 )):
+        if (VERBOSE == True):
+            print2("Missing either Opening XML Tag or Closing XML tag")
+        # end
+        return None
+    # end
+    
+    # Save the STRING between the Opening and Closing Tags
+    sXMLTagValue = sXML[(iIndexOfOpeningTag + iOpeningTagLength):iIndexOfClosingTag]
+    
+    if (bDecode == True):
+        sXMLTagValue = decodeXMLEntities(sXMLTagValue)
+    # end
+    
+    return sXMLTagValue
+    
+# END method - getXMLTagValue()
+
+#=============================================================================#
+#--
+# Function: isTagInXML(...)
+#++
+#
+# Description:  Parses a string containing XML Tags to see if the specified
+#               tag name exists. 
+#               Checks that the Tag exists, NOT if it holds any content.
+#               Note that a null tag (e.g. a Closing tag </tag_name> with 
+#               no Opening tag <tag_name>) will be identified as existing.
+#
+#               To check several tags at once use: areTagsInXML()
+#
+# Returns: BOOLEAN = True if the Tag exists, otherwise False
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sTagName =  STRING - The name of the XML tags to match. Names can be
+#                          specified with or without the enclosing brackets "<>"
+#
+# Usage Examples:
+#                   sXML = '<response><UserName>Bob</UserName></Password></response>'
+#                   sTagName = "UserName"
+#                   isTagInXML(sXML, sTag)  #=>  True
+#
+#                   sTagName = "Username"
+#                   isTagInXML(sXML, sTag)  #=>  False
+#
+#                   sTagName = "<UserName>"  # With Brackets
+#                   isTagInXML(sXML, sTag)  #=>  True
+#
+#                   sTagName = "Password"  # With no Opening tag
+#                   isTagInXML(sXML, sTag)  #=>  True
+#
+#=============================================================================#
+def isTagInXML(sXML, sTagName):
+    '''
+    Parse a string containing XML Tags to see if the specified tag name exists.
+    Note that a empty closing tag (e.g. </tag_name> ) with no opening  <tag_name> 
+    will be identified as existing
+    '''
+    
+    # VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - isTagInXML:")
+        print2("  sXML: " + sXML)
+        print2("  sTagName: " + sTagName)
+    # end
+    
+    # Set default return value
+    bFound = False
+    
+    # Instead of checking the specified tag for enclosing brackets <tag_name>.
+    # ITs easier to just remove them (if they existed) and then adding them.
+    sTagWithoutBrackets = removeXMLBrackets(sTagName)
+    
+    # Generate the Opening and Closing tags (with brackets)
+    aXMLTags = createXMLTags(sTagWithoutBrackets)
+    
+    #sFullOpeningTag = aTags[0]
+    sFullClosingTag = aXMLTags[1]
+    
+    if (VERBOSE == True):
+        #print2("Opening tag:  " + sFullOpeningTag)
+        print2("Closing tag:  " + sFullClosingTag)
+    # end
+    
+    # Parse the XML String to see if there is a Closing Tag
+    # If the Closing tag is found then the tag exists, even if
+    # there is no Opening tag.
+    # A plain substring search stops at the first match, and treats characters
+    # like '.' in the tag name literally, unlike a Regular Expression
+    if(sXML.find(sFullClosingTag) != -1):
+        bFound = True
+    # end
+    
+    
+    return bFound
+    
+# END method - isTagInXML()
+
+
+
+#=============================================================================#
+#--
+# Function: iterXMLRecords(...)
+#++
+#
+# Description:  Parses a string containing repeated XML record elements (e.g. the <records>
+#               of an SFDC query response) and generates one row per record, holding the
+#               values of the specified child tags of that record.
+#
+#               The rows are built in a single scan of the XML string, and the values stay
+#               grouped by the record they came from. A record that lacks one of the tags
+#               gets None in that position instead of shifting the values of the records
+#               after it, as happens when zipping the LISTs from getMultipleXMLTagValues().
+#
+#               The record tag may carry attributes (e.g. <records xsi:type="sf:Account">).
+#               Only the first occurrence of a child tag directly within the record is used,
+#               the same tag inside a nested element of the record, (e.g. the <sf:Id> of its
+#               <sf:Owner>), or inside a nested record of the same name, is skipped.
+#
+# Returns: GENERATOR of TUPLES - One TUPLE per record, with the values in the same order
+#                                as aFieldTagNames, or None for a tag missing in that record.
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#         sRecordTagName =  STRING - The name of the XML tag enclosing each record.
+#         aFieldTagNames =  LIST of STRINGS - The names of the XML tags to get from each record.
+#         Tags can be specified with or without the enclosing brackets "<>"
+#         bAttributes = BOOLEAN - True to also match field tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag names with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing field tags, e.g. <sf:Id/>, as a value of ''
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   sXML = '<result><records xsi:type="sf:Account"><sf:Id>01</sf:Id><sf:Name>Bob</sf:Name></records><records xsi:type="sf:Account"><sf:Id>02</sf:Id></records></result>'
+#
+#                   for tRow in iterXMLRecords(sXML, "records", ["sf:Name", "sf:Id"]):
+#                       print2(str(tRow))    #=>  ('Bob', '01')  then  (None, '02')
+#
+#                   hNameIds = dict(iterXMLRecords(sXML, "records", ["sf:Name", "sf:Id"]))
+#
+#                   sXML = '<records><ns2:Id xsi:type="xsd:string">01</ns2:Id><Name/></records>'
+#                   list(iterXMLRecords(sXML, "records", ["sf:Id", "sf:Name"], True, True, True))  #=>  [('01', '')]
+#
+#=============================================================================#
+def iterXMLRecords(sXML, sRecordTagName, aFieldTagNames, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False, bDecode=False):
+    '''
+    Generates one TUPLE per repeated XML record element, holding the values
+    of the specified child tags, from a single scan of the XML string.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - iterXMLRecords:")
+        print2("  sRecordTagName: " + sRecordTagName)
+        print2("  aFieldTagNames: " + str(aFieldTagNames))
+    # end
+    
+    # Match the tag names w/o brackets, (and w/o their prefix when ignoring namespaces)
+    fMatchName = removeXMLBrackets
+    sPrefix = ""
+    if (bIgnoreNamespace == True):
+        fMatchName = _getXMLLocalName
+        sPrefix = _XML_NAMESPACE_PREFIX
+    # end
+    
+    sFieldAttributes = ""
+    if (bAttributes == True):
+        sFieldAttributes = _XML_ATTRIBUTES
+    # end
+    
+    sRecordName = fMatchName(sRecordTagName)
+    
+    # DICT of matched field name : LIST of its positions in the row
+    hFieldColumns = {}
+    aEscapedNames = []
+    for iColumn in range(len(aFieldTagNames)):
+        sFieldName = fMatchName(aFieldTagNames[iColumn])
+        if (hFieldColumns.has_key(sFieldName) == False):
+            hFieldColumns[sFieldName] = []
+            aEscapedNames.append(re.escape(sFieldName))
+        # end
+        hFieldColumns[sFieldName].append(iColumn)
+    # end
+    
+    # group(1) = '/' for a Closing tag,  group(2) = record name,
+    # group(3) = record attributes,  group(4) = field name,
+    # group(5) = '/' for a self-closing tag,  (any other element tag matches no name group)
+    sPattern = "<(/?)" + sPrefix + "(?:(" + re.escape(sRecordName) + ")(\\s[^<>]*)?"
+    if (aEscapedNames != []):
+        sPattern = sPattern + "|(" + "|".join(aEscapedNames) + ")" + sFieldAttributes
+    # end
+    sPattern = sPattern + "|[^\\s<>/!?][^\\s<>/]*" + _XML_ATTRIBUTES + ")(/?)>"
+    oPattern = re.compile(sPattern)
+    
+    iColumnCount = len(aFieldTagNames)
+    aEmptyRow = [None] * iColumnCount
+    
+    iRecordDepth = 0      # Nesting level of the record tag
+    iElementDepth = 0     # Nesting level of the elements within the current record
+    aRow = None           # Values of the current record
+    hPendingOpen = {}     # Unpaired Opening field tags of the current record
+    
+    for oMatch in oPattern.finditer(sXML):
+        
+        sClosingSlash, sRecordMatch, sAttributes, sFieldName, sSelfClosingSlash = oMatch.groups()
+        
+        if (sRecordMatch != None):
+            
+            if (sClosingSlash):
+                # End of a record
+                if (iRecordDepth > 0):
+                    iRecordDepth = iRecordDepth - 1
+                    if (iRecordDepth == 0):
+                        yield tuple(aRow)
+                        aRow = None
+                    # end
+                # end
+                
+            elif ((sSelfClosingSlash) or ((sAttributes != None) and (sAttributes[-1:] == "/"))):
+                # An empty record (e.g. <records xsi:nil="true"/>) at the top level
+                if (iRecordDepth == 0):
+                    yield tuple(aEmptyRow)
+                # end
+                
+            else:
+                # Start of a record
+                iRecordDepth = iRecordDepth + 1
+                if (iRecordDepth == 1):
+                    aRow = aEmptyRow[:]
+                    iElementDepth = 0
+                    hPendingOpen.clear()
+                # end
+            # end
+            
+        elif (iRecordDepth == 1):
+            
+            # Track the nesting of the elements, so only the fields directly within the record are read
+            if (sClosingSlash):
+                if (iElementDepth > 0):
+                    iElementDepth = iElementDepth - 1
+                # end
+            elif (sSelfClosingSlash == ""):
+                iElementDepth = iElementDepth + 1
+                if ((sFieldName != None) and (iElementDepth == 1) and (hPendingOpen.get(sFieldName, -1) == -1)):
+                    hPendingOpen[sFieldName] = oMatch.end()
+                # end
+                continue
+            # end
+            
+            if ((sFieldName == None) or (iElementDepth > 0)):
+                continue
+            # end
+            
+            if (sSelfClosingSlash):
+                # A self-closing field tag holds no value
+                if ((bSelfClosing == True) & (sClosingSlash == "")):
+                    for iColumn in hFieldColumns[sFieldName]:
+                        if (aRow[iColumn] == None):
+                            aRow[iColumn] = ''
+                        # end
+                    # end
+                # end
+                
+            elif (sClosingSlash):
+                # Pair the Closing tag with the pending Opening tag if there is one
+                iValueStart = hPendingOpen.get(sFieldName, -1)
+                if (iValueStart == -1):
+                    sValue = ''
+                else:
+                    hPendingOpen[sFieldName] = -1
+                    sValue = sXML[iValueStart:oMatch.start()]
+                    if (bDecode == True):
+                        sValue = decodeXMLEntities(sValue)
+                    # end
+                # end
+                
+                # Keep only the first value of the tag within the record
+                for iColumn in hFieldColumns[sFieldName]:
+                    if (aRow[iColumn] == None):
+                        aRow[iColumn] = sValue
+                    # end
+                # end
+                
+            # end
+            
+        # end
+        
+    # end
+    
+# END method - iterXMLRecords()
+
+
+#=============================================================================#
+#--
+# Function: iterXMLTagValues(...)
+#++
+#
+# Description:  Streaming version of getMultipleXMLTagValues(), for XML too big to hold in memory.
+#               Reads the XML from a file, or from an iterator of STRINGS, a chunk at a time,
+#               and generates the values of the specified XML tag name as they are found.
+#
+#               Tags split across two chunks are handled, and only the text of the
+#               value currently being read is held in memory, so the memory used depends
+#               on the size of the largest value, not on the size of the XML.
+#               Note that an Opening tag that is never closed holds the text after it
+#               in memory until the end of the XML.
+#
+# Returns: GENERATOR of STRINGS - The same values, in the same order, as
+#                                 getMultipleXMLTagValues() returns for the whole XML
+#
+# Syntax: oSource =  STRING - The full pathname/filename of a file containing the XML,
+#                    or FILE - A file object open for reading,
+#                    or an iterator (e.g. LIST or GENERATOR) of STRINGS holding the XML in pieces.
+#         sTagName =  STRING - The name of the XML tag to match. Tags can be
+#                              specified with or without the enclosing brackets "<>"
+#         iChunkSize = INTEGER - Number of characters to read from a file at a time
+#         bAttributes = BOOLEAN - True to also match Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag name with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing tags, e.g. <sf:Id/>, as a value of ''
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   for sId in iterXMLTagValues("results/QueryAccount.xml", "sf:Id"):
+#                       print2(sId)
+#                   # end
+#
+#                   iterXMLTagValues(["<a>1</a><", "a>2</a>"], "a")  #=>  '1', '2'
+#
+#=============================================================================#
+def iterXMLTagValues(oSource, sTagName, iChunkSize=XML_CHUNK_SIZE, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False, bDecode=False):
+    '''
+    Generates the values of the specified XML tag name from an XML file,
+    file object, or iterator of STRINGS, reading it a chunk at a time.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - iterXMLTagValues:")
+        print2("  oSource: " + str(oSource))
+        print2("  sTagName: " + sTagName)
+    # end
+    
+    oScanner = _getXMLTagScanner([sTagName], bAttributes, bIgnoreNamespace, bSelfClosing)
+    
+    for sTagWithoutBrackets, sValue in _iterXMLStreamSpans(oSource, oScanner, iChunkSize):
+        if (bDecode == True):
+            sValue = decodeXMLEntities(sValue)
+        # end
+        yield sValue
+    # end
+    
+# END method - iterXMLTagValues()
+
+
+#=============================================================================#
+#--
+# Function: iterXMLTagValuesForTags(...)
+#++
+#
+# Description:  Streaming version of getMultipleXMLTagValuesForTags(), for XML too big to hold
+#               in memory. Reads the XML from a file, or from an iterator of STRINGS, a chunk
+#               at a time, and generates the values of each of the specified XML tag names
+#               in the order their Closing tags are found.
+#
+#               See iterXMLTagValues() for how chunks and memory are handled.
+#
+# Returns: GENERATOR of TUPLES - (sTagName, sValue) for each value found, where sTagName
+#                                is the tag name as specified in aTagNames
+#
+# Syntax: oSource =  STRING - The full pathname/filename of a file containing the XML,
+#                    or FILE - A file object open for reading,
+#                    or an iterator (e.g. LIST or GENERATOR) of STRINGS holding the XML in pieces.
+#         aTagNames =  LIST of STRINGS - The names of the XML tags to match. Tags can be
+#                                        specified with or without the enclosing brackets "<>"
+#         iChunkSize = INTEGER - Number of characters to read from a file at a time
+#         bAttributes = BOOLEAN - True to also match Opening tags with attributes, e.g. <sf:Id xsi:type="xsd:string">
+#         bIgnoreNamespace = BOOLEAN - True to match the tag name with any namespace prefix, e.g. <Id> or <ns2:Id> for 'sf:Id'
+#         bSelfClosing = BOOLEAN - True to also match self-closing tags, e.g. <sf:Id/>, as a value of ''
+#         bDecode = BOOLEAN - True to decode the entities in the values, see decodeXMLEntities()
+#
+# Usage Examples:
+#                   for sTagName, sValue in iterXMLTagValuesForTags("results/QueryAccount.xml", ["sf:Id", "sf:Name"]):
+#                       print2(sTagName + " = " + sValue)
+#                   # end
+#
+#=============================================================================#
+def iterXMLTagValuesForTags(oSource, aTagNames, iChunkSize=XML_CHUNK_SIZE, bAttributes=False, bIgnoreNamespace=False, bSelfClosing=False, bDecode=False):
+    '''
+    Generates (sTagName, sValue) for each of the specified XML tag names from an
+    XML file, file object, or iterator of STRINGS, reading it a chunk at a time.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - iterXMLTagValuesForTags:")
+        print2("  oSource: " + str(oSource))
+        print2("  aTagNames: " + str(aTagNames))
+    # end
+    
+    oScanner = _getXMLTagScanner(aTagNames, bAttributes, bIgnoreNamespace, bSelfClosing)
+    hTagKeys = oScanner.hTagKeys
+    
+    for sMatchName, sValue in _iterXMLStreamSpans(oSource, oScanner, iChunkSize):
+        if (bDecode == True):
+            sValue = decodeXMLEntities(sValue)
+        # end
+        for sTagName in hTagKeys[sMatchName]:
+            yield (sTagName, sValue)
+        # end
+    # end
+    
+# END method - iterXMLTagValuesForTags()
+
+
+#=============================================================================#
+#--
+# Function: mapXMLFile(...)
+#++
+#
+# Description:  Memory-maps a file containing XML (read only), so that it can be searched
+#               in place without first reading the whole file into a STRING.
+#
+#               The returned object can be passed as the XML string to getMultipleXMLTagSpans(),
+#               getMultipleXMLTagValues(), getMultipleXMLTagValuesForTags(), iterXMLRecords()
+#               and XMLDocument(), and sliced like a STRING to get the text of a value.
+#               The file is read in binary mode, so line endings are left as they are in the file.
+#
+#               When memory-mapped files are not available (e.g. Jython2.2.1), or the file is
+#               empty, the contents of the file are returned as a STRING instead.
+#
+#               Call unmapXMLFile() when done with it.
+#
+# Returns: MMAP - The memory-mapped file, or STRING - The contents of the file
+#
+# Syntax: sFilePath = STRING - Full pathname/filename of the file containing the XML
+#
+# Usage Examples:
+#                   oXMLMap = mapXMLFile("results/QueryAccount.xml")
+#                   for iValueStart, iValueEnd in getMultipleXMLTagSpans(oXMLMap, "sf:Id"):
+#                       print2(oXMLMap[iValueStart:iValueEnd])
+#                   # end
+#                   unmapXMLFile(oXMLMap)
+#
+#=============================================================================#
+def mapXMLFile(sFilePath):
+    '''
+    Memory-maps a file containing XML (read only), so it can be searched in place
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - mapXMLFile:")
+        print2("  sFilePath: " + sFilePath)
+    # end
+    
+    oFileObject = open(sFilePath, 'rb')
+    
+    try:
+        if ((mmap == None) | (os.path.getsize(sFilePath) == 0)):
+            if (VERBOSE == True):
+                print2("Reading the file instead of memory-mapping it")
+            # end
+            return oFileObject.read()
+        # end
+        
+        # The map stays valid after the file object is closed
+        return mmap.mmap(oFileObject.fileno(), 0, access=mmap.ACCESS_READ)
+        
+    finally:
+        oFileObject.close()
+    # end
+    
+# END method - mapXMLFile()
+
+
+#=============================================================================#
+#--
+# Function: removeXMLBrackets(...)
+#++
+#
+# Description:  Removes the brackets from Opening or Closing tags
+#               Modifies '</tag_name>'  or '<tag_name>'  to 'tag_name' 
+#
+# Returns: STRING = The modified tag without the brackets
+#
+# Syntax: sTag =  STRING - The XML tags to strip of the enclosing brackets "<>"
+#
+# Usage Examples:
+#                    sTag = 'UserName'     # Tag name w/o brackets
+#                    removeXMLBrackets(sTag)  #=>  UserName
+#
+#                    sTag = '<Username>'   # Opening tag with Brackets
+#                    removeXMLBrackets(sTag)  #=>  UserName
+#
+#                    sTag = '</UserName>'  # Closing tag with Brackets
+#                    removeXMLBrackets(sTag)  #=>  UserName
+#
+#=============================================================================#
+def removeXMLBrackets(sTag):
+    '''
+    Removes the brackets from Opening or Closing tags
+    Modifies '</tag_name>'  or '<tag_name>'  to 'tag_name' 
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - removeBrackets:")
+        print2("  sTag: " + sTag)
+    # end
+    
+    # TODO: Improve to ignore brackets within the tag name 
+    # Remove the brackets and slash from the Closing tag
+    sTag = sTag.replace('</', '')
+    #sTag = sTag.replace(r'^</', '')
+    
+    # Remove the bracket from the Opening tag
+    sTag = sTag.replace('<', '')
+    #sTag = sTag.replace(r'^<', '')
+    
+    # Remove the trailing bracket
+    sTag = sTag.replace('>', '')
+    #sTag = sTag.replace(r'>$', '')
+    
+    if (VERBOSE == True):
+        print2("Tag w/o brackets:  " + sTag)
+    # end
+    
+    return sTag
+    
+# END method - removeXMLBrackets()
+
+
+#=============================================================================#
+#--
+# Function: unmapXMLFile(...)
+#++
+#
+# Description:  Releases a file memory-mapped by mapXMLFile()
+#               Any values already copied out of it remain valid.
+#
+# Returns: N/A
+#
+# Syntax: oXMLMap = MMAP or STRING - As returned by mapXMLFile()
+#
+# Usage Examples:  See mapXMLFile()
+#
+#=============================================================================#
+def unmapXMLFile(oXMLMap):
+    '''
+    Releases a file memory-mapped by mapXMLFile()
+    '''
+    
+    # mapXMLFile() may have returned the contents of the file as a STRING
+    if (hasattr(oXMLMap, "close")):
+        oXMLMap.close()
+    # end
+    
+# END method - unmapXMLFile()
+
+
+#=============================================================================#
+#--
+# Function: writeXML(...)
+#++
+#
+# Description:  Writes the XML that buildXML() would build to a file object, a batch
+#               of XML_WRITE_BUFFER_PARTS pieces at a time, so a payload never has
+#               to be held in memory whole.
+#               Values that are iterators (e.g. GENERATORS) are read as they are written.
+#
+# Returns: INTEGER - The number of characters written
+#
+# Syntax: oFileObject = FILE - A file object (or anything with a write() method) open for writing
+#         oData = DICT, or LIST of (tag name, value) TUPLES - The tags to write, see buildXML()
+#         sRootTagName = STRING - The name of a tag to enclose all the tags in, (optional)
+#
+# Usage Examples:
+#                   oFileObject = open("results/CreateAccounts.xml", "w")
+#                   writeXML(oFileObject, {"create": {"sObjects": iterAccounts()}})
+#                   oFileObject.close()
+#
+#=============================================================================#
+def writeXML(oFileObject, oData, sRootTagName=None):
+    '''
+    Writes the XML built from nested DICTs and LISTs to a file object
+    in batches, without holding all of it in memory.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - writeXML:")
+        print2("  sRootTagName: " + str(sRootTagName))
+    # end
+    
+    oBuffer = _XMLBuffer(oFileObject)
+    
+    if (sRootTagName != None):
+        _appendXMLElement(oBuffer, sRootTagName, oData)
+    else:
+        _appendXMLChildren(oBuffer, oData)
+    # end
+    
+    oBuffer.flush()
+    
+    return oBuffer.iLength
+    
+# END method - writeXML()
+
+
+#=============================================================================#
+#--
+# Function: writeXMLRecords(...)
+#++
+#
+# Description:  Writes the XML that buildXMLRecords() would build to a file object,
+#               a batch of XML_WRITE_BUFFER_PARTS pieces at a time, reading the rows as
+#               they are written, so neither the rows nor the XML have to be held in memory.
+#
+# Returns: INTEGER - The number of characters written
+#
+# Syntax: oFileObject = FILE - A file object (or anything with a write() method) open for writing
+#         aRows = LIST (or iterator) of TUPLES - The values of each record
+#         sRecordTagName = STRING - The name of the XML tag enclosing each record
+#         aFieldTagNames = LIST of STRINGS - The names of the XML tags of each value
+#         sRootTagName = STRING - The name of a tag to enclose all the records in, (optional)
+#
+# Usage Examples:
+#                   oFileObject = open("results/CreateAccounts.xml", "w")
+#                   writeXMLRecords(oFileObject, iterAccountRows(), "sObjects", ["Name", "BillingCity"], "create")
+#                   oFileObject.close()
+#
+#=============================================================================#
+def writeXMLRecords(oFileObject, aRows, sRecordTagName, aFieldTagNames, sRootTagName=None):
+    '''
+    Writes the XML with one record tag for each row of values to a file object
+    in batches, without holding all of it in memory.
+    '''
+    
+    #VERBOSE = True
+    
+    if(VERBOSE == True):
+        print2("Parameters - writeXMLRecords:")
+        print2("  sRecordTagName: " + sRecordTagName)
+        print2("  aFieldTagNames: " + str(aFieldTagNames))
+        print2("  sRootTagName: " + str(sRootTagName))
+    # end
+    
+    oBuffer = _XMLBuffer(oFileObject)
+    
+    if (sRootTagName != None):
+        oBuffer.aParts.append(_getXMLBuildTags(sRootTagName)[0])
+    # end
+    
+    _appendXMLRecords(oBuffer, aRows, sRecordTagName, aFieldTagNames)
+    
+    if (sRootTagName != None):
+        oBuffer.aParts.append(_getXMLBuildTags(sRootTagName)[1])
+    # end
+    
+    oBuffer.flush()
+    
+    return oBuffer.iLength
+    
+# END method - writeXMLRecords()
+
+
+#=============================================================================#
+#--
+# Class: XMLDocument(...)
+#++
+#
+# Description:  Holds a string containing XML Tags so that it can be queried many times
+#               without rescanning it.
+#
+#               On first use the XML string is scanned once, and the offsets of every
+#               Opening <tag_name> and Closing </tag_name> tag are saved in an index by tag name.
+#               Every lookup after that is answered from the index, and the values found
+#               for a tag are kept so that asking for them again costs nothing.
+#
+#               The methods return the same results as the functions of the same name:
+#                   getMultipleXMLTagValues()  ->  oDocument.getMultipleXMLTagValues(...)
+#                   getXMLTagValue()           ->  oDocument.getXMLTagValue(...)
+#                   isTagInXML()               ->  oDocument.isTagInXML(...)
+#               along with:
+#                   oDocument.countXMLTags(sTagName)  - Number of Closing tags of that name
+#                   oDocument.getMultipleXMLTagSpans(sTagName) - (start, end) offsets of each value
+#                   oDocument.getXMLTagNames()  - LIST of all tag names in the XML
+#
+# Syntax: sXML =  STRING - The string containing the XML tags to be searched.
+#
+# Usage Examples:
+#                   oDocument = XMLDocument(sXML)
+#
+#                   if (oDocument.isTagInXML("sf:Id") == True):
+#                       aIds = oDocument.getMultipleXMLTagValues("sf:Id")
+#                       sName = oDocument.getXMLTagValue("sf:Name")
+#                   # end
+#
+#=============================================================================#
+class XMLDocument(object):
+    '''
+    Holds a string containing XML Tags, and answers repeated tag lookups
+    from an index of the tag offsets built on first use.
+    '''
+    
+    # Matches the Opening <tag_name> and Closing </tag_name> tags the
+    # functions of this module look for, (no attributes)
+    # group(1) = '/' for a Closing tag,  group(2) = tag name
+    oTagPattern = re.compile("<(/?)([^<>/]+)>")
+    
+    def __init__(self, sXML):
+        
+        self.sXML = sXML
+        
+        # The index is built on first use
+        self.hOpeningTags = None    # DICT of tag name : LIST of offsets of its Opening tags
+        self.hClosingTags = None    # DICT of tag name : LIST of offsets of its Closing tags
+        
+        # Values already found, by tag name
+        self.hSpans = {}
+        self.hValues = {}
+        
+    # end __init__()
+    
+    def _buildIndex(self):
+        '''
+        Scans the XML string once, saving the offsets of all the tags by name
+        '''
+        
+        hOpeningTags = {}
+        hClosingTags = {}
+        
+        for oMatch in self.oTagPattern.finditer(self.sXML):
+            
+            sClosingSlash, sTagName = oMatch.groups()
+            
+            if (sClosingSlash):
+                hTags = hClosingTags
+            else:
+                hTags = hOpeningTags
+            # end
+            
+            aOffsets = hTags.get(sTagName)
+            if (aOffsets == None):
+                hTags[sTagName] = [oMatch.start()]
+            else:
+                aOffsets.append(oMatch.start())
+            # end
+            
+        # end
+        
+        if (VERBOSE == True):
+            print2("Indexed " + str(len(hOpeningTags)) + " Opening and " + str(len(hClosingTags)) + " Closing tag names")
+        # end
+        
+        self.hOpeningTags = hOpeningTags
+        self.hClosingTags = hClosingTags
+        
+    # end _buildIndex()
+    
+    def _getOffsets(self, sTagName):
+        '''
+        Returns the tag name w/o brackets, and the LISTs of offsets of its Opening and Closing tags
+        '''
+        
+        if (self.hOpeningTags == None):
+            self._buildIndex()
+        # end
+        
+        sTagWithoutBrackets = removeXMLBrackets(sTagName)
+        
+        return (sTagWithoutBrackets,
+                self.hOpeningTags.get(sTagWithoutBrackets, []),
+                self.hClosingTags.get(sTagWithoutBrackets, []))
+        
+    # end _getOffsets()
+    
+    def countXMLTags(self, sTagName):
+        '''
+        Returns the number of Closing tags of the specified tag name
+        '''
+        
+        sTagWithoutBrackets, aOpeningTags, aClosingTags = self._getOffsets(sTagName)
+        
+        return len(aClosingTags)
+        
+    # end countXMLTags()
+    
+    def getMultipleXMLTagSpans(self, sTagName):
+        '''
+        Returns a LIST of (start, end) TUPLES, with the offsets of each of the values that
+        getMultipleXMLTagValues() returns for the specified tag name
+        '''
+        
+        sTagWithoutBrackets, aOpeningTags, aClosingTags = self._getOffsets(sTagName)
+        
+        aSpans = self.hSpans.get(sTagWithoutBrackets)
+        if (aSpans != None):
+            return aSpans[:]
+        # end
+        
+        iOpeningTagLength = len(sTagWithoutBrackets) + 2
+        iClosingTagLength = len(sTagWithoutBrackets) + 3
+        iOpeningTagCount = len(aOpeningTags)
+        
+        # Pair each Closing tag with the first Opening tag after the previous Closing tag,
+        # walking both LISTs of offsets once
+        aSpans = []
+        iCurrentOffset = 0
+        iOpening = 0
+        for iClosingTag in aClosingTags:
+            
+            while ((iOpening < iOpeningTagCount) and (aOpeningTags[iOpening] < iCurrentOffset)):
+                iOpening = iOpening + 1
+            # end
+            
+            if (iOpening < iOpeningTagCount):
+                iValueStart = aOpeningTags[iOpening] + iOpeningTagLength
+            else:
+                iValueStart = iClosingTag
+            # end
+            
+            # An Opening tag that follows the Closing tag yields ''
+            if (iValueStart > iClosingTag):
+                iValueStart = iClosingTag
+            # end
+            
+            aSpans.append((iValueStart, iClosingTag))
+            iCurrentOffset = iClosingTag + iClosingTagLength
+            
+        # end
+        
+        self.hSpans[sTagWithoutBrackets] = aSpans
+        
+        return aSpans[:]
+        
+    # end getMultipleXMLTagSpans()
+    
+    def getMultipleXMLTagValues(self, sTagName):
+        '''
+        Returns the same LIST of values as getMultipleXMLTagValues(sXML, sTagName)
+        '''
+        
+        sTagWithoutBrackets = removeXMLBrackets(sTagName)
+        
+        aValues = self.hValues.get(sTagWithoutBrackets)
+        if (aValues == None):
+            sXML = self.sXML
+            aValues = []
+            for iValueStart, iValueEnd in self.getMultipleXMLTagSpans(sTagWithoutBrackets):
+                aValues.append(sXML[iValueStart:iValueEnd])
+            # end
+            self.hValues[sTagWithoutBrackets] = aValues
+        # end
+        
+        return aValues[:]
+        
+    # end getMultipleXMLTagValues()
+    
+    def getXMLTagNames(self):
+        '''
+        Returns a LIST of the names of all the tags (with a Closing tag) in the XML string
+        '''
+        
+        if (self.hOpeningTags == None):
+            self._buildIndex()
+        # end
+        
+        return self.hClosingTags.keys()
+        
+    # end getXMLTagNames()
+    
+    def getXMLTagValue(self, sTagName):
+        '''
+        Returns the same value as getXMLTagValue(sXML, sTagName)
+        '''
+        
+        sTagWithoutBrackets, aOpeningTags, aClosingTags = self._getOffsets(sTagName)
+        
+        # If either of the Tags can't be found, return None
+        if ((aOpeningTags == []) | (aClosingTags == [])):
+            return None
+        # end
+        
+        return self.sXML[(aOpeningTags[0] + len(sTagWithoutBrackets) + 2):aClosingTags[0]]
+        
+    # end getXMLTagValue()
+    
+    def isTagInXML(self, sTagName):
+        '''
+        Returns True if a Closing tag of the specified tag name exists, otherwise False
+        '''
+        
+        sTagWithoutBrackets, aOpeningTags, aClosingTags = self._getOffsets(sTagName)
+        
+        if (aClosingTags == []):
+            return False
+        # end
+        
+        return True
+        
+    # end isTagInXML()
+    
+# END class - XMLDocument
+
+
+#=============================================================================#
+#--
+# Class: XMLExtractionCache(...)
+#++
+#
+# Description:  Bounded Least Recently Used (LRU) cache of the results of the XML
+#               extraction functions, see enableXMLCache().
+#
+#               Results are keyed by the length and hash() of the XML string, plus the
+#               function, tag names and options used, so an identical XML string held in
+#               a different STRING object (e.g. read again from a SOAtest variable)
+#               finds the results of the earlier extraction.
+#
+#               When adding a result would go over either iMaxEntries or iMaxBytes,
+#               the least recently used results are evicted first.
+#               iMaxBytes is checked against the characters held in the cached values,
+#               plus a fixed allowance for each value.
+#
+# Syntax: iMaxEntries = INTEGER - Maximum number of results held
+#         iMaxBytes = INTEGER - Maximum (approximate) size of the results held
+#
+# Usage Examples:
+#                   oCache = XMLExtractionCache(100, 1048576)
+#                   tKey = oCache.getKey(sXML, ("sf:Id",))
+#                   aIds = oCache.get(tKey)
+#                   if (aIds == None):
+#                       aIds = getMultipleXMLTagValues(sXML, "sf:Id")
+#                       oCache.put(tKey, aIds, oCache.getSize(aIds))
+#                   # end
+#                   print2(str(oCache.getStats()))
+#
+#=============================================================================#
+class XMLExtractionCache(object):
+    '''
+    Bounded LRU cache of XML extraction results, keyed by the length and
+    hash of the XML string, with hit/miss/eviction counters and a size cap.
+    '''
+    
+    # Allowance for the memory used by each cached value besides its characters
+    iValueOverhead = 40
+    
+    def __init__(self, iMaxEntries=XML_CACHE_MAX_ENTRIES, iMaxBytes=XML_CACHE_MAX_BYTES):
+        
+        self.iMaxEntries = iMaxEntries
+        self.iMaxBytes = iMaxBytes
+        
+        self.clear()
+        
+        self.iHits = 0
+        self.iMisses = 0
+        self.iEvictions = 0
+        
+    # end __init__()
+    
+    def _unlink(self, aEntry):
+        '''
+        Removes an entry from the LRU list
+        '''
+        
+        aEntry[0][1] = aEntry[1]
+        aEntry[1][0] = aEntry[0]
+        
+    # end _unlink()
+    
+    def _linkFirst(self, aEntry):
+        '''
+        Puts an entry at the most recently used end of the LRU list
+        '''
+        
+        aHead = self.aHead
+        aEntry[0] = aHead
+        aEntry[1] = aHead[1]
+        aHead[1][0] = aEntry
+        aHead[1] = aEntry
+        
+    # end _linkFirst()
+    
+    def clear(self):
+        '''
+        Removes all the cached results, (the counters are kept)
+        '''
+        
+        # DICT of key : entry, where each entry is a LIST of
+        # [previous entry, next entry, key, value, size]
+        self.hEntries = {}
+        
+        # Both ends of the LRU list, most recently used first
+        self.aHead = [None, None, None, None, 0]
+        self.aHead[0] = self.aHead
+        self.aHead[1] = self.aHead
+        
+        self.iBytes = 0
+        
+    # end clear()
+    
+    def get(self, tKey):
+        '''
+        Returns the cached result for the key, or None
+        '''
+        
+        aEntry = self.hEntries.get(tKey)
+        if (aEntry == None):
+            self.iMisses = self.iMisses + 1
+            return None
+        # end
+        
+        self.iHits = self.iHits + 1
+        
+        if (self.aHead[1] is not aEntry):
+            self._unlink(aEntry)
+            self._linkFirst(aEntry)
+        # end
+        
+        return aEntry[3]
+        
+    # end get()
+    
+    def getKey(self, sXML, tRequest):
+        '''
+        Returns the key of the results for the XML string and the TUPLE describing the
+        request, or None for XML that can't be cached, (e.g. a memory-mapped file)
+        '''
+        
+        if (type(sXML) not in (type(""), type(u""))):
+            return None
+        # end
+        
+        return (len(sXML), hash(sXML), tRequest)
+        
+    # end getKey()
+    
+    def getSize(self, aValues):
+        '''
+        Returns the size, as checked against iMaxBytes, of a LIST of STRINGS
+        '''
+        
+        iBytes = self.iValueOverhead * len(aValues)
+        for sValue in aValues:
+            iBytes = iBytes + len(sValue)
+        # end
+        
+        return iBytes
+        
+    # end getSize()
+    
+    def getStats(self):
+        '''
+        Returns a DICT of the counters and the current size of the cache
+        '''
+        
+        return {"hits": self.iHits,
+                "misses": self.iMisses,
+                "evictions": self.iEvictions,
+                "entries": len(self.hEntries),
+                "bytes": self.iBytes,
+                "maxEntries": self.iMaxEntries,
+                "maxBytes": self.iMaxBytes}
+        
+    # end getStats()
+    
+    def put(self, tKey, oValue, iBytes):
+        '''
+        Caches a result under the key, evicting the least recently used results
+        to stay within iMaxEntries and iMaxBytes
+        '''
+        
+        if ((tKey == None) | (iBytes > self.iMaxBytes)):
+            return
+        # end
+        
+        aEntry = self.hEntries.get(tKey)
+        if (aEntry != None):
+            self._unlink(aEntry)
+            del self.hEntries[tKey]
+            self.iBytes = self.iBytes - aEntry[4]
+        # end
+        
+        # Evict from the least recently used end
+        aHead = self.aHead
+        while ((len(self.hEntries) > 0) and 
+               ((len(self.hEntries) >= self.iMaxEntries) or (self.iBytes + iBytes > self.iMaxBytes))):
+            aLast = aHead[0]
+            self._unlink(aLast)
+            del self.hEntries[aLast[2]]
+            self.iBytes = self.iBytes - aLast[4]
+            self.iEvictions = self.iEvictions + 1
+        # end
+        
+        if (self.iMaxEntries < 1):
+            return
+        # end
+        
+        aEntry = [None, None, tKey, oValue, iBytes]
+        self._linkFirst(aEntry)
+        self.hEntries[tKey] = aEntry
+        self.iBytes = self.iBytes + iBytes
+        
+    # end put()
+    
+# END class - XMLExtractionCache
+
+
+#=============================================================================#
+#--
+# Class: XMLPath(...)
+#++
+#
+# Description:  A path query, (e.g. "result/records/Id"), compiled once so it can be
+#               run on many XML strings, see compileXMLPath().
+#
+#               Each run is a single pass over the tags of the XML, keeping a stack of the
+#               open tags and of how much of the path they match, so nothing is copied
+#               other than the values found. The steps matched after each tag name are
+#               saved as they are worked out, so later runs on similar XML mostly
+#               look them up.
+#
+#               Path steps:
+#                   'tag_name'  - A tag of that name, with any namespace prefix, e.g. <sf:Id> for 'Id'
+#                   'sf:Id'     - A tag of exactly that name
+#                   '*'         - Any tag
+#               The first step matches a tag at any depth, unless the path starts with
+#               '/', then it only matches the outermost tag. Each step after that matches a
+#               tag directly inside the tag matched by the step before.
+#               Tags with attributes and self-closing tags (value '') are matched.
+#
+#               Values are returned in the order of their Closing tags, like
+#               getMultipleXMLTagValues().
+#
+# Syntax: sPath = STRING - The path, with the steps separated by '/'
+#
+# Usage Examples:
+#                   oIdPath = compileXMLPath("result/records/Id")
+#                   for sXML in aResponses:
+#                       aIds = oIdPath.getValues(sXML)
+#                   # end
+#
+#                   for sId in oIdPath.iterValues(mapXMLFile("results/QueryAccount.xml")):
+#                       print2(sId)
+#                   # end
+#
+#=============================================================================#
+class XMLPath(object):
+    '''
+    A path query on XML tags, compiled once and run in a single pass
+    over each XML string.
+    '''
+    
+    # group(1) = '/' for a Closing tag,  group(2) = tag name,
+    # group(3) = '/' for a self-closing tag
+    # (Comments, <?xml ...?> and <!DOCTYPE ...> do not start with a name character)
+    oTagPattern = re.compile(r"<(/?)([^\s<>/!?][^\s<>/]*)(?:\s[^<>]*?)?(/?)>")
+    
+    def __init__(self, sPath):
+        
+        self.sPath = sPath
+        
+        self.aSteps = []
+        for sStep in sPath.strip().split("/"):
+            if (sStep != ""):
+                self.aSteps.append(removeXMLBrackets(sStep))
+            # end
+        # end
+        
+        if (self.aSteps == []):
+            raise ValueError("XML path has no steps: '" + sPath + "'")
+        # end
+        
+        self.bAnchored = (sPath.strip()[:1] == "/")
+        
+        # The state of a tag is the TUPLE of the numbers of path steps matched by the tag,
+        # the whole path is matched when it holds len(self.aSteps)
+        self.iMatched = len(self.aSteps)
+        
+        # DICT of (state of the enclosing tag, tag name) : state of the tag
+        self.hTransitions = {}
+        
+    # end __init__()
+    
+    def _getState(self, tParentState, sTagName):
+        '''
+        Works out (and saves) the state of a tag from the state of its enclosing tag
+        '''
+        
+        aSteps = self.aSteps
+        sLocalName = sTagName[(sTagName.rfind(":") + 1):]
+        
+        aState = []
+        for iStep in tParentState:
+            if (iStep < self.iMatched):
+                sStep = aSteps[iStep]
+                if ((sStep == "*") or (sStep == sTagName) or 
+                    ((sStep.find(":") == -1) and (sStep == sLocalName))):
+                    aState.append(iStep + 1)
+                # end
+            # end
+        # end
+        
+        # Without a leading '/' the path can start at any tag
+        if (self.bAnchored == False):
+            aState.append(0)
+        # end
+        
+        tState = tuple(aState)
+        self.hTransitions[(tParentState, sTagName)] = tState
+        
+        return tState
+        
+    # end _getState()
+    
+    def getSpans(self, sXML):
+        '''
+        Returns a LIST of (start, end) TUPLES, with the offsets of the values
+        of the tags matching the path
+        '''
+        
+        aSpans = []
+        for tSpan in self.iterSpans(sXML):
+            aSpans.append(tSpan)
+        # end
+        
+        return aSpans
+        
+    # end getSpans()
+    
+    def getValues(self, sXML, bDecode=False):
+        '''
+        Returns a LIST of the values of the tags matching the path,
+        with their entities decoded when bDecode is True
+        '''
+        
+        aValues = []
+        for iValueStart, iValueEnd in self.iterSpans(sXML):
+            aValues.append(sXML[iValueStart:iValueEnd])
+        # end
+        
+        if (bDecode == True):
+            aValues = map(decodeXMLEntities, aValues)
+        # end
+        
+        return aValues
+        
+    # end getValues()
+    
+    def iterSpans(self, sXML):
+        '''
+        Generates the (start, end) offsets of the values of the tags matching the path,
+        as their Closing tags are found
+        '''
+        
+        hTransitions = self.hTransitions
+        iMatched = self.iMatched
+        
+        # The state outside the outermost tag
+        tRootState = (0,)
+        
+        # Each open tag as a (tag name, state, start of its value) TUPLE
+        aOpenTags = []
+        tState = tRootState
+        
+        for oMatch in self.oTagPattern.finditer(sXML):
+            
+            sClosingSlash, sTagName, sSelfClosingSlash = oMatch.groups()
+            
+            if (sClosingSlash):
+                
+                # Close the tag, and any tags inside it left open
+                iOpenTag = len(aOpenTags) - 1
+                while ((iOpenTag >= 0) and (aOpenTags[iOpenTag][0] != sTagName)):
+                    iOpenTag = iOpenTag - 1
+                # end
+                
+                # A Closing tag with no Opening tag is skipped
+                if (iOpenTag >= 0):
+                    sOpenTagName, tOpenState, iValueStart = aOpenTags[iOpenTag]
+                    del aOpenTags[iOpenTag:]
+                    
+                    if (iMatched in tOpenState):
+                        yield (iValueStart, oMatch.start())
+                    # end
+                    
+                    if (iOpenTag > 0):
+                        tState = aOpenTags[-1][1]
+                    else:
+                        tState = tRootState
+                    # end
+                # end
+                
+            else:
+                
+                tTagState = hTransitions.get((tState, sTagName))
+                if (tTagState == None):
+                    tTagState = self._getState(tState, sTagName)
+                # end
+                
+                if (sSelfClosingSlash):
+                    if (iMatched in tTagState):
+                        yield (oMatch.end(), oMatch.end())
+                    # end
+                else:
+                    aOpenTags.append((sTagName, tTagState, oMatch.end()))
+                    tState = tTagState
+                # end
+                
+            # end
+            
+        # end
+        
+    # end iterSpans()
+    
+    def iterValues(self, sXML, bDecode=False):
+        '''
+        Generates the values of the tags matching the path, as their Closing tags are found,
+        with their entities decoded when bDecode is True
+        '''
+        
+        for iValueStart, iValueEnd in self.iterSpans(sXML):
+            if (bDecode == True):
+                yield decodeXMLEntities(sXML[iValueStart:iValueEnd])
+            else:
+                yield sXML[iValueStart:iValueEnd]
+            # end
+        # end
+        
+    # end iterValues()
+    
+# END class - XMLPath
 
 
 #=============================================================================#
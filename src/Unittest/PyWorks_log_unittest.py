@@ -253,6 +253,74 @@ class UnitTest_Log(unittest.TestCase):
         
     # END testcase - test_Log_03_ForcedError
     
+    #===========================================================================#
+    # Testcase method: test_Log_04_print2_cached
+    #
+    # Description: Test the method: init_print2()
+    #                               is_SOATest()
+    #                               print2(...)
+    #
+    #===========================================================================#
+    def test_Log_04_print2_cached(self):
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_Log_04_print2_cached")
+        print2("#######################")
+        
+        import logging
+        import StringIO
+        
+        # Collect the messages logged to the PyWorks logger
+        class ListHandler(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.aRecords = []
+            # end
+            def emit(self, oRecord):
+                self.aRecords.append((oRecord.levelname, oRecord.getMessage()))
+            # end
+        # End
+        
+        oLogger = logging.getLogger("PyWorks")
+        oHandler = ListHandler()
+        iLevel = oLogger.level
+        
+        # The environment is worked out once
+        hLogMethods = init_print2()
+        self.assertEqual(is_SOATest(), False)
+        self.assertEqual(is_SOATest(), False)
+        self.assertEqual(hLogMethods["INFO"], oLogger.info)
+        
+        oStdout = sys.stdout
+        oLogger.addHandler(oHandler)
+        oLogger.setLevel(logging.DEBUG)
+        try:
+            sys.stdout = StringIO.StringIO()
+            
+            print2("Info")
+            print2("Debug", "DEBUG")
+            print2("Warn", "WARN")
+            print2("Warning", "warning")
+            print2("Critical", "CRITICAL")
+            print2("Mystery", "WXYZ")
+            print2("Log only", "INFO", -1)
+            print2("Stdout only", "INFO", 0)
+            self.assertEqual(print2(123), True)
+            
+            sOutput = sys.stdout.getvalue()
+        finally:
+            sys.stdout = oStdout
+            oLogger.removeHandler(oHandler)
+            oLogger.setLevel(iLevel)
+        # end
+        
+        self.assertEqual(sOutput.splitlines(), ["Info", "Debug", "Warn", "Warning", "Critical", "Mystery", "Stdout only", "123"])
+        self.assertEqual(oHandler.aRecords, [("INFO", "Info"), ("DEBUG", "Debug"), ("WARNING", "Warn"), ("WARNING", "Warning"),
+                                             ("CRITICAL", "Critical"), ("ERROR", "Mystery"), ("INFO", "Log only"), ("INFO", "123")])
+        
+    # END testcase - test_Log_04_print2_cached
+    
 # END class - UnitTest_Log
 
 suite = unittest.TestLoader().loadTestsFromTestCase(UnitTest_Log)
@@ -0,0 +1,852 @@
+#!/usr/bin/python
+#--
+#=============================================================================#
+# File: PyWorks_sfdc_unittest.py
+#
+# Description: Unit tests for PyWorks SOAtest/Salesforce.com (SFDC) methods:
+#    disableSfdcIdCache()
+#    disableSfdcMetrics()
+#    enableSfdcIdCache(...)
+#    enableSfdcMetrics(...)
+#    findSfdcObjectId(...)
+#    findSfdcObjectIdsFuzzy(...)
+#    getSfdcAccountIds(...)
+#    getSfdcAllObjectIds(...)
+#    getSfdcQueryState(...)
+#    getSfdcUserIds(...)
+#    isSfdcIdCacheFresh(...)
+#    markSfdcObjectIdsChanged(...)
+#    SfdcIdCache(...)
+#    SfdcIdMultimap(...)
+#    SfdcMetrics(...)
+#    SfdcObjectIndex(...)
+#    SfdcTrigramIndex(...)
+#    sfdc_MergeDictInSoaTestVar(...)
+#    sfdc_StoreDictInSoaTestVar(...)
+#    sfdc_StoreMultimapInSoaTestVar(...)
+#    SoaTestOfflineContext(...)
+#
+#=============================================================================#
+
+#=============================================================================#
+# Import section
+# Entries for additional files or methods needed by this test
+#=============================================================================#
+
+import unittest
+#from datetime import datetime # Add ability to get/format Dates
+
+# PyWorks
+from PyWorks_Utilities import *    # PyWorks General Utilities
+from PyWorks_SoaTest_SfdcUtilities import *    # PyWorks SOAtest/Salesforce Utilities
+#=============================================================================#
+
+#=============================================================================#
+# Global Variables section
+# Set global variables that will be inherited by each of the test files
+#=============================================================================#
+
+# Java global variables
+#
+
+# PyWorks global variables
+#
+sRun_TestType = "ready"
+iRun_TestLevel = 0
+VERBOSE = False
+
+global DICTIONARY
+DICTIONARY = ""
+
+#=============================================================================#
+
+
+#=============================================================================#
+# Class: UnitTest_Sfdc
+#
+#
+# Test Case Methods: setUp, tearDown
+#
+#
+#
+#=============================================================================#
+class UnitTest_Sfdc(unittest.TestCase):
+
+    #===========================================================================#
+    # Method: setUp
+    #
+    # Description: Before every testcase Test::Unit runs setUp
+    #===========================================================================#
+    def setUp(self):
+
+        # Save the Global variable's original settings so that they can be changed in this
+        # test without affecting other test, so long as they are restored by tearDown
+        global VERBOSE_ORIG
+        VERBOSE_ORIG = VERBOSE
+        global DICTIONARY_ORIG
+        DICTIONARY_ORIG = DICTIONARY
+
+        global tTestCase_StartTime
+        tTestCase_StartTime = datetime.now()
+
+    # end of setUp
+
+    #===========================================================================#
+    # Method: tearDown
+    #
+    # Description: After every testcase Test::Unit runs tearDown
+    #===========================================================================#
+    def tearDown(self):
+
+        print2("Testcase finished in " + calc_elapsed_time(tTestCase_StartTime) + " (h:m:s.ms)")
+
+        # Restore the Global variable's original settings
+        VERBOSE = VERBOSE_ORIG
+        DICTIONARY = DICTIONARY_ORIG
+        
+        #print2("tearDown")
+
+    # end of tearDown
+
+    #===========================================================================#
+    # Method: runTest
+    #
+    # Description: The list of tests to run
+    #===========================================================================#
+    def runTest(self):
+        """ List of tests to run """
+        pass
+    # end
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_001_sfdc_StoreDictInSoaTestVar
+    #
+    # Description: Test the methods:
+    #                                sfdc_StoreDictInSoaTestVar(...)
+    #===========================================================================#
+    def test_sfdc_001_sfdc_StoreDictInSoaTestVar(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_001_sfdc_StoreDictInSoaTestVar")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        # The second record has no Name, the partner WSDL repeats the Id in each record
+        sXML = ('<soapenv:Body><queryResponse><result xsi:type="QueryResult"><done>true</done>'
+                '<records xsi:type="sf:sObject"><sf:type>Account</sf:type><sf:Id>001A</sf:Id><sf:Id>001A</sf:Id><sf:Name>Acme</sf:Name></records>'
+                '<records xsi:type="sf:sObject"><sf:type>Account</sf:type><sf:Id>001B</sf:Id><sf:Id>001B</sf:Id></records>'
+                '<records xsi:type="sf:sObject"><sf:type>Account</sf:type><sf:Id>001C</sf:Id><sf:Id>001C</sf:Id><sf:Name>Globex</sf:Name></records>'
+                '<size>3</size></result></queryResponse></soapenv:Body>')
+        
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML})
+        
+        bStatus = sfdc_StoreDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+        hAccountIds = oContext.get("SFDC: AccountIds")
+        
+        print2("Saved DICT: " + str(hAccountIds))
+        
+        self.assertEqual(bStatus, True)
+        self.assertEqual(hAccountIds, {"Acme": "001A", "Globex": "001C"})
+        
+        # XML without records pairs the tags by their order
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "sSoapResponse"): '<result><Id>01</Id><Name>A</Name><Id>02</Id><Name>B</Name></result>'})
+        sfdc_StoreDictInSoaTestVar(oContext, "SFDC Saved Data", "sSoapResponse", "SFDC Saved Data", "hIds", "Id", "Name")
+        self.assertEqual(oContext.get("hIds"), {"01": "A", "02": "B"})
+        
+        # A large query response
+        aRecords = []
+        for iRecord in range(50000):
+            aRecords.append('<records xsi:type="sf:Account"><sf:Id>001%015d</sf:Id><sf:Name>Account %d</sf:Name></records>' % (iRecord, iRecord))
+        # end
+        sXML = '<result>' + "".join(aRecords) + '</result>'
+        
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML})
+        sfdc_StoreDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+        hAccountIds = oContext.get("SFDC: AccountIds")
+        
+        self.assertEqual(len(hAccountIds), 50000)
+        self.assertEqual(hAccountIds["Account 49999"], "001000000000049999")
+        
+    # end test_sfdc_001_sfdc_StoreDictInSoaTestVar()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_002_findSfdcObjectId
+    #
+    # Description: Test the methods:
+    #                                findSfdcObjectId(...)
+    #                                SfdcObjectIndex(...)
+    #===========================================================================#
+    def test_sfdc_002_findSfdcObjectId(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_002_findSfdcObjectId")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        hAccountIds = {"Acme": "001A", "Acme Corporation": "001B", "Globex": "001C", "Initech 42": "001D"}
+        oIndex = SfdcObjectIndex(hAccountIds)
+        
+        self.assertEqual(oIndex.findExact("Acme"), ["Acme", "001A"])
+        self.assertEqual(oIndex.findExact("acme"), ["", ""])
+        self.assertEqual(oIndex.findIgnoreCase("ACME CORPORATION"), ["Acme Corporation", "001B"])
+        self.assertEqual(oIndex.findIgnoreCase("Umbrella"), ["", ""])
+        self.assertEqual(oIndex.findPrefix("glo"), ["", ""])
+        self.assertEqual(oIndex.findPrefix("glo", False), ["Globex", "001C"])
+        self.assertEqual(oIndex.findPattern("Corp(oration)?$"), ["Acme Corporation", "001B"])
+        self.assertEqual(oIndex.findPattern("initech \\d+$", False), ["Initech 42", "001D"])
+        self.assertEqual(oIndex.findPattern("^Umbrella"), ["", ""])
+        
+        # An exact Name wins over the other Names it matches as a regular expression
+        self.assertEqual(oIndex.find("Acme"), ["Acme", "001A"])
+        self.assertEqual(oIndex.find("acme", False), ["Acme", "001A"])
+        self.assertEqual(oIndex.find("lobe"), ["Globex", "001C"])
+        
+        # The index is saved with the DICT
+        sXML = ('<result><records xsi:type="sf:Account"><sf:Id>001A</sf:Id><sf:Name>Acme</sf:Name></records>'
+                '<records xsi:type="sf:Account"><sf:Id>001C</sf:Id><sf:Name>Globex</sf:Name></records></result>')
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML})
+        sfdc_StoreDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+        oIndex = oContext.get("SFDC: AccountIds" + SFDC_INDEX_VARIABLE_SUFFIX)
+        
+        self.assertEqual(oIndex.isIndexOf(oContext.get("SFDC: AccountIds")), True)
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: AccountIds", "GLOBEX", False), ["Globex", "001C"])
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: AccountIds", "GLOBEX"), ["", ""])
+        self.assertEqual(oContext.get("SFDC: AccountIds" + SFDC_INDEX_VARIABLE_SUFFIX) is oIndex, True)
+        
+        # A Name replaced in place, keeping the number of Names, is indexed once the DICT is marked changed
+        hAccountIds = oContext.get("SFDC: AccountIds")
+        del hAccountIds["Globex"]
+        hAccountIds["Initech"] = "001D"
+        markSfdcObjectIdsChanged(oContext, "SFDC: AccountIds")
+        self.assertEqual(oIndex.isIndexOf(hAccountIds), True)
+        self.assertEqual(oIndex.isIndexOf(hAccountIds, 2), False)
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: AccountIds", "INITECH", False), ["Initech", "001D"])
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: AccountIds", "GLOBEX", False), ["", ""])
+        self.assertEqual(oContext.get("SFDC: AccountIds" + SFDC_INDEX_VARIABLE_SUFFIX).isIndexOf(hAccountIds, 2), True)
+        
+        # A DICT saved without an index, then replaced, is indexed when searched
+        oContext.put("SFDC: RoleIds", {"CEO": "00E1"})
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: RoleIds", "ceo", False), ["CEO", "00E1"])
+        oContext.put("SFDC: RoleIds", {"CFO": "00E2"})
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: RoleIds", "cfo", False), ["CFO", "00E2"])
+        
+    # end test_sfdc_002_findSfdcObjectId()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_003_getSfdcAllObjectIds
+    #
+    # Description: Test the methods:
+    #                                getSfdcAccountIds(...)
+    #                                getSfdcAllObjectIds(...)
+    #                                getSfdcUserIds(...)
+    #===========================================================================#
+    def test_sfdc_003_getSfdcAllObjectIds(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_003_getSfdcAllObjectIds")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        # A query response for each Object type, except Lead
+        hDataSourceValues = {}
+        hExpected = {}
+        for sObjectType, sDataSourceName, sReadVariableName, sWriteVariableName, sTagNameKey, sTagNameValue in SFDC_OBJECT_TYPES:
+            if (sObjectType == "Lead"):
+                continue
+            # end
+            
+            aRecords = []
+            hIds = {}
+            for iRecord in range(200):
+                sName = sObjectType + " " + str(iRecord)
+                sId = sObjectType[:3] + "%012d" % iRecord
+                aRecords.append('<records xsi:type="sf:' + sObjectType + '"><' + sTagNameValue + '>' + sId + '</' + sTagNameValue + '>'
+                                + '<' + sTagNameKey + '>' + sName + '</' + sTagNameKey + '></records>')
+                hIds[sName] = sId
+            # end
+            
+            hDataSourceValues[(sDataSourceName, sReadVariableName)] = '<result>' + "".join(aRecords) + '</result>'
+            hExpected[sWriteVariableName] = hIds
+        # end
+        
+        # Each Object type on its own
+        oContext = SoaTestOfflineContext(hDataSourceValues)
+        self.assertEqual(getSfdcAccountIds(None, oContext), True)
+        self.assertEqual(getSfdcUserIds(None, oContext), True)
+        self.assertEqual(oContext.get("SFDC: AccountIds"), hExpected["SFDC: AccountIds"])
+        self.assertEqual(oContext.get("SFDC: UserIds"), hExpected["SFDC: UserIds"])
+        
+        # All of them, the missing Lead response is reported, the others are saved
+        for iThreads in [1, 4]:
+            oContext = SoaTestOfflineContext(hDataSourceValues)
+            bStatus = getSfdcAllObjectIds(None, oContext, None, iThreads)
+            
+            self.assertEqual(bStatus, False)
+            self.assertEqual(oContext.get("SFDC: LeadIds"), None)
+            for sWriteVariableName in hExpected.keys():
+                self.assertEqual(oContext.get(sWriteVariableName), hExpected[sWriteVariableName])
+                self.assertEqual(oContext.get(sWriteVariableName + SFDC_INDEX_VARIABLE_SUFFIX).isIndexOf(oContext.get(sWriteVariableName)), True)
+            # end
+        # end
+        
+        # Only some of them
+        oContext = SoaTestOfflineContext(hDataSourceValues)
+        self.assertEqual(getSfdcAllObjectIds(None, oContext, ["Contact", "Role"]), True)
+        self.assertEqual(oContext.get("SFDC: RoleIds"), hExpected["SFDC: RoleIds"])
+        self.assertEqual(oContext.get("SFDC: AccountIds"), None)
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: ContactIds", "Contact 7"), ["Contact 7", "Con000000000007"])
+        
+        self.assertRaises(ValueError, getSfdcAllObjectIds, None, oContext, ["Widget"])
+        
+    # end test_sfdc_003_getSfdcAllObjectIds()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_004_enableSfdcIdCache
+    #
+    # Description: Test the methods:
+    #                                disableSfdcIdCache()
+    #                                enableSfdcIdCache(...)
+    #                                isSfdcIdCacheFresh(...)
+    #                                SfdcIdCache(...)
+    #===========================================================================#
+    def test_sfdc_004_enableSfdcIdCache(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_004_enableSfdcIdCache")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        import os
+        import tempfile
+        import time
+        
+        sXML = ('<soapenv:Body><queryResponse><result><records xsi:type="sf:Account"><sf:Id>001A</sf:Id><sf:Name>Acme</sf:Name></records>'
+                '<records xsi:type="sf:Account"><sf:Id>001C</sf:Id><sf:Name>Globex</sf:Name></records></result></queryResponse></soapenv:Body>')
+        hDataSourceValues = {("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML}
+        sCacheDir = tempfile.mktemp()
+        
+        self.assertEqual(isSfdcIdCacheFresh("Account"), False)
+        
+        oCache = enableSfdcIdCache(sCacheDir, "00D000000000001")
+        try:
+            self.assertEqual(isSfdcIdCacheFresh("Account"), False)
+            
+            # The first run parses the query response, and saves the DICT
+            oContext = SoaTestOfflineContext(hDataSourceValues)
+            self.assertEqual(getSfdcAllObjectIds(None, oContext, ["Account"]), True)
+            self.assertEqual(isSfdcIdCacheFresh("Account"), True)
+            self.assertEqual(os.path.exists(oCache.getPath("Account")), True)
+            
+            # A later run loads it, without reading the query response
+            oContext = SoaTestOfflineContext({})
+            self.assertEqual(getSfdcAccountIds(None, oContext), True)
+            self.assertEqual(oContext.get("SFDC: AccountIds"), {"Acme": "001A", "Globex": "001C"})
+            self.assertEqual(findSfdcObjectId(oContext, "SFDC: AccountIds", "globex", False), ["Globex", "001C"])
+            
+            # Another Org does not share it
+            self.assertEqual(SfdcIdCache(sCacheDir, "00D000000000002").getIds("Account"), None)
+            
+            # Once stale, the same query response reuses it, and makes it fresh again
+            fOld = time.time() - 2 * SFDC_ID_CACHE_TTL
+            os.utime(oCache.getPath("Account"), (fOld, fOld))
+            self.assertEqual(isSfdcIdCacheFresh("Account"), False)
+            self.assertEqual(oCache.getIds("Account"), None)
+            self.assertEqual(oCache.getIds("Account", sXML), {"Acme": "001A", "Globex": "001C"})
+            self.assertEqual(isSfdcIdCacheFresh("Account"), True)
+            
+            # A changed query response is parsed again
+            os.utime(oCache.getPath("Account"), (fOld, fOld))
+            sXML = sXML.replace("Globex", "Initech")
+            oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML})
+            self.assertEqual(oCache.getIds("Account", sXML), None)
+            getSfdcAccountIds(None, oContext)
+            self.assertEqual(oContext.get("SFDC: AccountIds"), {"Acme": "001A", "Initech": "001C"})
+            self.assertEqual(oCache.getIds("Account"), {"Acme": "001A", "Initech": "001C"})
+            
+            # A SOAP Fault, or a response without records, is not saved, and its Ids are not used later
+            oCache.remove("Account")
+            sFaultXML = ('<soapenv:Body><soapenv:Fault><faultcode>sf:INVALID_SESSION_ID</faultcode>'
+                         '<faultstring>INVALID_SESSION_ID: Invalid Session ID</faultstring></soapenv:Fault></soapenv:Body>')
+            for sBadXML in [sFaultXML, '<soapenv:Body><queryResponse><result><done>true</done><size>0</size></result></queryResponse></soapenv:Body>']:
+                oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sBadXML})
+                self.assertEqual(getSfdcAccountIds(None, oContext), False)
+                self.assertEqual(getSfdcAllObjectIds(None, oContext, ["Account"]), False)
+                self.assertEqual(isSfdcIdCacheFresh("Account"), False)
+                self.assertEqual(os.path.exists(oCache.getPath("Account")), False)
+            # end
+            
+            oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML})
+            self.assertEqual(getSfdcAccountIds(None, oContext), True)
+            self.assertEqual(oContext.get("SFDC: AccountIds"), {"Acme": "001A", "Initech": "001C"})
+            self.assertEqual(isSfdcIdCacheFresh("Account"), True)
+            
+            # A damaged file is ignored
+            oFile = open(oCache.getPath("Account"), "wb")
+            oFile.write("not a pickle")
+            oFile.close()
+            self.assertEqual(oCache.getIds("Account"), None)
+            
+            oCache.remove("Account")
+            self.assertEqual(os.path.exists(oCache.getPath("Account")), False)
+            
+        finally:
+            disableSfdcIdCache()
+            for sFileName in os.listdir(sCacheDir):
+                os.remove(os.path.join(sCacheDir, sFileName))
+            # end
+            os.rmdir(sCacheDir)
+        # end
+        
+        self.assertEqual(isSfdcIdCacheFresh("Account"), False)
+        
+    # end test_sfdc_004_enableSfdcIdCache()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_005_sfdc_MergeDictInSoaTestVar
+    #
+    # Description: Test the methods:
+    #                                getSfdcQueryState(...)
+    #                                sfdc_MergeDictInSoaTestVar(...)
+    #===========================================================================#
+    def test_sfdc_005_sfdc_MergeDictInSoaTestVar(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_005_sfdc_MergeDictInSoaTestVar")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        # Three batches of 1000 records, from query() and then queryMore()
+        aBatches = []
+        for iBatch in range(3):
+            if (iBatch == 0):
+                sResponse = "queryResponse"
+            else:
+                sResponse = "queryMoreResponse"
+            # end
+            
+            if (iBatch == 2):
+                sState = '<done>true</done><queryLocator xsi:nil="true"/>'
+            else:
+                sState = '<done>false</done><queryLocator>01gD0000002HU6KIAW-' + str((iBatch + 1) * 1000) + '</queryLocator>'
+            # end
+            
+            aRecords = []
+            for iRecord in range(iBatch * 1000, (iBatch + 1) * 1000):
+                aRecords.append('<records xsi:type="sf:Account"><sf:Id>001%015d</sf:Id><sf:Name>Account %d</sf:Name></records>' % (iRecord, iRecord))
+            # end
+            
+            aBatches.append('<soapenv:Body><' + sResponse + '><result xsi:type="QueryResult">' + sState
+                            + "".join(aRecords) + '<size>3000</size></result></' + sResponse + '></soapenv:Body>')
+        # end
+        
+        oContext = SoaTestOfflineContext({})
+        self.assertEqual(getSfdcQueryState(oContext, "SFDC: AccountIds"), None)
+        
+        for iBatch in range(3):
+            oContext.setValue("SFDC Saved Data", "SFDC: QueryAccount_XML", aBatches[iBatch])
+            bStatus = sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+            hState = getSfdcQueryState(oContext, "SFDC: AccountIds")
+            
+            print2("Query state: " + str(hState))
+            
+            self.assertEqual(bStatus, True)
+            self.assertEqual(len(oContext.get("SFDC: AccountIds")), (iBatch + 1) * 1000)
+            self.assertEqual(hState["batches"], iBatch + 1)
+            self.assertEqual(hState["records"], (iBatch + 1) * 1000)
+        # end
+        
+        self.assertEqual(hState["done"], True)
+        self.assertEqual(hState["queryLocator"], "")
+        self.assertEqual(oContext.get("SFDC: AccountIds")["Account 2999"], "001000000000002999")
+        self.assertEqual(oContext.get("SFDC: AccountIds" + SFDC_INDEX_VARIABLE_SUFFIX).isIndexOf(oContext.get("SFDC: AccountIds")), True)
+        
+        # A new query() starts a new DICT
+        oContext.setValue("SFDC Saved Data", "SFDC: QueryAccount_XML", aBatches[0])
+        sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+        hState = getSfdcQueryState(oContext, "SFDC: AccountIds")
+        
+        self.assertEqual(len(oContext.get("SFDC: AccountIds")), 1000)
+        self.assertEqual(hState["done"], False)
+        self.assertEqual(hState["queryLocator"], "01gD0000002HU6KIAW-1000")
+        self.assertEqual(hState["batches"], 1)
+        
+        # Batches without a SOAP Body tag follow the saved state
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "sBatch"): '<result><done>false</done><queryLocator>L1</queryLocator><records><Id>01</Id><Name>A</Name></records></result>'})
+        sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "sBatch", "SFDC Saved Data", "hIds")
+        oContext.setValue("SFDC Saved Data", "sBatch", '<result><done>true</done><records><Id>02</Id><Name>B</Name></records></result>')
+        sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "sBatch", "SFDC Saved Data", "hIds")
+        
+        self.assertEqual(oContext.get("hIds"), {"01": "A", "02": "B"})
+        self.assertEqual(getSfdcQueryState(oContext, "hIds")["done"], True)
+        
+        sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "sBatch", "SFDC Saved Data", "hIds")
+        self.assertEqual(oContext.get("hIds"), {"02": "B"})
+        
+    # end test_sfdc_005_sfdc_MergeDictInSoaTestVar()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_006_sfdc_StoreMultimapInSoaTestVar
+    #
+    # Description: Test the methods:
+    #                                SfdcIdMultimap(...)
+    #                                sfdc_StoreMultimapInSoaTestVar(...)
+    #===========================================================================#
+    def test_sfdc_006_sfdc_StoreMultimapInSoaTestVar(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_006_sfdc_StoreMultimapInSoaTestVar")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        # Two Contacts share a Name, one record has no Name
+        sXML = ('<result><records xsi:type="sf:Contact"><sf:Id>003A</sf:Id><sf:Name>John Smith</sf:Name></records>'
+                '<records xsi:type="sf:Contact"><sf:Id>003B</sf:Id><sf:Name>Jane Doe</sf:Name></records>'
+                '<records xsi:type="sf:Contact"><sf:Id>003C</sf:Id></records>'
+                '<records xsi:type="sf:Contact"><sf:Id>003D</sf:Id><sf:Name>John Smith</sf:Name></records></result>')
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryContact_XML"): sXML})
+        
+        bStatus = sfdc_StoreMultimapInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryContact_XML", "SFDC Saved Data", "SFDC: ContactIds", "sf:Name", "sf:Id")
+        oContactIds = oContext.get("SFDC: ContactIds")
+        
+        self.assertEqual(bStatus, True)
+        self.assertEqual(len(oContactIds), 2)
+        self.assertEqual(oContactIds.getIdCount(), 3)
+        self.assertEqual(oContactIds.getIds("John Smith"), ["003A", "003D"])
+        self.assertEqual(oContactIds.getIds("Jane Doe"), ["003B"])
+        self.assertEqual(oContactIds.getIds("Nobody"), [])
+        self.assertEqual(oContactIds["John Smith"], "003A")
+        self.assertEqual(oContactIds.get("Nobody"), None)
+        self.assertEqual(oContactIds.getName("003D"), "John Smith")
+        self.assertEqual(oContactIds.getName("003C"), None)
+        self.assertEqual("Jane Doe" in oContactIds, True)
+        self.assertRaises(KeyError, oContactIds.__getitem__, "Nobody")
+        
+        hItems = {}
+        for sName, sId in oContactIds.iteritems():
+            hItems[sName] = sId
+        # end
+        self.assertEqual(hItems, {"John Smith": "003A", "Jane Doe": "003B"})
+        
+        # Adding an Id again is ignored
+        self.assertEqual(oContactIds.add("John Smith", "003D"), False)
+        self.assertEqual(oContactIds.getIds("John Smith"), ["003A", "003D"])
+        self.assertEqual(oContactIds.getIdCount(), 3)
+        
+        # An Id added under a second Name is moved from the first one
+        self.assertEqual(oContactIds.add("Johnny Smith", "003D"), True)
+        self.assertEqual(oContactIds.getIds("John Smith"), ["003A"])
+        self.assertEqual(oContactIds.getIds("Johnny Smith"), ["003D"])
+        self.assertEqual(oContactIds.getName("003D"), "Johnny Smith")
+        self.assertEqual(oContactIds.getIdCount(), 3)
+        self.assertEqual(oContactIds.add("Janet Doe", "003B"), True)
+        self.assertEqual("Jane Doe" in oContactIds, False)
+        self.assertEqual(len(oContactIds), 3)
+        
+        # The reverse index is built again after compact()
+        oContactIds.compact()
+        self.assertEqual(oContactIds.getName("003B"), "Janet Doe")
+        
+        # findSfdcObjectId searches it like a DICT, no index is saved for an exact Name
+        self.assertEqual(oContext.get("SFDC: ContactIds_Index"), None)
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: ContactIds", "John Smith"), ["John Smith", "003A"])
+        self.assertEqual(oContext.get("SFDC: ContactIds_Index"), None)
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: ContactIds", "john smith", False), ["John Smith", "003A"])
+        self.assertEqual(findSfdcObjectId(oContext, "SFDC: ContactIds", "Doe$"), ["Janet Doe", "003B"])
+        
+    # end test_sfdc_006_sfdc_StoreMultimapInSoaTestVar()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_007_findSfdcObjectIdsFuzzy
+    #
+    # Description: Test the methods:
+    #                                findSfdcObjectIdsFuzzy(...)
+    #                                markSfdcObjectIdsChanged(...)
+    #                                SfdcTrigramIndex(...)
+    #===========================================================================#
+    def test_sfdc_007_findSfdcObjectIdsFuzzy(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_007_findSfdcObjectIdsFuzzy")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        hAccountIds = {"Acme": "001A", "Acme Corporation": "001B", "Globex": "001C", "Initech": "001D"}
+        oIndex = SfdcTrigramIndex(hAccountIds)
+        
+        aMatches = oIndex.find("acme corp", 2)
+        print2("Closest to 'acme corp': " + str(aMatches))
+        self.assertEqual(len(aMatches), 2)
+        self.assertEqual(aMatches[0][:2], ["Acme Corporation", "001B"])
+        self.assertEqual(aMatches[1][:2], ["Acme", "001A"])
+        self.assertEqual(aMatches[0][2] > aMatches[1][2], True)
+        
+        self.assertEqual(oIndex.find("Glbex", 1)[0][:2], ["Globex", "001C"])
+        self.assertEqual(oIndex.find("INITECH", 1), [["Initech", "001D", 1.0]])
+        self.assertEqual(oIndex.find("Zzyzx"), [])
+        self.assertEqual(oIndex.find(""), [])
+        
+        # A large DICT
+        hIds = {}
+        for iRecord in range(20000):
+            hIds["Account %d" % iRecord] = "001%015d" % iRecord
+        # end
+        hIds["Umbrella Corporation"] = "001U"
+        oIndex = SfdcTrigramIndex(hIds)
+        self.assertEqual(oIndex.find("Umbrela Corp", 1)[0][:2], ["Umbrella Corporation", "001U"])
+        self.assertEqual(oIndex.find("Acount 12345", 1)[0][:2], ["Account 12345", "001000000000012345"])
+        
+        # The index is saved, and grows with the batches merged into the DICT
+        sBatch = ('<soapenv:Body><queryResponse><result><done>false</done><queryLocator>L1</queryLocator>'
+                  '<records><sf:Id>001A</sf:Id><sf:Name>Acme</sf:Name></records></result></queryResponse></soapenv:Body>')
+        oContext = SoaTestOfflineContext({("SFDC Saved Data", "SFDC: QueryAccount_XML"): sBatch})
+        sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+        
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Globex"), [])
+        oIndex = oContext.get("SFDC: AccountIds" + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX)
+        
+        sBatch = ('<soapenv:Body><queryMoreResponse><result><done>true</done>'
+                  '<records><sf:Id>001C</sf:Id><sf:Name>Globex</sf:Name></records></result></queryMoreResponse></soapenv:Body>')
+        oContext.setValue("SFDC Saved Data", "SFDC: QueryAccount_XML", sBatch)
+        sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "SFDC: AccountIds", "sf:Name", "sf:Id")
+        
+        self.assertEqual(oIndex.aNames, ["Acme", "Globex"])
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Globex", 1), [["Globex", "001C", 1.0]])
+        self.assertEqual(oContext.get("SFDC: AccountIds" + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX) is oIndex, True)
+        
+        # Names added to the DICT some other way are indexed by the next search
+        oContext.get("SFDC: AccountIds")["Initech"] = "001D"
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Inytech", 1)[0][:2], ["Initech", "001D"])
+        self.assertEqual(oIndex.update(), False)
+        
+        # A Name replaced in place, keeping the number of Names, is indexed once the DICT is marked changed
+        hAccountIds = oContext.get("SFDC: AccountIds")
+        del hAccountIds["Acme"]
+        hAccountIds["Hooli"] = "001H"
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Hooli", 1), [])
+        iVersion = markSfdcObjectIdsChanged(oContext, "SFDC: AccountIds")
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Hooli", 1), [["Hooli", "001H", 1.0]])
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Acme", 1), [])
+        self.assertEqual(oIndex.aNames, ["Acme", "Globex", "Initech", "Hooli"])
+        self.assertEqual(oIndex.update(iVersion), False)
+        self.assertEqual(oContext.get("SFDC: AccountIds" + SFDC_TRIGRAM_INDEX_VARIABLE_SUFFIX) is oIndex, True)
+        
+        # A replaced DICT is indexed again
+        oContext.put("SFDC: AccountIds", {"Massive Dynamic": "001M"})
+        self.assertEqual(findSfdcObjectIdsFuzzy(oContext, "SFDC: AccountIds", "Massive", 1)[0][:2], ["Massive Dynamic", "001M"])
+        
+    # end test_sfdc_007_findSfdcObjectIdsFuzzy()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_sfdc_008_enableSfdcMetrics
+    #
+    # Description: Test the methods:
+    #                                disableSfdcMetrics()
+    #                                enableSfdcMetrics(...)
+    #                                SfdcMetrics(...)
+    #===========================================================================#
+    def test_sfdc_008_enableSfdcMetrics(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_sfdc_008_enableSfdcMetrics")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        import os
+        import tempfile
+        
+        sXML = ('<soapenv:Body><queryResponse><result><records xsi:type="sf:Account"><sf:Id>001A</sf:Id><sf:Name>Acme</sf:Name></records>'
+                '<records xsi:type="sf:Account"><sf:Id>001C</sf:Id><sf:Name>Globex</sf:Name></records></result></queryResponse></soapenv:Body>')
+        sUserXML = sXML.replace("sf:Name", "sf:Username")
+        hDataSourceValues = {("SFDC Saved Data", "SFDC: QueryAccount_XML"): sXML,
+                             ("SFDC Saved Data", "SFDC: QueryUser_XML"): sUserXML}
+        sFilePath = tempfile.mktemp()
+        sCacheDir = tempfile.mktemp()
+        
+        # Nothing is recorded while the metrics are disabled
+        oContext = SoaTestOfflineContext(hDataSourceValues)
+        getSfdcAccountIds(None, oContext)
+        self.assertEqual(oContext.get(SFDC_METRICS_VARIABLE_NAME), None)
+        
+        oMetrics = enableSfdcMetrics(sFilePath)
+        try:
+            getSfdcAccountIds(None, oContext)
+            getSfdcAllObjectIds(None, oContext, ["Account", "User"], 1)
+            sfdc_StoreDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "hIds", "sf:Name", "sf:Id")
+            sfdc_StoreMultimapInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "oIds", "sf:Name", "sf:Id")
+            sfdc_MergeDictInSoaTestVar(oContext, "SFDC Saved Data", "SFDC: QueryAccount_XML", "SFDC Saved Data", "hMergedIds", "sf:Name", "sf:Id")
+        finally:
+            disableSfdcMetrics()
+        # end
+        
+        try:
+            aMetrics = oContext.get(SFDC_METRICS_VARIABLE_NAME)
+            for hMetric in aMetrics:
+                print2(str(hMetric))
+            # end
+            
+            aFunctions = []
+            for hMetric in aMetrics:
+                aFunctions.append(hMetric["function"] + ":" + hMetric["variable"])
+                if (hMetric["variable"] == "SFDC: UserIds"):
+                    self.assertEqual(hMetric["bytes"], len(sUserXML))
+                else:
+                    self.assertEqual(hMetric["bytes"], len(sXML))
+                # end
+                self.assertEqual(hMetric["records"], 2)
+                self.assertEqual(hMetric["cached"], False)
+                self.assertEqual(hMetric["parseSeconds"] >= 0.0, True)
+                self.assertEqual(hMetric["storeSeconds"] >= 0.0, True)
+            # end
+            self.assertEqual(aFunctions, ["getSfdcAccountIds:SFDC: AccountIds", "getSfdcAllObjectIds:SFDC: AccountIds",
+                                          "getSfdcAllObjectIds:SFDC: UserIds", "sfdc_StoreDictInSoaTestVar:hIds",
+                                          "sfdc_StoreMultimapInSoaTestVar:oIds", "sfdc_MergeDictInSoaTestVar:hMergedIds"])
+            self.assertEqual(oMetrics.aMetrics, aMetrics)
+            
+            # The file has a header, and a tab separated line per call
+            aLines = open(sFilePath).read().splitlines()
+            self.assertEqual(aLines[0], "# " + "\t".join(SfdcMetrics.aFields))
+            self.assertEqual(len(aLines), 7)
+            self.assertEqual(aLines[1].split("\t")[1:5], ["getSfdcAccountIds", "SFDC: AccountIds", str(len(sXML)), "2"])
+            
+            # Budgets
+            self.assertEqual(oMetrics.getOverBudget(), [])
+            self.assertEqual(oMetrics.getOverBudget(3600.0, len(sUserXML)), [])
+            self.assertEqual(len(oMetrics.getOverBudget(iMaxBytes=len(sXML))), 1)
+            self.assertEqual(len(oMetrics.getOverBudget(iMaxBytes=len(sXML) - 1)), 6)
+            self.assertEqual(len(oMetrics.getOverBudget(fMaxSeconds=-1.0)), 6)
+            
+            # Nothing more is recorded once the metrics are disabled
+            getSfdcAccountIds(None, oContext)
+            self.assertEqual(len(oContext.get(SFDC_METRICS_VARIABLE_NAME)), 6)
+            
+            # A DICT loaded from a fresh SfdcIdCache has no query response
+            oMetrics = enableSfdcMetrics(None, None)
+            enableSfdcIdCache(sCacheDir, "00D000000000001")
+            try:
+                getSfdcAccountIds(None, oContext)
+                getSfdcAccountIds(None, oContext)
+            finally:
+                disableSfdcIdCache()
+                disableSfdcMetrics()
+            # end
+            
+            self.assertEqual(len(oContext.get(SFDC_METRICS_VARIABLE_NAME)), 6)
+            self.assertEqual(oMetrics.aMetrics[0]["cached"], False)
+            self.assertEqual(oMetrics.aMetrics[1]["cached"], True)
+            self.assertEqual(oMetrics.aMetrics[1]["bytes"], 0)
+            self.assertEqual(oMetrics.aMetrics[1]["records"], 2)
+            
+            # A stale DICT reused because the query response has not changed is from the cache too
+            oMetrics = enableSfdcMetrics(None, None)
+            enableSfdcIdCache(sCacheDir, "00D000000000001", -1)
+            try:
+                getSfdcAccountIds(None, oContext)
+                getSfdcAllObjectIds(None, oContext, ["Account"], 1)
+            finally:
+                disableSfdcIdCache()
+            # end
+            
+            # An empty query response is parsed, and not from the cache
+            oContext.setValue("SFDC Saved Data", "SFDC: QueryAccount_XML", "")
+            try:
+                getSfdcAccountIds(None, oContext)
+                getSfdcAllObjectIds(None, oContext, ["Account"], 1)
+            finally:
+                disableSfdcMetrics()
+            # end
+            
+            aCached = []
+            for hMetric in oMetrics.aMetrics:
+                aCached.append((hMetric["function"], hMetric["bytes"], hMetric["records"], hMetric["cached"]))
+            # end
+            self.assertEqual(aCached, [("getSfdcAccountIds", len(sXML), 2, True), ("getSfdcAllObjectIds", len(sXML), 2, True),
+                                       ("getSfdcAccountIds", 0, 0, False), ("getSfdcAllObjectIds", 0, 0, False)])
+        finally:
+            os.remove(sFilePath)
+            
+            if (os.path.exists(sCacheDir)):
+                for sFileName in os.listdir(sCacheDir):
+                    os.remove(os.path.join(sCacheDir, sFileName))
+                # end
+                os.rmdir(sCacheDir)
+            # end
+        # end
+        
+    # end test_sfdc_008_enableSfdcMetrics()
+    
+# End of class - UnitTest_Sfdc
+
+suite = unittest.TestLoader().loadTestsFromTestCase(UnitTest_Sfdc)
+unittest.TextTestRunner(verbosity=2).run(suite)
@@ -4,10 +4,39 @@
 # File: PyWorks_xml_unittest.py
 #
 # Description: Unit tests for PyWorks WebUtilities methods:
+#    areTagsInXML(...)
+#    buildXML(...)
+#    buildXMLRecords(...)
+#    compileXMLPath(...)
+#    countXMLTags(...)
+#    countXMLTagsForTags(...)
 #    createXMLTags(...)
+#    decodeXMLEntities(...)
+#    diffXML(...)
+#    diffXMLFiles(...)
+#    disableXMLCache()
+#    enableXMLCache(...)
+#    escapeXMLValue(...)
+#    getMultipleXMLTagSpans(...)
+#    getMultipleXMLTagValues(...)
+#    getMultipleXMLTagValuesBatch(...)
+#    getMultipleXMLTagValuesForTags(...)
+#    getMultipleXMLTagValuesFromFile(...)
+#    getXMLCacheStats()
+#    getXMLPathValues(...)
 #    getXMLTagValue(...)
 #    isTagInXML(..)
+#    iterXMLRecords(...)
+#    iterXMLTagValues(...)
+#    iterXMLTagValuesForTags(...)
+#    mapXMLFile(...)
 #    removeXMLBrackets(...)
+#    unmapXMLFile(...)
+#    writeXML(...)
+#    writeXMLRecords(...)
+#    XMLDocument(...)
+#    XMLExtractionCache(...)
+#    XMLPath(...)
 #
 #=============================================================================#
 
@@ -227,6 +256,805 @@ class UnitTest_WebUtilities(unittest.TestCase):
 
     # end test_xml_003_getMultipleXMLTagValues()(...)
     
+    #===========================================================================#
+    # Testcase method: test_xml_004_getMultipleXMLTagValues_large
+    #
+    # Description: Test the methods:
+    #                                getMultipleXMLTagValues(...)
+    #              against an SFDC style query response with many records
+    #===========================================================================#
+    def test_xml_004_getMultipleXMLTagValues_large(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_004_getMultipleXMLTagValues_large")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        iRecordCount = 20000
+        
+        # Build a query response with iRecordCount records
+        aRecords = []
+        for iRecord in range(iRecordCount):
+            aRecords.append('<records xsi:type="sf:Account"><sf:Id>001A%010d</sf:Id><sf:Name>Account %d</sf:Name></records>' % (iRecord, iRecord))
+        # end
+        sXML = '<soapenv:Body><queryResponse><result>' + "".join(aRecords) + '</result></queryResponse></soapenv:Body>'
+        
+        tStartTime = datetime.now()
+        aIds = getMultipleXMLTagValues(sXML, "sf:Id")
+        print2("Parsed " + str(len(aIds)) + " Ids from " + str(len(sXML)) + " characters in " + calc_elapsed_time(tStartTime) + " (h:m:s.ms)")
+        
+        self.assertEqual(len(aIds), iRecordCount)
+        self.assertEqual(aIds[0], "001A0000000000")
+        self.assertEqual(aIds[-1], "001A%010d" % (iRecordCount - 1))
+        
+        # A Closing tag without an Opening tag still yields ''
+        sXML = '<a>1</a></a><a>2</a><b></a>'
+        aValues = getMultipleXMLTagValues(sXML, "a")
+        print2("Value of XML Tag 'a' in XML = '" + str(aValues) + "'")
+        self.assertEqual(aValues, ['1', '', '2', ''])
+        
+    # end test_xml_004_getMultipleXMLTagValues_large()
+    
+    #===========================================================================#
+    # Testcase method: test_xml_005_getMultipleXMLTagValuesForTags
+    #
+    # Description: Test the methods:
+    #                                getMultipleXMLTagValuesForTags(...)
+    #===========================================================================#
+    def test_xml_005_getMultipleXMLTagValuesForTags(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_005_getMultipleXMLTagValuesForTags")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sXML = '<soapenv:Body><getUserInfoResponse><result><userName><FirstName>Bob</FirstName><userId>01</userId></userName><userName><FirstName>Tom</FirstName><userId>02</userId></userName></a_null_tag></result></getUserInfoResponse></soapenv:Body>'
+        
+        aTags = ["bogus_tag", "<bogus_tag>","</bogus_tag>","userName", "<userName>", "</userName>", "FirstName", "userId", "userEmail", "a_null_tag", "result"]
+        
+        hXMLTagValues = getMultipleXMLTagValuesForTags(sXML, aTags)
+        
+        for sTag in aTags:
+            
+            print2("Values of XML Tag '" + sTag + "' in XML = '" + str(hXMLTagValues[sTag]) + "'")
+            
+            # Must match the values found by scanning for each tag separately
+            self.assertEqual(hXMLTagValues[sTag], getMultipleXMLTagValues(sXML, sTag))
+        # end
+        
+    # end test_xml_005_getMultipleXMLTagValuesForTags()
+    
+    #===========================================================================#
+    # Testcase method: test_xml_006_iterXMLRecords
+    #
+    # Description: Test the methods:
+    #                                iterXMLRecords(...)
+    #===========================================================================#
+    def test_xml_006_iterXMLRecords(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_006_iterXMLRecords")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        # The second record has no Name, the third one holds a nested sub-query record
+        sXML = '<queryResponse><result><records xsi:type="sf:Contact"><sf:Id>003A01</sf:Id><sf:Name>Bob</sf:Name></records><records xsi:type="sf:Contact"><sf:Id>003A02</sf:Id></records><records xsi:type="sf:Contact"><sf:Id>003A03</sf:Id><sf:Cases><records xsi:type="sf:Case"><sf:Id>500A01</sf:Id></records></sf:Cases><sf:Name>Tom</sf:Name></records></result></queryResponse>'
+        
+        aRows = []
+        for tRow in iterXMLRecords(sXML, "records", ["sf:Name", "sf:Id"]):
+            print2("Record = " + str(tRow))
+            aRows.append(tRow)
+        # end
+        
+        self.assertEqual(aRows, [("Bob", "003A01"), (None, "003A02"), ("Tom", "003A03")])
+        
+        # The Id and Name of a nested Owner element, before the record's own tags, are skipped
+        sXML = ('<result><records xsi:type="sf:Account"><sf:Owner xsi:type="sf:User"><sf:Id>005A01</sf:Id><sf:Name>Ann</sf:Name></sf:Owner>'
+                '<sf:Id>001A01</sf:Id><sf:Name>Acme</sf:Name></records>'
+                '<records xsi:type="sf:Account"><sf:Owner xsi:type="sf:User"><sf:Id>005A02</sf:Id></sf:Owner><sf:Id>001A02</sf:Id></records></result>')
+        aRows = list(iterXMLRecords(sXML, "records", ["sf:Name", "sf:Id"]))
+        print2("Records with an Owner = " + str(aRows))
+        self.assertEqual(aRows, [("Acme", "001A01"), (None, "001A02")])
+        
+        # No records in the XML
+        aRows = list(iterXMLRecords(sXML, "<bogus_tag>", ["sf:Name", "sf:Id"]))
+        print2("Records for 'bogus_tag' = " + str(aRows))
+        self.assertEqual(aRows, [])
+        
+    # end test_xml_006_iterXMLRecords()
+    
+    #===========================================================================#
+    # Testcase method: test_xml_007_XMLDocument
+    #
+    # Description: Test the class:
+    #                                XMLDocument(...)
+    #===========================================================================#
+    def test_xml_007_XMLDocument(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_007_XMLDocument")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sXML = '<soapenv:Body><getUserInfoResponse><result><userName><FirstName>Bob</FirstName><userId>01</userId></userName><userName><FirstName>Tom</FirstName><userId>02</userId></userName></a_null_tag></result></getUserInfoResponse></soapenv:Body>'
+        
+        oDocument = XMLDocument(sXML)
+        
+        print2("Tag names in XML = " + str(oDocument.getXMLTagNames()))
+        
+        aTags = ["bogus_tag", "<bogus_tag>","</bogus_tag>","userName", "<userName>", "</userName>", "FirstName", "userId", "userEmail", "a_null_tag", "result"]
+        
+        for sTag in aTags:
+            
+            print2("XML Tag '" + sTag + "': exists = " + str(oDocument.isTagInXML(sTag)) + ", count = " + str(oDocument.countXMLTags(sTag)) + ", values = " + str(oDocument.getMultipleXMLTagValues(sTag)))
+            
+            # Must match the functions that scan the XML string
+            self.assertEqual(oDocument.isTagInXML(sTag), isTagInXML(sXML, sTag))
+            self.assertEqual(oDocument.getXMLTagValue(sTag), getXMLTagValue(sXML, sTag))
+            self.assertEqual(oDocument.getMultipleXMLTagValues(sTag), getMultipleXMLTagValues(sXML, sTag))
+        # end
+        
+    # end test_xml_007_XMLDocument()
+    
+    #===========================================================================#
+    # Testcase method: test_xml_008_iterXMLTagValues
+    #
+    # Description: Test the methods:
+    #                                iterXMLTagValues(...)
+    #                                iterXMLTagValuesForTags(...)
+    #===========================================================================#
+    def test_xml_008_iterXMLTagValues(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_008_iterXMLTagValues")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        from StringIO import StringIO
+        
+        sXML = '<soapenv:Body><getUserInfoResponse><result><userName><FirstName>Bob</FirstName><userId>01</userId></userName><userName><FirstName>Tom</FirstName><userId>02</userId></userName></a_null_tag></result></getUserInfoResponse></soapenv:Body>'
+        
+        aTags = ["userName", "FirstName", "userId", "userEmail", "a_null_tag", "result"]
+        
+        # Feed the XML in small chunks, so that most tags straddle two chunks
+        for iChunkSize in [1, 3, 7, 1000]:
+            
+            aChunks = []
+            for iOffset in range(0, len(sXML), iChunkSize):
+                aChunks.append(sXML[iOffset:(iOffset + iChunkSize)])
+            # end
+            
+            for sTag in aTags:
+                
+                aValues = list(iterXMLTagValues(aChunks, sTag))
+                self.assertEqual(aValues, getMultipleXMLTagValues(sXML, sTag))
+                
+                # Same values when reading from a file object
+                aValues = list(iterXMLTagValues(StringIO(sXML), sTag, iChunkSize))
+                self.assertEqual(aValues, getMultipleXMLTagValues(sXML, sTag))
+            # end
+            
+            aFound = list(iterXMLTagValuesForTags(aChunks, aTags))
+            print2("Chunk size " + str(iChunkSize) + ", values found = " + str(aFound))
+            for sTag in aTags:
+                aValues = []
+                for sTagName, sValue in aFound:
+                    if (sTagName == sTag):
+                        aValues.append(sValue)
+                    # end
+                # end
+                self.assertEqual(aValues, getMultipleXMLTagValues(sXML, sTag))
+            # end
+            
+        # end
+        
+    # end test_xml_008_iterXMLTagValues()
+    
+    #===========================================================================#
+    # Testcase method: test_xml_009_getMultipleXMLTagValuesFromFile
+    #
+    # Description: Test the methods:
+    #                                getMultipleXMLTagSpans(...)
+    #                                getMultipleXMLTagValuesFromFile(...)
+    #                                mapXMLFile(...)
+    #                                unmapXMLFile(...)
+    #===========================================================================#
+    def test_xml_009_getMultipleXMLTagValuesFromFile(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_009_getMultipleXMLTagValuesFromFile")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        import tempfile
+        
+        sXML = '<soapenv:Body><getUserInfoResponse><result><userName><FirstName>Bob</FirstName><userId>01</userId></userName><userName><FirstName>Tom</FirstName><userId>02</userId></userName></a_null_tag></result></getUserInfoResponse></soapenv:Body>'
+        
+        # Save the XML into a file
+        sFilePath = tempfile.mktemp(".xml")
+        oFileObject = open(sFilePath, 'wb')
+        oFileObject.write(sXML)
+        oFileObject.close()
+        
+        aTags = ["bogus_tag", "userName", "FirstName", "userId", "a_null_tag", "result"]
+        
+        try:
+            for sTag in aTags:
+                
+                aSpans = getMultipleXMLTagValuesFromFile(sFilePath, sTag, True)
+                aValues = getMultipleXMLTagValuesFromFile(sFilePath, sTag)
+                print2("XML Tag '" + sTag + "': spans = " + str(aSpans) + ", values = " + str(aValues))
+                
+                self.assertEqual(aSpans, getMultipleXMLTagSpans(sXML, sTag))
+                self.assertEqual(aValues, getMultipleXMLTagValues(sXML, sTag))
+            # end
+            
+            # Search the mapped file with several tags at once
+            oXMLMap = mapXMLFile(sFilePath)
+            hValues = getMultipleXMLTagValuesForTags(oXMLMap, aTags)
+            unmapXMLFile(oXMLMap)
+            self.assertEqual(hValues, getMultipleXMLTagValuesForTags(sXML, aTags))
+            
+        finally:
+            os.remove(sFilePath)
+        # end
+        
+    # end test_xml_009_getMultipleXMLTagValuesFromFile()
+    
+    #===========================================================================#
+    # Testcase method: test_xml_010_areTagsInXML
+    #
+    # Description: Test the methods:
+    #                                areTagsInXML(...)
+    #                                countXMLTags(...)
+    #                                countXMLTagsForTags(...)
+    #===========================================================================#
+    def test_xml_010_areTagsInXML(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_010_areTagsInXML")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sXML = '<soapenv:Body><getUserInfoResponse><result><userName><FirstName>Bob</FirstName><userId>01</userId></userName><userName><FirstName>Tom</FirstName><userId>02</userId></userName></a_null_tag><n1.Id>03</n1.Id></result></getUserInfoResponse></soapenv:Body>'
+        
+        # 'n1xId' would match 'n1.Id' as a Regular Expression
+        aTags = ["bogus_tag", "<bogus_tag>", "userName", "</userName>", "FirstName", "userId", "a_null_tag", "n1.Id", "n1xId"]
+        
+        hTagsFound = areTagsInXML(sXML, aTags)
+        hTagCounts = countXMLTagsForTags(sXML, aTags)
+        
+        for sTag in aTags:
+            
+            print2("XML Tag '" + sTag + "': exists = " + str(hTagsFound[sTag]) + ", count = " + str(hTagCounts[sTag]))
+            
+            self.assertEqual(hTagsFound[sTag], isTagInXML(sXML, sTag))
+            self.assertEqual(hTagCounts[sTag], countXMLTags(sXML, sTag))
+            self.assertEqual(hTagCounts[sTag], len(getMultipleXMLTagValues(sXML, sTag)))
+        # end
+        
+        self.assertEqual(hTagsFound["n1xId"], False)
+        
+    # end test_xml_010_areTagsInXML()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_011_tag_options
+    #
+    # Description: Test matching tags with attributes, any namespace prefix
+    #              and self-closing tags in the methods:
+    #                                getMultipleXMLTagValues(...)
+    #                                getMultipleXMLTagValuesForTags(...)
+    #                                getXMLTagValue(...)
+    #                                iterXMLRecords(...)
+    #                                iterXMLTagValues(...)
+    #===========================================================================#
+    def test_xml_011_tag_options(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_011_tag_options")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sXML = '<result><records xsi:type="sf:Account"><sf:Id xsi:type="xsd:string">01</sf:Id><sf:Name>Bob</sf:Name></records><records xsi:type="sf:Account"><ns2:Id>02</ns2:Id><sf:Name/></records></result>'
+        
+        # The exact tags only, the Opening <sf:Id> tag with attributes is not matched
+        self.assertEqual(getMultipleXMLTagValues(sXML, "sf:Id"), [""])
+        self.assertEqual(getMultipleXMLTagValues(sXML, "sf:Name"), ["Bob"])
+        
+        aValues = getMultipleXMLTagValues(sXML, "sf:Id", True)
+        print2("Attributes: " + str(aValues))
+        self.assertEqual(aValues, ["01"])
+        
+        aValues = getMultipleXMLTagValues(sXML, "sf:Id", True, True)
+        print2("Attributes and any namespace: " + str(aValues))
+        self.assertEqual(aValues, ["01", "02"])
+        
+        aValues = getMultipleXMLTagValues(sXML, "Name", False, True, True)
+        print2("Self-closing and any namespace: " + str(aValues))
+        self.assertEqual(aValues, ["Bob", ""])
+        
+        self.assertEqual(getXMLTagValue(sXML, "<Id>", True, True), "01")
+        self.assertEqual(getXMLTagValue(sXML, "Id", True), None)
+        
+        hValues = getMultipleXMLTagValuesForTags(sXML, ["sf:Id", "Name"], True, True, True)
+        self.assertEqual(hValues["sf:Id"], ["01", "02"])
+        self.assertEqual(hValues["Name"], ["Bob", ""])
+        
+        aValues = list(iterXMLTagValues([sXML[:50], sXML[50:]], "Id", 10, True, True))
+        self.assertEqual(aValues, ["01", "02"])
+        
+        aRows = list(iterXMLRecords(sXML, "records", ["sf:Id", "sf:Name"], True, True, True))
+        print2("Records: " + str(aRows))
+        self.assertEqual(aRows, [("01", "Bob"), ("02", "")])
+        
+        aRows = list(iterXMLRecords(sXML, "records", ["sf:Id", "sf:Name"]))
+        self.assertEqual(aRows, [("", "Bob"), (None, None)])
+        
+    # end test_xml_011_tag_options()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_012_enableXMLCache
+    #
+    # Description: Test the methods:
+    #                                enableXMLCache(...)
+    #                                disableXMLCache()
+    #                                getXMLCacheStats()
+    #                                XMLExtractionCache(...)
+    #===========================================================================#
+    def test_xml_012_enableXMLCache(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_012_enableXMLCache")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sXML = '<result><records><sf:Id>01</sf:Id><sf:Name>Bob</sf:Name></records><records><sf:Id>02</sf:Id><sf:Name>Tom</sf:Name></records></result>'
+        
+        self.assertEqual(getXMLCacheStats(), None)
+        
+        enableXMLCache()
+        try:
+            aIds = getMultipleXMLTagValues(sXML, "sf:Id")
+            
+            # The same XML in a different STRING object
+            sSameXML = "".join([sXML[:10], sXML[10:]])
+            aCachedIds = getMultipleXMLTagValues(sSameXML, "<sf:Id>")
+            aCachedIds = getMultipleXMLTagValues(sSameXML, "<sf:Id>")
+            
+            # Changing a returned LIST does not change the cached values
+            aCachedIds.append("03")
+            self.assertEqual(getMultipleXMLTagValues(sSameXML, "<sf:Id>"), ["01", "02"])
+            
+            hValues = getMultipleXMLTagValuesForTags(sXML, ["sf:Id", "sf:Name"])
+            hValues = getMultipleXMLTagValuesForTags(sSameXML, ["sf:Id", "sf:Name"])
+            self.assertEqual(hValues, {"sf:Id": ["01", "02"], "sf:Name": ["Bob", "Tom"]})
+            
+            hStats = getXMLCacheStats()
+            print2("Cache stats: " + str(hStats))
+            self.assertEqual(hStats["misses"], 3)
+            self.assertEqual(hStats["hits"], 3)
+            self.assertEqual(hStats["entries"], 3)
+        finally:
+            disableXMLCache()
+        # end
+        
+        self.assertEqual(getXMLCacheStats(), None)
+        
+        # Least recently used results are evicted first
+        oCache = XMLExtractionCache(2, 1000)
+        oCache.put(oCache.getKey(sXML, ("a",)), ["1"], 10)
+        oCache.put(oCache.getKey(sXML, ("b",)), ["2"], 10)
+        self.assertEqual(oCache.get(oCache.getKey(sXML, ("a",))), ["1"])
+        oCache.put(oCache.getKey(sXML, ("c",)), ["3"], 10)
+        self.assertEqual(oCache.get(oCache.getKey(sXML, ("b",))), None)
+        self.assertEqual(oCache.get(oCache.getKey(sXML, ("a",))), ["1"])
+        
+        # The size cap
+        oCache.put(oCache.getKey(sXML, ("d",)), ["4"], 995)
+        hStats = oCache.getStats()
+        self.assertEqual(hStats["entries"], 1)
+        self.assertEqual(hStats["bytes"], 995)
+        self.assertEqual(hStats["evictions"], 3)
+        
+    # end test_xml_012_enableXMLCache()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_013_getMultipleXMLTagValuesBatch
+    #
+    # Description: Test the methods:
+    #                                getMultipleXMLTagValuesBatch(...)
+    #===========================================================================#
+    def test_xml_013_getMultipleXMLTagValuesBatch(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_013_getMultipleXMLTagValuesBatch")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        import tempfile
+        
+        aTags = ["sf:Id", "sf:Name"]
+        
+        aDocuments = []
+        for iDocument in range(6):
+            aDocuments.append('<result><records><sf:Id>' + str(iDocument) + '</sf:Id><sf:Name>Name' + str(iDocument) + '</sf:Name></records></result>')
+        # end
+        
+        # Save half of the documents to files
+        aFiles = []
+        for iDocument in range(0, 6, 2):
+            sFilePath = tempfile.mktemp(".xml")
+            oFileObject = open(sFilePath, 'wb')
+            oFileObject.write(aDocuments[iDocument])
+            oFileObject.close()
+            aFiles.append(sFilePath)
+            aDocuments[iDocument] = sFilePath
+        # end
+        
+        try:
+            # In this process, then in 2 processes with 1 document per task
+            aSerialResults = getMultipleXMLTagValuesBatch(aDocuments, aTags, 1)
+            aResults = getMultipleXMLTagValuesBatch(aDocuments, aTags, 2, 1)
+        finally:
+            for sFilePath in aFiles:
+                os.remove(sFilePath)
+            # end
+        # end
+        
+        print2("Batch results: " + str(aResults))
+        
+        self.assertEqual(aResults, aSerialResults)
+        self.assertEqual(len(aResults), 6)
+        for iDocument in range(6):
+            self.assertEqual(aResults[iDocument]["sf:Id"], [str(iDocument)])
+            self.assertEqual(aResults[iDocument]["sf:Name"], ["Name" + str(iDocument)])
+        # end
+        
+    # end test_xml_013_getMultipleXMLTagValuesBatch()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_014_buildXML
+    #
+    # Description: Test the methods:
+    #                                buildXML(...)
+    #                                buildXMLRecords(...)
+    #                                escapeXMLValue(...)
+    #                                writeXML(...)
+    #                                writeXMLRecords(...)
+    #===========================================================================#
+    def test_xml_014_buildXML(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_014_buildXML")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        import StringIO
+        
+        sValue = "Bob & Co"
+        self.assert_(escapeXMLValue(sValue) == "Bob &amp; Co")
+        sValue = "Bob and Co"
+        self.assert_(escapeXMLValue(sValue) is sValue)
+        
+        aAccounts = [[("type", "Account"), ("Name", "A1 <East>")], [("type", "Account"), ("Name", "A2"), ("Phone", None)]]
+        sXML = buildXML({"create": {"sObjects": aAccounts}})
+        print2("buildXML: " + sXML)
+        self.assertEqual(sXML, '<create><sObjects><type>Account</type><Name>A1 &lt;East&gt;</Name></sObjects><sObjects><type>Account</type><Name>A2</Name><Phone></Phone></sObjects></create>')
+        
+        # Repeated tags from a GENERATOR, written to a file object
+        oFileObject = StringIO.StringIO()
+        iLength = writeXML(oFileObject, {"sObjects": iter(["1", "2", 3])}, "<create>")
+        self.assertEqual(oFileObject.getvalue(), '<create><sObjects>1</sObjects><sObjects>2</sObjects><sObjects>3</sObjects></create>')
+        self.assertEqual(iLength, len(oFileObject.getvalue()))
+        
+        # Rows round trip through iterXMLRecords()
+        aRows = []
+        for iRow in range(10000):
+            aRows.append(("Name" + str(iRow), "City & Co"))
+        # end
+        aRows.append(("Last", None))
+        
+        sXML = buildXMLRecords(aRows, "records", ["sf:Name", "sf:City"], "result")
+        oFileObject = StringIO.StringIO()
+        writeXMLRecords(oFileObject, iter(aRows), "records", ["sf:Name", "sf:City"], "result")
+        
+        self.assertEqual(oFileObject.getvalue(), sXML)
+        self.assertEqual(getMultipleXMLTagValues(sXML, "sf:City")[0], "City &amp; Co")
+        aReadRows = list(iterXMLRecords(sXML, "records", ["sf:Name", "sf:City"]))
+        self.assertEqual(len(aReadRows), 10001)
+        self.assertEqual(aReadRows[-1], ("Last", None))
+        
+    # end test_xml_014_buildXML()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_015_compileXMLPath
+    #
+    # Description: Test the methods:
+    #                                compileXMLPath(...)
+    #                                getXMLPathValues(...)
+    #                                XMLPath(...)
+    #===========================================================================#
+    def test_xml_015_compileXMLPath(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_015_compileXMLPath")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sXML = '<?xml version="1.0"?><soapenv:Body><result><records xsi:type="sf:Account"><sf:Id>01</sf:Id><sf:Owner><sf:Id>07</sf:Id></sf:Owner></records><records><sf:Id/></records><sf:Id>99</sf:Id></result></soapenv:Body>'
+        
+        oPath = compileXMLPath("result/records/Id")
+        self.assert_(compileXMLPath("result/records/Id") is oPath)
+        
+        aValues = oPath.getValues(sXML)
+        print2("result/records/Id: " + str(aValues))
+        self.assertEqual(aValues, ["01", ""])
+        self.assertEqual(list(oPath.iterValues(sXML)), aValues)
+        
+        aSpans = oPath.getSpans(sXML)
+        self.assertEqual(sXML[aSpans[0][0]:aSpans[0][1]], "01")
+        
+        self.assertEqual(getXMLPathValues(sXML, "records/*/sf:Id"), ["07"])
+        self.assertEqual(getXMLPathValues(sXML, "Id"), ["01", "07", "", "99"])
+        self.assertEqual(getXMLPathValues(sXML, "/result/Id"), [])
+        self.assertEqual(getXMLPathValues(sXML, "/Body/result/Id"), ["99"])
+        self.assertEqual(getXMLPathValues(sXML, "result/records/ns2:Id"), [])
+        
+    # end test_xml_015_compileXMLPath()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_016_decodeXMLEntities
+    #
+    # Description: Test the methods:
+    #                                decodeXMLEntities(...)
+    #              and the bDecode option of the extraction methods
+    #===========================================================================#
+    def test_xml_016_decodeXMLEntities(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_016_decodeXMLEntities")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        sValue = "Bob and Co"
+        self.assert_(decodeXMLEntities(sValue) is sValue)
+        
+        self.assertEqual(decodeXMLEntities("Bob &amp; Co &lt;Sales&gt; &quot;A&apos;s&quot;"), "Bob & Co <Sales> \"A's\"")
+        self.assertEqual(decodeXMLEntities("&#65;&#x42;&#X43; &amp;lt; &nbsp; &#99999999;"), "ABC &lt; &nbsp; &#99999999;")
+        self.assertEqual(decodeXMLEntities("Caf&#233;"), "Caf\xc3\xa9")
+        self.assertEqual(decodeXMLEntities(u"Caf&#233;"), u"Caf\xe9")
+        
+        sXML = '<result><records><sf:Id>01</sf:Id><sf:Name>Bob &amp; Co</sf:Name></records><records><sf:Id>02</sf:Id><sf:Name>&lt;none&gt;</sf:Name></records></result>'
+        
+        self.assertEqual(getXMLTagValue(sXML, "sf:Name"), "Bob &amp; Co")
+        self.assertEqual(getXMLTagValue(sXML, "sf:Name", bDecode=True), "Bob & Co")
+        self.assertEqual(getXMLTagValue(sXML, "Name", False, True, False, True), "Bob & Co")
+        
+        aNames = ["Bob & Co", "<none>"]
+        self.assertEqual(getMultipleXMLTagValues(sXML, "sf:Name", bDecode=True), aNames)
+        self.assertEqual(getMultipleXMLTagValuesForTags(sXML, ["sf:Name"], bDecode=True)["sf:Name"], aNames)
+        self.assertEqual(list(iterXMLTagValues([sXML], "sf:Name", bDecode=True)), aNames)
+        self.assertEqual(getXMLPathValues(sXML, "records/Name", True), aNames)
+        
+        aRows = list(iterXMLRecords(sXML, "records", ["sf:Id", "sf:Name"], bDecode=True))
+        print2("Decoded records: " + str(aRows))
+        self.assertEqual(aRows, [("01", "Bob & Co"), ("02", "<none>")])
+        
+    # end test_xml_016_decodeXMLEntities()
+    
+    
+    #===========================================================================#
+    # Testcase method: test_xml_017_diffXML
+    #
+    # Description: Test the methods:
+    #                                diffXML(...)
+    #                                diffXMLFiles(...)
+    #===========================================================================#
+    def test_xml_017_diffXML(self):
+        
+        
+        '''
+        '''
+        
+        print2("")
+        print2("#######################")
+        print2("Testcase: test_xml_017_diffXML")
+        print2("#######################")
+        
+        if(VERBOSE == True):
+            pass
+        # end
+        
+        import tempfile
+        
+        sExpectedXML = '<result>\n  <records><sf:Id>01</sf:Id><sf:Name>Bob</sf:Name></records>\n  <records><sf:Id>02</sf:Id><sf:Name>Tom</sf:Name></records>\n  <done>true</done><size/>\n</result>'
+        
+        self.assertEqual(diffXML(sExpectedXML, sExpectedXML), [])
+        
+        # White space between tags is not compared
+        self.assertEqual(diffXML(sExpectedXML, sExpectedXML.replace("\n  ", "")), [])
+        
+        sActualXML = '<result><records><sf:Id>11</sf:Id><sf:Name>Bob</sf:Name></records><records><sf:Id>12</sf:Id><sf:Name>Pat</sf:Name></records><done>true</done><size/></result>'
+        
+        aDiffs = diffXML(sExpectedXML, sActualXML)
+        print2("Differences: " + str(aDiffs))
+        self.assertEqual(len(aDiffs), 3)
+        self.assertEqual(aDiffs[0]["type"], "changed")
+        self.assertEqual(aDiffs[0]["expectedPath"], "result/records/sf:Id")
+        self.assertEqual(aDiffs[0]["expectedValue"], "01")
+        self.assertEqual(aDiffs[0]["actualValue"], "11")
+        self.assertEqual(sActualXML[aDiffs[0]["actualOffset"]:].find("<sf:Id>11"), 0)
+        
+        # Stop at the budget, and skip the ignored tags
+        self.assertEqual(len(diffXML(sExpectedXML, sActualXML, 1)), 1)
+        aDiffs = diffXML(sExpectedXML, sActualXML, 10, ["Id"])
+        self.assertEqual(len(aDiffs), 1)
+        self.assertEqual(aDiffs[0]["expectedValue"], "Tom")
+        
+        # Records in a different order
+        sReorderedXML = '<result><records><sf:Id>02</sf:Id><sf:Name>Tom</sf:Name></records><records><sf:Id>01</sf:Id><sf:Name>Bob</sf:Name></records><size/><done>true</done><extra>1</extra></result>'
+        self.assertEqual(len(diffXML(sExpectedXML, sReorderedXML)), 7)
+        aDiffs = diffXML(sExpectedXML, sReorderedXML, 10, None, True)
+        self.assertEqual(len(aDiffs), 1)
+        self.assertEqual(aDiffs[0]["type"], "unexpected")
+        self.assertEqual(aDiffs[0]["actualPath"], "result/extra")
+        aDiffs = diffXML(sReorderedXML, sExpectedXML, 10, None, True)
+        self.assertEqual(aDiffs[0]["type"], "missing")
+        
+        # A record added in front of identical records is reported once, not as every later tag changed
+        sRecord = '<records><sf:Id>01</sf:Id><sf:Name>Bob</sf:Name></records>'
+        sThreeXML = '<result>' + (sRecord * 3) + '<done>true</done></result>'
+        sInsertedXML = '<result><records><sf:Id>09</sf:Id><sf:Name>Ann</sf:Name></records>' + (sRecord * 3) + '<done>true</done></result>'
+        aDiffs = diffXML(sThreeXML, sInsertedXML)
+        print2("Differences: " + str(aDiffs))
+        self.assertEqual(len(aDiffs), 2)
+        self.assertEqual([aDiffs[0]["type"], aDiffs[0]["actualPath"], aDiffs[0]["actualValue"]], ["unexpected", "result/records/sf:Id", "09"])
+        self.assertEqual([aDiffs[1]["type"], aDiffs[1]["actualValue"]], ["unexpected", "Ann"])
+        self.assertEqual(sInsertedXML[aDiffs[0]["actualOffset"]:].find("<sf:Id>09"), 0)
+        
+        # and removed
+        aDiffs = diffXML(sInsertedXML, sThreeXML)
+        self.assertEqual(len(aDiffs), 2)
+        self.assertEqual([aDiffs[0]["type"], aDiffs[0]["expectedValue"]], ["missing", "09"])
+        self.assertEqual([aDiffs[1]["type"], aDiffs[1]["expectedValue"]], ["missing", "Ann"])
+        
+        # A value changed within identical records is still reported as changed
+        aDiffs = diffXML(sThreeXML, sThreeXML.replace("Bob", "Tim", 1))
+        self.assertEqual(len(aDiffs), 1)
+        self.assertEqual([aDiffs[0]["type"], aDiffs[0]["expectedValue"], aDiffs[0]["actualValue"]], ["changed", "Bob", "Tim"])
+        
+        # The same differences from files, read a few characters at a time
+        aFiles = []
+        for sXML in [sExpectedXML, sActualXML]:
+            sFilePath = tempfile.mktemp(".xml")
+            oFileObject = open(sFilePath, 'wb')
+            oFileObject.write(sXML)
+            oFileObject.close()
+            aFiles.append(sFilePath)
+        # end
+        
+        try:
+            aFileDiffs = diffXMLFiles(aFiles[0], aFiles[1], 10, None, False, 7)
+        finally:
+            for sFilePath in aFiles:
+                os.remove(sFilePath)
+            # end
+        # end
+        
+        self.assertEqual(aFileDiffs, diffXML(sExpectedXML, sActualXML))
+        
+    # end test_xml_017_diffXML()
+    
 # End of class - UnitTest_WebUtilities
 
 suite = unittest.TestLoader().loadTestsFromTestCase(UnitTest_WebUtilities)